@@ -0,0 +1,36 @@
+"""add collection node embedding
+
+Revision ID: 4b9e2d7c1a53
+Revises: ddd85fd69472
+Create Date: 2026-10-18 10:02:41.516204
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import pgvector
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4b9e2d7c1a53"
+down_revision: Union[str, Sequence[str], None] = "ddd85fd69472"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "collection_node",
+        sa.Column(
+            "embedding", pgvector.sqlalchemy.vector.VECTOR(dim=256), nullable=True
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("collection_node", "embedding")
@@ -0,0 +1,46 @@
+"""add chunk embedding hnsw index
+
+Revision ID: 6f1c3a8e9d24
+Revises: 4b9e2d7c1a53
+Create Date: 2026-10-18 11:20:07.384512
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6f1c3a8e9d24"
+down_revision: Union[str, Sequence[str], None] = "4b9e2d7c1a53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so existing chunk tables stay writable during the build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chunk_embedding_hnsw",
+            "chunk",
+            ["embedding"],
+            unique=False,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_l2_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chunk_embedding_hnsw",
+            table_name="chunk",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,108 @@
+"""add metadata lookup indexes
+
+Revision ID: 8a2d5e7f0c31
+Revises: 6f1c3a8e9d24
+Create Date: 2026-10-18 12:04:55.913027
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8a2d5e7f0c31"
+down_revision: Union[str, Sequence[str], None] = "6f1c3a8e9d24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns, covering columns)
+INDEXES = [
+    ("ix_chunk_document_id", "chunk", ["document_id"], None),
+    (
+        "ix_document_collection_id_created_at",
+        "document",
+        ["collection_id", "created_at"],
+        None,
+    ),
+    ("ix_document_relation_document_id", "document_relation", ["document_id"], None),
+    (
+        "ix_document_node_document_relation_id",
+        "document_node",
+        ["document_relation_id"],
+        None,
+    ),
+    (
+        "ix_document_edge_document_relation_id",
+        "document_edge",
+        ["document_relation_id"],
+        None,
+    ),
+    (
+        "ix_collection_permission_collection_id_user_id",
+        "collection_permission",
+        ["collection_id", "user_id"],
+        ["permission_level"],
+    ),
+    (
+        "ix_collection_permission_user_id_permission_level",
+        "collection_permission",
+        ["user_id", "permission_level"],
+        ["collection_id"],
+    ),
+    (
+        "ix_collection_relation_collection_id",
+        "collection_relation",
+        ["collection_id"],
+        None,
+    ),
+    (
+        "ix_collection_node_collection_relation_id",
+        "collection_node",
+        ["collection_relation_id"],
+        None,
+    ),
+    (
+        "ix_collection_edge_collection_relation_id",
+        "collection_edge",
+        ["collection_relation_id"],
+        None,
+    ),
+    ("ix_collection_chat_collection_id", "collection_chat", ["collection_id"], None),
+    (
+        "ix_collection_chat_history_collection_chat_id_created_at",
+        "collection_chat_history",
+        ["collection_chat_id", "created_at"],
+        None,
+    ),
+    ("ix_clustering_collection_id", "clustering", ["collection_id"], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so existing tables stay writable during the build
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_include=include or [],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
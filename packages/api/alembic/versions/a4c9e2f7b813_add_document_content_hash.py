@@ -0,0 +1,34 @@
+"""add document content hash
+
+Revision ID: a4c9e2f7b813
+Revises: f3b8d2a61c94
+Create Date: 2026-10-18 17:21:48.093517
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c9e2f7b813"
+down_revision: Union[str, Sequence[str], None] = "f3b8d2a61c94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("document", sa.Column("content_hash", sa.Text(), nullable=True))
+    op.create_index(
+        op.f("ix_document_content_hash"), "document", ["content_hash"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_document_content_hash"), table_name="document")
+    op.drop_column("document", "content_hash")
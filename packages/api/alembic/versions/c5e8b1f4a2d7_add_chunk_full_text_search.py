@@ -0,0 +1,58 @@
+"""add chunk full text search
+
+Revision ID: c5e8b1f4a2d7
+Revises: 8a2d5e7f0c31
+Create Date: 2026-10-18 13:31:18.220694
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8b1f4a2d7"
+down_revision: Union[str, Sequence[str], None] = "8a2d5e7f0c31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "chunk",
+        sa.Column(
+            "chunk_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('simple', coalesce(chunk_text, ''))", persisted=True
+            ),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chunk_chunk_tsv",
+            "chunk",
+            ["chunk_tsv"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chunk_chunk_tsv",
+            table_name="chunk",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("chunk", "chunk_tsv")
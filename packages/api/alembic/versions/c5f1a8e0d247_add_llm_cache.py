@@ -0,0 +1,58 @@
+"""add llm cache
+
+Revision ID: c5f1a8e0d247
+Revises: b7d3e5a92c16
+Create Date: 2026-10-18 18:44:09.271830
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5f1a8e0d247"
+down_revision: Union[str, Sequence[str], None] = "b7d3e5a92c16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "llm_cache",
+        sa.Column("cache_key", sa.Text(), nullable=False),
+        sa.Column("model_name", sa.Text(), nullable=False),
+        sa.Column("response", sa.Text(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("hits", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=True,
+        ),
+        sa.Column(
+            "last_used_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index(
+        op.f("ix_llm_cache_created_at"), "llm_cache", ["created_at"], unique=False
+    )
+    op.create_index(
+        op.f("ix_llm_cache_last_used_at"), "llm_cache", ["last_used_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_llm_cache_last_used_at"), table_name="llm_cache")
+    op.drop_index(op.f("ix_llm_cache_created_at"), table_name="llm_cache")
+    op.drop_table("llm_cache")
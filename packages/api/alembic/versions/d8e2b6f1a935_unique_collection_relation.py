@@ -0,0 +1,66 @@
+"""unique collection relation
+
+Revision ID: d8e2b6f1a935
+Revises: c5f1a8e0d247
+Create Date: 2026-10-19 09:12:40.528113
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d8e2b6f1a935"
+down_revision: Union[str, Sequence[str], None] = "c5f1a8e0d247"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the newest relation of each collection; nodes and edges cascade
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM collection_relation
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY collection_id
+                        ORDER BY created_at DESC, id
+                    ) AS position
+                    FROM collection_relation
+                ) ranked
+                WHERE position > 1
+            )
+            """
+        )
+    )
+    op.drop_index(
+        "ix_collection_relation_collection_id",
+        table_name="collection_relation",
+        if_exists=True,
+    )
+    op.create_index(
+        "ix_collection_relation_collection_id",
+        "collection_relation",
+        ["collection_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_collection_relation_collection_id", table_name="collection_relation"
+    )
+    op.create_index(
+        "ix_collection_relation_collection_id",
+        "collection_relation",
+        ["collection_id"],
+        unique=False,
+    )
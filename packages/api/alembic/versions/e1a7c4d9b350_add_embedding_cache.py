@@ -0,0 +1,45 @@
+"""add embedding cache
+
+Revision ID: e1a7c4d9b350
+Revises: c5e8b1f4a2d7
+Create Date: 2026-10-18 14:12:40.671349
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import pgvector
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e1a7c4d9b350"
+down_revision: Union[str, Sequence[str], None] = "c5e8b1f4a2d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "embedding_cache",
+        sa.Column("model_name", sa.Text(), nullable=False),
+        sa.Column("text_hash", sa.Text(), nullable=False),
+        sa.Column(
+            "embedding", pgvector.sqlalchemy.vector.VECTOR(dim=256), nullable=False
+        ),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("model_name", "text_hash"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("embedding_cache")
@@ -0,0 +1,39 @@
+"""add collection node aliases
+
+Revision ID: e4b9a2c7d815
+Revises: d8e2b6f1a935
+Create Date: 2026-10-19 11:03:52.274615
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b9a2c7d815"
+down_revision: Union[str, Sequence[str], None] = "d8e2b6f1a935"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "collection_node",
+        sa.Column(
+            "aliases",
+            postgresql.ARRAY(sa.Text()),
+            server_default="{}",
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("collection_node", "aliases")
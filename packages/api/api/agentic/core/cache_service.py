@@ -0,0 +1,245 @@
+"""
+Persistence of the LLM response, OCR and section summary caches.
+
+The cache front ends (`llm_cache`, `ingestion.typhoon_ocr.ocr_cache` and the
+summary generator) open a session per call and go through this service.
+"""
+
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ...models.document import LlmCache, OcrCache, SummaryCache
+
+
+class CacheService:
+    """Service for the persisted LLM response, OCR and summary caches."""
+
+    def __init__(self, db: Session):
+        """Initialize cache service."""
+        self.db = db
+
+    def get_cached_ocr_text(
+        self, model_name: str, prompt_hash: str, image_hash: str
+    ) -> Optional[str]:
+        """Look up the cached OCR text of an image."""
+        return self.db.execute(
+            select(OcrCache.text).where(
+                OcrCache.model_name == model_name,
+                OcrCache.prompt_hash == prompt_hash,
+                OcrCache.image_hash == image_hash,
+            )
+        ).scalar_one_or_none()
+
+    def store_cached_ocr_text(
+        self, model_name: str, prompt_hash: str, image_hash: str, text: str
+    ) -> None:
+        """Store the OCR text of an image, keeping an existing entry on conflict."""
+        try:
+            self.db.execute(
+                pg_insert(OcrCache)
+                .values(
+                    model_name=model_name,
+                    prompt_hash=prompt_hash,
+                    image_hash=image_hash,
+                    text=text,
+                )
+                .on_conflict_do_nothing(
+                    index_elements=["model_name", "prompt_hash", "image_hash"]
+                )
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def delete_cached_ocr_texts(
+        self,
+        model_name: Optional[str] = None,
+        keep_prompt_hashes: Optional[list[str]] = None,
+    ) -> int:
+        """
+        Delete cached OCR texts, optionally only those of one model and those
+        not made with one of `keep_prompt_hashes`. Returns the number deleted.
+        """
+        query = delete(OcrCache)
+        if model_name is not None:
+            query = query.where(OcrCache.model_name == model_name)
+        if keep_prompt_hashes:
+            query = query.where(OcrCache.prompt_hash.not_in(keep_prompt_hashes))
+        try:
+            deleted = self.db.execute(query).rowcount
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return deleted
+
+    def count_cached_ocr_texts(self) -> int:
+        """Number of cached OCR texts."""
+        return self.db.execute(select(func.count()).select_from(OcrCache)).scalar_one()
+
+    def get_cached_summaries(
+        self, model_name: str, prompt_hash: str, text_hashes: list[str]
+    ) -> dict[str, str]:
+        """Look up cached section summaries by text hash; returns hash -> summary."""
+        if not text_hashes:
+            return {}
+        rows = self.db.execute(
+            select(SummaryCache.text_hash, SummaryCache.summary).where(
+                SummaryCache.model_name == model_name,
+                SummaryCache.prompt_hash == prompt_hash,
+                SummaryCache.text_hash.in_(list(dict.fromkeys(text_hashes))),
+            )
+        ).all()
+        return dict(rows)
+
+    def store_cached_summaries(
+        self, model_name: str, prompt_hash: str, summaries: dict[str, str]
+    ) -> None:
+        """Store section summaries by text hash, keeping existing entries on conflict."""
+        if not summaries:
+            return
+
+        rows = [
+            {
+                "model_name": model_name,
+                "prompt_hash": prompt_hash,
+                "text_hash": text_hash,
+                "summary": summary,
+            }
+            for text_hash, summary in summaries.items()
+        ]
+        try:
+            self.db.execute(
+                pg_insert(SummaryCache)
+                .values(rows)
+                .on_conflict_do_nothing(
+                    index_elements=["model_name", "prompt_hash", "text_hash"]
+                )
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def get_cached_llm_response(
+        self, cache_key: str, ttl_seconds: int = 0
+    ) -> Optional[str]:
+        """
+        Look up a cached LLM response and mark it as used. Entries older than
+        `ttl_seconds` (0 for no expiry) are misses.
+        """
+        query = (
+            update(LlmCache)
+            .where(LlmCache.cache_key == cache_key)
+            .values(last_used_at=func.current_timestamp(), hits=LlmCache.hits + 1)
+            .returning(LlmCache.response)
+        )
+        if ttl_seconds:
+            query = query.where(
+                LlmCache.created_at
+                > func.current_timestamp() - timedelta(seconds=ttl_seconds)
+            )
+        try:
+            response = self.db.execute(query).scalar_one_or_none()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return response
+
+    def store_cached_llm_response(
+        self, cache_key: str, model_name: str, response: str
+    ) -> None:
+        """Store an LLM response, replacing an existing (possibly expired) entry."""
+        values = {
+            "cache_key": cache_key,
+            "model_name": model_name,
+            "response": response,
+            "size_bytes": len(response.encode("utf-8")),
+        }
+        try:
+            self.db.execute(
+                pg_insert(LlmCache)
+                .values(**values)
+                .on_conflict_do_update(
+                    index_elements=["cache_key"],
+                    set_={
+                        **values,
+                        "hits": 0,
+                        "created_at": func.current_timestamp(),
+                        "last_used_at": func.current_timestamp(),
+                    },
+                )
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def evict_cached_llm_responses(
+        self, ttl_seconds: int = 0, max_bytes: int = 0
+    ) -> int:
+        """
+        Delete expired LLM responses, then the least recently used ones until
+        the cache fits in `max_bytes` (0 for no limit). Returns the number deleted.
+        """
+        deleted = 0
+        try:
+            if ttl_seconds:
+                deleted += self.db.execute(
+                    delete(LlmCache).where(
+                        LlmCache.created_at
+                        <= func.current_timestamp() - timedelta(seconds=ttl_seconds)
+                    )
+                ).rowcount
+            if max_bytes:
+                newest_first = select(
+                    LlmCache.cache_key,
+                    func.sum(LlmCache.size_bytes)
+                    .over(
+                        order_by=(
+                            LlmCache.last_used_at.desc(),
+                            LlmCache.cache_key,
+                        )
+                    )
+                    .label("running_bytes"),
+                ).subquery()
+                deleted += self.db.execute(
+                    delete(LlmCache).where(
+                        LlmCache.cache_key.in_(
+                            select(newest_first.c.cache_key).where(
+                                newest_first.c.running_bytes > max_bytes
+                            )
+                        )
+                    )
+                ).rowcount
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return deleted
+
+    def delete_cached_llm_responses(self, model_name: Optional[str] = None) -> int:
+        """Delete cached LLM responses, optionally only those of one model."""
+        query = delete(LlmCache)
+        if model_name is not None:
+            query = query.where(LlmCache.model_name == model_name)
+        try:
+            deleted = self.db.execute(query).rowcount
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return deleted
+
+    def get_llm_cache_usage(self) -> dict:
+        """Number of cached LLM responses and their total size."""
+        count, size = self.db.execute(
+            select(func.count(), func.coalesce(func.sum(LlmCache.size_bytes), 0))
+        ).one()
+        return {"entries": count, "bytes": int(size)}
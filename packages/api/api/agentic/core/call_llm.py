@@ -1,12 +1,15 @@
 import os
-from typing import Any, TypeVar, Union
+from typing import Any, Optional, TypeVar, Union
 
 import instructor
 import litellm
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from ..schemas import ChatHistoryResponse
+from .llm_cache import get_llm_cache, llm_cache_key
+from .llm_gateway import get_llm_gateway
+from .single_flight import get_single_flight
 
 # utils/call_llm.py
 # litellm._turn_on_debug()
@@ -19,6 +22,7 @@ model = os.getenv("LITELLM_MODEL", "openrouter/meta-llama/llama-3.3-70b-instruct
 structured_model = os.getenv(
     "LITELLM_STRUCTURED_MODEL", "openrouter/meta-llama/llama-3.3-70b-instruct"
 )
+vlm_model = os.getenv("TYPHOON_OCR_MODEL", "openai/typhoon-ocr-preview")
 
 client = instructor.from_litellm(litellm.completion, mode=instructor.Mode.JSON_SCHEMA)
 async_client = instructor.from_litellm(
@@ -26,96 +30,182 @@ async_client = instructor.from_litellm(
 )
 
 
-def call_llm(prompt: Union[str, ChatHistoryResponse], api_key=api_key) -> str:
-    """Calls the LLM with the provided prompt and returns the response."""
-    response = litellm.completion(
-        model=model,
-        messages=[{"role": "user", "content": prompt}]
-        if isinstance(prompt, str)
-        else [
-            {"role": msg.role.value, "content": msg.content} for msg in prompt.messages
-        ],
-        api_key=api_key,
-    )
+def to_messages(prompt: Union[str, ChatHistoryResponse]) -> list[dict]:
+    """Chat messages of a prompt string or a chat history."""
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return [{"role": msg.role.value, "content": msg.content} for msg in prompt.messages]
 
-    if response.choices[0].message.content:
-        return response.choices[0].message.content
-    else:
-        return f"Error: Could not extract message content from LLM response. Response: {response}"  # noqa: E501
+
+def _structured_from_cache(
+    cached: Optional[str], response_model: type[T]
+) -> Optional[T]:
+    if cached is None:
+        return None
+    try:
+        return response_model.model_validate_json(cached)
+    except ValidationError:
+        return None
+
+
+def call_llm(
+    prompt: Union[str, ChatHistoryResponse], api_key=api_key, use_cache: bool = False
+) -> str:
+    """
+    Calls the LLM with the provided prompt and returns the response.
+    Concurrent identical calls share one LLM request. `use_cache` is for
+    deterministic callers, which can take a stored response.
+    """
+    messages = to_messages(prompt)
+    request_key = llm_cache_key(model, messages)
+    cache = get_llm_cache()
+    use_cache = use_cache and cache.enabled
+    if use_cache and (cached := cache.get(request_key)) is not None:
+        return cached
+
+    def complete() -> str:
+        response = get_llm_gateway().call(
+            litellm.completion,
+            model=model,
+            messages=messages,
+            api_key=api_key,
+        )
+
+        if response.choices[0].message.content:
+            if use_cache:
+                cache.put(request_key, model, response.choices[0].message.content)
+            return response.choices[0].message.content
+        else:
+            return f"Error: Could not extract message content from LLM response. Response: {response}"  # noqa: E501
+
+    return get_single_flight("llm").do_sync(request_key, complete)
 
 
 async def call_llm_async(
-    prompt: Union[str, ChatHistoryResponse], api_key=api_key
+    prompt: Union[str, ChatHistoryResponse], api_key=api_key, use_cache: bool = False
 ) -> str:
-    """Asynchronously calls the LLM with the provided prompt and returns the response."""
-    response = await litellm.acompletion(
-        model=model,
-        messages=[{"role": "user", "content": prompt}]
-        if isinstance(prompt, str)
-        else [
-            {"role": msg.role.value, "content": msg.content} for msg in prompt.messages
-        ],
-        api_key=api_key,
-    )
+    """
+    Asynchronously calls the LLM with the provided prompt and returns the response.
+    Concurrent identical calls share one LLM request. `use_cache` is for
+    deterministic callers, which can take a stored response.
+    """
+    messages = to_messages(prompt)
+    request_key = llm_cache_key(model, messages)
+    cache = get_llm_cache()
+    use_cache = use_cache and cache.enabled
+    if use_cache and (cached := await cache.aget(request_key)) is not None:
+        return cached
+
+    async def complete() -> str:
+        response = await get_llm_gateway().acall(
+            litellm.acompletion,
+            model=model,
+            messages=messages,
+            api_key=api_key,
+        )
 
-    if response.choices[0].message.content:
-        return response.choices[0].message.content
-    else:
-        return f"Error: Could not extract message content from LLM response. Response: {response}"  # noqa: E501
+        if response.choices[0].message.content:
+            if use_cache:
+                await cache.aput(
+                    request_key, model, response.choices[0].message.content
+                )
+            return response.choices[0].message.content
+        else:
+            return f"Error: Could not extract message content from LLM response. Response: {response}"  # noqa: E501
+
+    return await get_single_flight("llm").do(request_key, complete)
 
 
 def call_structured_llm(
     prompt: Union[str, ChatHistoryResponse],
     response_model: type[T],
     max_retries: int = 3,
+    use_cache: bool = False,
 ) -> T:
-    """Calls the LLM with a structured prompt and returns the response."""
-    response = client.chat.completions.create(
-        messages=[{"role": "user", "content": prompt}]
-        if isinstance(prompt, str)
-        else [
-            {"role": msg.role.value, "content": msg.content} for msg in prompt.messages
-        ],
-        model=structured_model,
-        api_key=api_key,
-        response_model=response_model,
-        max_retries=max_retries,
-    )
+    """
+    Calls the LLM with a structured prompt and returns the response.
+    Concurrent identical calls share one LLM request. `use_cache` is for
+    deterministic callers, which can take a stored response.
+    """
+    messages = to_messages(prompt)
+    request_key = llm_cache_key(structured_model, messages, response_model)
+    cache = get_llm_cache()
+    use_cache = use_cache and cache.enabled
+    if use_cache:
+        cached = _structured_from_cache(cache.get(request_key), response_model)
+        if cached is not None:
+            return cached
+
+    def complete() -> T:
+        response = get_llm_gateway().call(
+            client.chat.completions.create,
+            messages=messages,
+            model=structured_model,
+            api_key=api_key,
+            response_model=response_model,
+            max_retries=max_retries,
+        )
 
-    if response:
-        return response
+        if response:
+            if use_cache:
+                cache.put(request_key, structured_model, response.model_dump_json())
+            return response
 
-    else:
-        raise ValueError(
-            f"Error: Could not extract message content from LLM response. Response: {response}"
-        )
+        else:
+            raise ValueError(
+                f"Error: Could not extract message content from LLM response. Response: {response}"
+            )
+
+    response = get_single_flight("llm").do_sync(request_key, complete)
+    # Coalesced callers must not share one mutable instance
+    return response.model_copy(deep=True)
 
 
 async def call_structured_llm_async(
     prompt: Union[str, ChatHistoryResponse],
     response_model: type[T],
     max_retries: int = 3,
+    use_cache: bool = False,
 ) -> T:
-    """Asynchronously calls the LLM with a structured prompt and returns the response."""
-    response = await async_client.chat.completions.create(
-        messages=[{"role": "user", "content": prompt}]
-        if isinstance(prompt, str)
-        else [
-            {"role": msg.role.value, "content": msg.content} for msg in prompt.messages
-        ],
-        model=structured_model,
-        api_key=api_key,
-        response_model=response_model,
-        max_retries=max_retries,
-    )
+    """
+    Asynchronously calls the LLM with a structured prompt and returns the response.
+    Concurrent identical calls share one LLM request. `use_cache` is for
+    deterministic callers, which can take a stored response.
+    """
+    messages = to_messages(prompt)
+    request_key = llm_cache_key(structured_model, messages, response_model)
+    cache = get_llm_cache()
+    use_cache = use_cache and cache.enabled
+    if use_cache:
+        cached = _structured_from_cache(await cache.aget(request_key), response_model)
+        if cached is not None:
+            return cached
+
+    async def complete() -> T:
+        response = await get_llm_gateway().acall(
+            async_client.chat.completions.create,
+            messages=messages,
+            model=structured_model,
+            api_key=api_key,
+            response_model=response_model,
+            max_retries=max_retries,
+        )
 
-    if response:
-        return response
+        if response:
+            if use_cache:
+                await cache.aput(
+                    request_key, structured_model, response.model_dump_json()
+                )
+            return response
 
-    else:
-        raise ValueError(
-            f"Error: Could not extract message content from LLM response. Response: {response}"
-        )
+        else:
+            raise ValueError(
+                f"Error: Could not extract message content from LLM response. Response: {response}"
+            )
+
+    response = await get_single_flight("llm").do(request_key, complete)
+    # Coalesced callers must not share one mutable instance
+    return response.model_copy(deep=True)
 
 
 async def call_vlm_async(
@@ -123,7 +213,7 @@ async def call_vlm_async(
     image_base64: str,
     api_key: str = os.getenv("TYPHOON_API_KEY"),
     *,
-    model: str = "openai/typhoon-ocr-preview",
+    model: str = vlm_model,
     litellm_params: dict[str, Any] = None,
 ) -> str:
     """Calls the unstructured VLM with the provided prompt and returns the response."""
@@ -152,7 +242,7 @@ async def call_vlm_async(
     if litellm_params:
         litellm_args.update(litellm_params)
 
-    response = await litellm.acompletion(**litellm_args)
+    response = await get_llm_gateway().acall(litellm.acompletion, **litellm_args)
 
     if response:
         return response.choices[0].message.content.strip()
@@ -24,6 +24,7 @@ from ....document.schemas import ChunkResponse, DocumentResponse
 from ....document.service import DocumentService
 from ...core import call_structured_llm_async
 from ..embedding.embedding import TextEmbedder
+from ..executors import run_in_process, run_in_thread
 from ..prompts import (
     render_keyword_to_topic_extraction,
     render_summary_to_topic_extraction,
@@ -36,6 +37,14 @@ from .schemas import (
 )
 
 
+def _fit_topic_model(
+    topic_model: BERTopic, chunk_texts: list[str], embeddings: np.ndarray
+) -> tuple[list[int], pd.DataFrame]:
+    """Fit BERTopic and return chunk topics and topic info (runs in a worker process)."""
+    topics, _ = topic_model.fit_transform(chunk_texts, embeddings=embeddings)
+    return topics, topic_model.get_topic_info()
+
+
 class TopicModellingService:
     """Service for topic modelling document chunks based on their embeddings."""
 
@@ -105,7 +114,9 @@ class TopicModellingService:
         keywords = ", ".join(keywords)
         prompt = render_keyword_to_topic_extraction(keywords=keywords)
         print(f"/nGenerating cluster title with keywords: {keywords[:50]}")
-        return await call_structured_llm_async(prompt, response_model=ClusteringDetails)
+        return await call_structured_llm_async(
+            prompt, response_model=ClusteringDetails, use_cache=True
+        )
 
     async def llm_generate_cluster_title_by_summaries(
         self, summaries: list[str]
@@ -122,7 +133,9 @@ class TopicModellingService:
         summaries = "\n\n---\n\n".join(summaries)
         prompt = render_summary_to_topic_extraction(summaries=summaries)
         print(f"/nGenerating cluster title with summaries: {summaries[:50]}")
-        return await call_structured_llm_async(prompt, response_model=ClusteringDetails)
+        return await call_structured_llm_async(
+            prompt, response_model=ClusteringDetails, use_cache=True
+        )
 
     def _get_topic_keyword_map(
         self, topic_info_df, top_words: int
@@ -236,7 +249,9 @@ class TopicModellingService:
         """
         Clusters document chunks in a collection and generates descriptive topic titles.
         """
-        chunk_embeddings, doc_id_to_doc = self.get_collection_chunk_dict(collection_id)
+        chunk_embeddings, doc_id_to_doc = await run_in_thread(
+            self.get_collection_chunk_dict, collection_id
+        )
         if not chunk_embeddings:
             # Return the new empty schema
             return ClusteringResult(topics=[], documents=[])
@@ -268,11 +283,10 @@ class TopicModellingService:
 
         logger.info(f"remove duplications, now {len(set(doc_ids))} documents.")
 
-        # 1. Perform Topic Modeling
-        topics, _ = self.TOPIC_MODEL.fit_transform(
-            chunk_texts, embeddings=np.array(embeddings)
+        # 1. Perform Topic Modeling (UMAP/HDBSCAN fitting is CPU-bound Python)
+        topics, topic_info = await run_in_process(
+            _fit_topic_model, self.TOPIC_MODEL, chunk_texts, np.array(embeddings)
         )
-        topic_info = self.TOPIC_MODEL.get_topic_info()
         logger.info(f"Found {len(topic_info)} topics for collection {collection_id}.")
 
         # 2. Pre-build maps for efficiency
@@ -1,10 +1,17 @@
-from typing import Literal, Union
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Literal, Optional, Union
 
 import numpy as np
 from loguru import logger
 from model2vec import StaticModel
 from sentence_transformers import SentenceTransformer
 
+from ....config import get_settings
+from ..single_flight import get_single_flight
+
 MODEL_BACKEND_MAP = {
     "bge-m3-distilled": "sentence_transformer",
     "FlukeTJ/bge-m3-m2v-distilled-256": "model2vec",
@@ -14,6 +21,82 @@ MODEL_BACKEND_MAP = {
 _MODEL_CACHE = {}
 
 
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache with TTL for single-text embeddings."""
+
+    def __init__(self, max_size: int = 2048, ttl_seconds: float = 3600.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: tuple) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, embedding = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding.copy()
+
+    def put(self, key: tuple, embedding: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), np.array(embedding, copy=True))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_QUERY_CACHE = QueryEmbeddingCache(
+    max_size=get_settings().EMBEDDING_QUERY_CACHE_SIZE,
+    ttl_seconds=get_settings().EMBEDDING_QUERY_CACHE_TTL,
+)
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 of whitespace-normalized text, used as an embedding cache key."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def get_query_cache_stats() -> dict:
+    """Hit, miss and eviction counters of the shared query embedding cache."""
+    return _QUERY_CACHE.stats()
+
+
 class TextEmbedder:
     """Class for generating text embeddings using specified models and backends."""
 
@@ -64,17 +147,91 @@ class TextEmbedder:
         normalize: bool = True,
         show_progress: bool = False,
     ) -> np.ndarray:
-        """Encodes the given text(s) into embedding vector(s)."""
+        """
+        Encodes the given text(s) into embedding vector(s).
+        Single texts (typically search queries) are served from a shared LRU cache,
+        and concurrent identical ones are encoded once.
+        """
         if self.model is None:
             logger.error("Embedding model is not available.")
             return None
 
-        try:
+        cache_key = None
+        if isinstance(text, str):
+            cache_key = (self.model_name, normalize, text)
+            cached = _QUERY_CACHE.get(cache_key)
+            if cached is not None:
+                return cached
+
+        def encode() -> np.ndarray:
             embeddings = self.model.encode(
                 text, normalize_embeddings=normalize, show_progress_bar=show_progress
             )
+            if cache_key is not None:
+                _QUERY_CACHE.put(cache_key, embeddings)
             return embeddings
 
+        try:
+            if cache_key is None:
+                return encode()
+            # Concurrent identical queries share one encode; callers get copies
+            return get_single_flight("embedding").do_sync(cache_key, encode).copy()
+
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             return None
+
+    def get_embeddings_batched(
+        self,
+        texts: list[str],
+        batch_size: int = 256,
+        normalize: bool = True,
+        show_progress: bool = False,
+    ) -> tuple[np.ndarray, list[int]]:
+        """
+        Encodes many texts with as few `model.encode` calls as possible.
+
+        Returns a float32 matrix holding one row per successfully encoded text
+        (in input order) and the indices of the texts that could not be encoded.
+        A failing batch is retried item by item so one bad text does not drop
+        its whole batch.
+        """
+        if self.model is None:
+            logger.error("Embedding model is not available.")
+            return np.empty((0, 0), dtype=np.float32), list(range(len(texts)))
+
+        rows: list[np.ndarray] = []
+        failed: list[int] = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start : start + batch_size]
+            try:
+                embeddings = self.model.encode(
+                    batch,
+                    normalize_embeddings=normalize,
+                    show_progress_bar=show_progress,
+                    batch_size=batch_size,
+                )
+                rows.append(np.asarray(embeddings, dtype=np.float32))
+                continue
+            except Exception as e:
+                logger.warning(
+                    f"Batch encoding failed for texts {start}-{start + len(batch) - 1}, "
+                    f"retrying one by one: {e}"
+                )
+
+            for offset, text in enumerate(batch):
+                try:
+                    embedding = self.model.encode(
+                        [text],
+                        normalize_embeddings=normalize,
+                        show_progress_bar=False,
+                    )
+                    rows.append(np.asarray(embedding, dtype=np.float32))
+                except Exception as e:
+                    logger.error(f"Error embedding text {start + offset}: {e}")
+                    failed.append(start + offset)
+
+        if not rows:
+            return np.empty((0, 0), dtype=np.float32), failed
+
+        return np.vstack(rows), failed
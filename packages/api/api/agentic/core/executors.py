@@ -0,0 +1,149 @@
+"""
+Shared executors for CPU-bound work called from async code.
+
+Blocking work must not run on the event loop, or one ingestion stalls every
+SSE stream and chat request served by the same worker:
+
+- the thread pool is for libraries that release the GIL (numpy, PyMuPDF,
+  model2vec/torch encode) and for synchronous SQLAlchemy calls;
+- the process pool is for pure-Python-heavy steps (UMAP/HDBSCAN fitting);
+  functions and arguments sent to it must be picklable;
+- the streaming pool runs streaming ingests, which block on OCR scheduled
+  back on the event loop; OCR uses the thread pool, so they must not hold it.
+
+`EventLoopLagMonitor` measures how late the loop wakes up from a sleep, which
+is how long it was blocked.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+from ...config import get_settings
+
+_LOCK = threading.Lock()
+_THREAD_POOL: Optional[ThreadPoolExecutor] = None
+_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+_STREAMING_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Shared thread pool, created on first use."""
+    global _THREAD_POOL
+    with _LOCK:
+        if _THREAD_POOL is None:
+            _THREAD_POOL = ThreadPoolExecutor(
+                max_workers=get_settings().CPU_THREAD_POOL_WORKERS,
+                thread_name_prefix="cpu",
+            )
+        return _THREAD_POOL
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool, created on first use."""
+    global _PROCESS_POOL
+    with _LOCK:
+        if _PROCESS_POOL is None:
+            # spawn: forking a process with running threads is unsafe
+            _PROCESS_POOL = ProcessPoolExecutor(
+                max_workers=get_settings().CPU_PROCESS_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _PROCESS_POOL
+
+
+def get_streaming_pool() -> ThreadPoolExecutor:
+    """Thread pool of streaming ingests, one thread per concurrent file."""
+    global _STREAMING_POOL
+    with _LOCK:
+        if _STREAMING_POOL is None:
+            _STREAMING_POOL = ThreadPoolExecutor(
+                max_workers=get_settings().INGESTION_MAX_CONCURRENT_FILES,
+                thread_name_prefix="stream",
+            )
+        return _STREAMING_POOL
+
+
+async def run_in_thread(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking call on the shared thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_thread_pool(), functools.partial(func, *args, **kwargs)
+    )
+
+
+async def run_in_process(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a picklable CPU-bound call on the shared process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_executors() -> None:
+    """Shut down the shared pools; they are recreated on next use."""
+    global _THREAD_POOL, _PROCESS_POOL, _STREAMING_POOL
+    with _LOCK:
+        for pool in (_THREAD_POOL, _PROCESS_POOL, _STREAMING_POOL):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        _THREAD_POOL = None
+        _PROCESS_POOL = None
+        _STREAMING_POOL = None
+
+
+class EventLoopLagMonitor:
+    """Samples event loop lag by measuring how late a periodic sleep wakes up."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.samples = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.samples += 1
+            self.last_lag = lag
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag > 1.0:
+                logger.warning(f"Event loop was blocked for {lag:.2f}s")
+
+    def start(self) -> None:
+        """Start sampling on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+            "last_lag_seconds": self.last_lag,
+            "max_lag_seconds": self.max_lag,
+            "mean_lag_seconds": self.total_lag / self.samples if self.samples else 0.0,
+        }
+
+
+_LOOP_LAG_MONITOR = EventLoopLagMonitor(interval=get_settings().EVENT_LOOP_LAG_INTERVAL)
+
+
+def get_loop_lag_monitor() -> EventLoopLagMonitor:
+    """The process-wide event loop lag monitor."""
+    return _LOOP_LAG_MONITOR
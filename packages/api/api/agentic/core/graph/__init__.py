@@ -1,4 +1,4 @@
-from .graph_extract import KnowledgeGraphExtractor
+from .graph_extract import KnowledgeGraphExtractor, split_text_windows
 from .graph_merge import KnowledgeGraphMerger
 from .schemas import ExtractedGraph
 
@@ -6,4 +6,5 @@ __all__ = [
     "KnowledgeGraphExtractor",
     "KnowledgeGraphMerger",
     "ExtractedGraph",
+    "split_text_windows",
 ]
@@ -1,10 +1,79 @@
+import asyncio
 import json
+import re
 from collections.abc import Awaitable
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
 from .schemas import DocumentEdgeBase, DocumentNodeBase, ExtractedGraph
 
 
+def split_text_windows(
+    text: str,
+    window_chars: int,
+    overlap_chars: int = 0,
+    pieces: Optional[list[str]] = None,
+) -> list[str]:
+    """
+    Split text into windows of at most `window_chars`, made of whole pieces.
+
+    Pieces are chunk texts when given, otherwise paragraphs; a piece longer
+    than a window is cut. Consecutive windows share trailing pieces of up to
+    `overlap_chars`, so entities at a boundary are seen in full at least once.
+    """
+    if pieces is None:
+        pieces = re.split(r"\n\s*\n", text)
+    parts = [
+        piece[start : start + window_chars]
+        for piece in pieces
+        if piece.strip()
+        for start in range(0, len(piece), window_chars)
+    ]
+
+    windows: list[str] = []
+    current: list[str] = []
+    size = 0
+    for part in parts:
+        if current and size + len(part) > window_chars:
+            windows.append("\n".join(current))
+            # Carry the trailing pieces that fit in the overlap
+            carried: list[str] = []
+            carried_size = 0
+            for previous in reversed(current):
+                if carried_size + len(previous) + 1 > overlap_chars:
+                    break
+                carried.insert(0, previous)
+                carried_size += len(previous) + 1
+            current, size = carried, carried_size
+            while current and size + len(part) > window_chars:
+                size -= len(current.pop(0)) + 1
+        current.append(part)
+        size += len(part) + 1
+    if current:
+        windows.append("\n".join(current))
+    return windows
+
+
+def _namespace_graph(kg: ExtractedGraph, prefix: str) -> ExtractedGraph:
+    """Prefix node IDs so graphs of different windows cannot collide."""
+    node_ids = {node.id for node in kg.nodes}
+    return ExtractedGraph(
+        nodes=[
+            node.model_copy(update={"id": f"{prefix}:{node.id}"}) for node in kg.nodes
+        ],
+        # Edges to nodes the LLM did not return cannot be merged
+        edges=[
+            edge.model_copy(
+                update={
+                    "source": f"{prefix}:{edge.source}",
+                    "target": f"{prefix}:{edge.target}",
+                }
+            )
+            for edge in kg.edges
+            if edge.source in node_ids and edge.target in node_ids
+        ],
+    )
+
+
 class KnowledgeGraphExtractor:
     def __init__(
         self,
@@ -79,6 +148,37 @@ class KnowledgeGraphExtractor:
             print(f"KnowledgeGraphExtractor: Error during KG extraction: {e}")
             return empty_kg
 
+    async def extract_windows(
+        self,
+        windows: list[str],
+        max_concurrency: int = 4,
+        limit_call: Optional[
+            Callable[[Awaitable[ExtractedGraph]], Awaitable[ExtractedGraph]]
+        ] = None,
+    ) -> list[ExtractedGraph]:
+        """
+        Extract a graph per text window concurrently, one LLM call each.
+
+        `limit_call` wraps each window's call, e.g. to hold a shared LLM
+        permit. Node IDs are prefixed with the window index so the graphs can
+        be merged; a failed window yields an empty graph.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def extract_window(index: int, window: str) -> ExtractedGraph:
+            async with semaphore:
+                call = self.extract(window)
+                kg = await (limit_call(call) if limit_call else call)
+            return _namespace_graph(kg, f"w{index}")
+
+        print(
+            f"KnowledgeGraphExtractor: Extracting {len(windows)} windows "
+            f"(concurrency {max_concurrency})..."
+        )
+        return await asyncio.gather(
+            *(extract_window(index, window) for index, window in enumerate(windows))
+        )
+
     def _extract_json_string(self, response_text: str) -> str:
         """Extract JSON code block from LLM response."""
         if "```json" in response_text:
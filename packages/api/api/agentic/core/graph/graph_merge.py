@@ -1,10 +1,43 @@
-from sklearn.neighbors import NearestNeighbors
+from typing import Callable, Optional
+
+import numpy as np
 
 from ..embedding.embedding import TextEmbedder
-from .schemas import DocumentEdgeBase, DocumentNodeBase, ExtractedGraph
+from .schemas import (
+    DocumentEdgeBase,
+    DocumentNodeBase,
+    ExtractedGraph,
+    IncrementalMergeResult,
+)
+
+
+def _find_roots(parent: np.ndarray) -> np.ndarray:
+    """Compress every path in place so each entry points at its root."""
+    while True:
+        grandparent = parent[parent]
+        if np.array_equal(grandparent, parent):
+            return parent
+        parent[:] = grandparent
+
+
+def _union_pairs(parent: np.ndarray, a: np.ndarray, b: np.ndarray) -> None:
+    """Union index pairs (a[i], b[i]); roots always point to a smaller index."""
+    while a.size:
+        _find_roots(parent)
+        root_a, root_b = parent[a], parent[b]
+        pending = root_a != root_b
+        if not pending.any():
+            return
+        a, b = a[pending], b[pending]
+        low = np.minimum(root_a[pending], root_b[pending])
+        high = np.maximum(root_a[pending], root_b[pending])
+        np.minimum.at(parent, high, low)
 
 
 class KnowledgeGraphMerger:
+    # Upper bound on similarity-matrix elements held at once (~64 MB as float32)
+    SIMILARITY_BLOCK_ELEMENTS = 16_000_000
+
     def __init__(self, encoder: TextEmbedder):
         """
         Initialize the merger with an encoder and similarity threshold.
@@ -17,44 +50,77 @@ class KnowledgeGraphMerger:
         """Normalize label for comparison."""
         return label.strip().lower()
 
+    def embed_labels(self, labels: list[str]) -> np.ndarray:
+        """Embed preprocessed labels into L2-normalized float32 rows."""
+        embeddings, failed = self.encoder.get_embeddings_batched(
+            [self._preprocess_label(label) for label in labels]
+        )
+        if failed:
+            raise ValueError(f"Failed to embed {len(failed)} node labels")
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
     def _build_canonical_map(
         self, label_to_id: dict[str, str], threshold: float
     ) -> dict[str, str]:
         """Group similar labels and pick canonical names."""
         labels = list(label_to_id.keys())
-        embeddings = self.encoder.get_embedding(
-            [self._preprocess_label(label) for label in labels]
-        )
+        if not labels:
+            return {}
+        embeddings = self.embed_labels(labels)
+        return self._canonical_map_from_embeddings(labels, embeddings, threshold)
 
-        n_neighbors = min(len(labels), 50)
-        nn = NearestNeighbors(metric="cosine", n_neighbors=n_neighbors)
-        nn.fit(embeddings)
+    def _canonical_map_from_embeddings(
+        self, labels: list[str], embeddings: np.ndarray, threshold: float
+    ) -> dict[str, str]:
+        """
+        Group labels whose embeddings are similar and pick canonical names.
+        Every pair above the threshold is found with a blocked matrix product
+        over normalized rows, so memory stays bounded by one block of
+        similarities, and pairs are joined in an array-backed union-find.
+        :param labels: Labels to group.
+        :param embeddings: One embedding row per label.
+        :param threshold: Cosine similarity threshold for grouping labels.
+        :return: Mapping of label -> canonical label.
+        """
+        n = len(labels)
+        if n == 0:
+            return {}
 
-        label_groups = {label: set([label]) for label in labels}
-        for i, label in enumerate(labels):
-            distances, indices = nn.kneighbors([embeddings[i]])
-            for dist, j in zip(distances[0], indices[0]):
-                score = 1 - dist  # cosine similarity
-                if score >= threshold:
-                    label_groups[label].add(labels[j])
-                    label_groups[labels[j]].add(label)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
 
-        visited = set()
-        canonical_map = {}
-        for label in labels:
-            if label in visited:
-                continue
-            stack, cluster = [label], set()
-            while stack:
-                label = stack.pop()
-                if label not in visited:
-                    visited.add(label)
-                    cluster.add(label)
-                    stack.extend(label_groups[label])
-            canonical = sorted(cluster, key=lambda x: (-x.count(" "), -len(x)))[0]
-            for label in cluster:
-                canonical_map[label] = canonical
-        return canonical_map
+        parent = np.arange(n)
+        block_size = max(1, min(n, self.SIMILARITY_BLOCK_ELEMENTS // n))
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            # Only the upper triangle is needed: columns from `start` onwards
+            similarities = embeddings[start:stop] @ embeddings[start:].T
+            hits = np.flatnonzero(similarities >= threshold)
+            rows, cols = np.divmod(hits, similarities.shape[1])
+            rows += start
+            cols += start
+            keep = rows < cols
+            _union_pairs(parent, rows[keep], cols[keep])
+
+        roots = _find_roots(parent)
+
+        # Canonical label per group: most words, then longest, then first seen
+        spaces = np.fromiter((label.count(" ") for label in labels), int, n)
+        lengths = np.fromiter((len(label) for label in labels), int, n)
+        order = np.lexsort((np.arange(n), -lengths, -spaces, roots))
+        sorted_roots = roots[order]
+        is_first = np.ones(n, dtype=bool)
+        is_first[1:] = sorted_roots[1:] != sorted_roots[:-1]
+        canonical_of_root = dict(
+            zip(sorted_roots[is_first].tolist(), order[is_first].tolist())
+        )
+
+        return {
+            label: labels[canonical_of_root[root]]
+            for label, root in zip(labels, roots.tolist())
+        }
 
     def _extract_label_maps(
         self,
@@ -78,6 +144,9 @@ class KnowledgeGraphMerger:
         """Merge knowledge graphs based on canonical labels."""
         merged_nodes, merged_edges = {}, []
         label_to_new_id = {}
+        aliases_of: dict[str, list[str]] = {}
+        for label, canonical in canonical_map.items():
+            aliases_of.setdefault(canonical, []).append(label)
 
         # Merge nodes
         for label, canonical in canonical_map.items():
@@ -87,9 +156,7 @@ class KnowledgeGraphMerger:
             if canonical not in label_to_new_id:
                 new_id = f"Canonical_{canonical.replace(' ', '_')}"
                 label_to_new_id[canonical] = new_id
-                aliases = sorted(
-                    label for label, c in canonical_map.items() if c == canonical
-                )
+                aliases = sorted(aliases_of[canonical])
                 data = id_to_data[original_id]
                 merged_nodes[new_id] = DocumentNodeBase(
                     id=new_id,
@@ -120,6 +187,98 @@ class KnowledgeGraphMerger:
 
         return ExtractedGraph(nodes=list(merged_nodes.values()), edges=merged_edges)
 
+    def merge_incremental(
+        self,
+        kg: ExtractedGraph,
+        find_nearest: Callable[[np.ndarray], list[Optional[tuple[str, float]]]],
+        threshold: float = 0.65,
+    ) -> IncrementalMergeResult:
+        """
+        Merge a graph into a persisted canonical-label index.
+        Only the incoming labels are embedded. Incoming labels are grouped among
+        themselves, then each group is mapped onto the most similar persisted
+        node (keeping its ID, and adding the group's labels to its aliases) or
+        becomes a new canonical node.
+        :param kg: The incoming graph, typically a single document's graph.
+        :param find_nearest: Looks up the (ID, similarity) of the most similar
+            persisted node for each row of normalized label embeddings, or None.
+        :param threshold: Similarity threshold for grouping labels.
+        :return: IncrementalMergeResult with the nodes and edges to upsert.
+        """
+        if not kg.nodes:
+            return IncrementalMergeResult()
+
+        label_to_id, id_to_data = self._extract_label_maps([kg])
+        labels = list(label_to_id.keys())
+        embeddings = self.embed_labels(labels)
+        label_to_row = {label: row for row, label in enumerate(labels)}
+        canonical_map = self._canonical_map_from_embeddings(
+            labels, embeddings, threshold
+        )
+
+        # Best persisted match for every incoming label
+        nearest = find_nearest(embeddings)
+
+        groups: dict[str, list[str]] = {}
+        for label, canonical in canonical_map.items():
+            groups.setdefault(canonical, []).append(label)
+
+        result = IncrementalMergeResult()
+        label_to_target: dict[str, str] = {}
+        for canonical, members in groups.items():
+            matches = [
+                nearest[label_to_row[label]]
+                for label in members
+                if nearest[label_to_row[label]] is not None
+            ]
+            target = None
+            if matches:
+                node_id, score = max(matches, key=lambda match: match[1])
+                if score >= threshold:
+                    target = node_id
+
+            if target is None:
+                target = f"Canonical_{canonical.replace(' ', '_')}"
+                data = id_to_data[label_to_id[canonical]]
+                result.new_nodes.append(
+                    DocumentNodeBase(
+                        id=target,
+                        label=canonical,
+                        type=data.get("type", "Unknown"),
+                        title=data.get("title", canonical),
+                        description=data.get("description", ""),
+                        aliases=sorted(members),
+                    )
+                )
+                result.new_node_embeddings.append(
+                    embeddings[label_to_row[canonical]].tolist()
+                )
+            else:
+                merged = result.matched_aliases.get(target, [])
+                result.matched_aliases[target] = sorted(set(merged) | set(members))
+
+            for label in members:
+                label_to_target[label] = target
+
+        for node in kg.nodes:
+            result.id_map[node.id] = label_to_target[node.label]
+
+        seen_edges = set()
+        for edge in kg.edges:
+            new_src = result.id_map.get(edge.source)
+            new_tgt = result.id_map.get(edge.target)
+            if new_src and new_tgt:
+                edge_key = (new_src, new_tgt, edge.label)
+                if edge_key not in seen_edges:
+                    seen_edges.add(edge_key)
+                    result.edges.append(
+                        DocumentEdgeBase(
+                            label=edge.label, source=new_src, target=new_tgt
+                        )
+                    )
+
+        return result
+
     def merge_kgs(
         self,
         kgs: list[ExtractedGraph],
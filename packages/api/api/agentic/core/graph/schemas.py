@@ -12,3 +12,25 @@ class ExtractedGraph(BaseModel):
     edges: list[DocumentEdgeBase] = Field(
         default_factory=list, description="List of edges in the knowledge graph"
     )
+
+
+class IncrementalMergeResult(BaseModel):
+    """Schema for the delta produced by merging a graph into a persisted index."""
+
+    id_map: dict[str, str] = Field(
+        default_factory=dict,
+        description="Incoming node ID to persisted node ID or new canonical node ID",
+    )
+    new_nodes: list[DocumentNodeBase] = Field(
+        default_factory=list, description="Canonical nodes not yet in the index"
+    )
+    new_node_embeddings: list[list[float]] = Field(
+        default_factory=list, description="Label embeddings of the new nodes"
+    )
+    matched_aliases: dict[str, list[str]] = Field(
+        default_factory=dict,
+        description="Persisted node ID to the incoming labels merged into it",
+    )
+    edges: list[DocumentEdgeBase] = Field(
+        default_factory=list, description="Deduplicated edges on the remapped IDs"
+    )
@@ -1,36 +1,73 @@
+import asyncio
+import functools
+import tempfile
+import threading
 import traceback
-from typing import Literal, Union
+from collections.abc import Awaitable, Iterator
+from concurrent.futures import Executor
+from typing import Any, Callable, Literal, Optional, Union
 
 from api.models.document import DocumentRelation
 
 from ....collection.schemas import (
-    CollectionEdgeCreate,
-    CollectionNodeCreate,
+    CollectionEdgeBase,
+    CollectionGraphNode,
     CollectionRelationCreate,
 )
 from ....collection.service import CollectionService
+from ....config import get_settings
+from ....database import advisory_lock
 from ....document.schemas import (
     ChunkCreate,
     DocumentEdgeBase,
-    DocumentEdgeCreate,
     DocumentNodeBase,
-    DocumentNodeCreate,
     DocumentRelationCreate,
     DocumentUpdate,
 )
 from ....document.service import DocumentService
 from ....models import Document, User, enum
-from ..embedding.embedding import TextEmbedder
-from ..graph import ExtractedGraph, KnowledgeGraphExtractor, KnowledgeGraphMerger
+from ..embedding.embedding import TextEmbedder, hash_text
+from ..executors import get_process_pool, get_streaming_pool, get_thread_pool
+from ..graph import (
+    ExtractedGraph,
+    KnowledgeGraphExtractor,
+    KnowledgeGraphMerger,
+    split_text_windows,
+)
 from .ingest_methods import (
+    TextSegment,
+    apply_ocr_pages,
     extract_chunks_from_pdf,
     extract_chunks_from_text,
+    extract_pdf,
     extract_text_from_image_file,
-    extract_text_from_pdf_file,
     extract_text_from_text_file,
+    iter_batches,
+    iter_pdf_pages,
+    iter_segment_chunks,
+    iter_text_file_blocks,
+    preprocess_content,
 )
-from .schemas import FileInput, document_details
+from .schemas import DocumentChunk, FileInput, document_details
 from .summary import SummaryGenerator
+from .typhoon_ocr.page_ocr import ocr_pages, ocr_pdf
+
+IMAGE_FILE_TYPES = {".jpg", ".jpeg", ".png", ".gif", ".tif", ".tiff"}
+# Postgres text values are limited to 1 GB; streamed text beyond this is not stored
+MAX_STORED_TEXT_BYTES = 512 * 1024 * 1024
+
+_MERGE_LOCKS_GUARD = threading.Lock()
+_COLLECTION_MERGE_LOCKS: dict[str, threading.Lock] = {}
+
+
+# Advisory lock namespace of collection graph merges, held across processes
+GRAPH_MERGE_LOCK = "collection_graph_merge"
+
+
+def _collection_merge_lock(collection_id: str) -> threading.Lock:
+    """Lock serializing graph merges into one collection within this process."""
+    with _MERGE_LOCKS_GUARD:
+        return _COLLECTION_MERGE_LOCKS.setdefault(collection_id, threading.Lock())
 
 
 class DocumentIngestor:
@@ -49,12 +86,21 @@ class DocumentIngestor:
         summary_generator: SummaryGenerator,
         chunk_size: int = 512,
         min_characters_per_chunk: int = 24,
+        embedding_batch_size: int = 256,
+        llm_semaphore: Optional[asyncio.Semaphore] = None,
+        cpu_executor: Optional[Executor] = None,
     ):
         """
         initialize the DocumentIngestor with necessary services and parameters.
+
+        `llm_semaphore` and `cpu_executor` are shared by ingestors running
+        concurrently to bound LLM calls and CPU-bound parsing/embedding.
         """
         self.chunk_size: int = chunk_size
         self.min_characters_per_chunk: int = min_characters_per_chunk
+        self.embedding_batch_size: int = embedding_batch_size
+        self.llm_semaphore = llm_semaphore
+        self.cpu_executor = cpu_executor
 
         # services
         self.collection_service = collection_service
@@ -64,6 +110,21 @@ class DocumentIngestor:
         self.kg_merger = kg_merger
         self.summary_generator = summary_generator
 
+    async def _call_llm(self, call: Awaitable[Any]) -> Any:
+        """Await an LLM-backed call, within the shared LLM concurrency limit if any."""
+        if self.llm_semaphore is None:
+            return await call
+        async with self.llm_semaphore:
+            return await call
+
+    async def _run_cpu(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run CPU-bound or blocking work on the CPU executor (shared pool if unset)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.cpu_executor or get_thread_pool(),
+            functools.partial(func, *args, **kwargs),
+        )
+
     async def extract_full_text(self, file_input: FileInput) -> str:
         """Extract full text from file input."""
         try:
@@ -72,13 +133,40 @@ class DocumentIngestor:
             )
 
             if file_input.type == ".pdf":
-                full_text = extract_text_from_pdf_file(
+                # Single pass: the page chunks are kept for chunk_and_embed
+                extraction = await self._run_cpu(
+                    extract_pdf,
                     file_input.content,
+                    file_name=file_input.name,
+                    chunk_size=self.chunk_size,
+                    min_characters_per_chunk=self.min_characters_per_chunk,
+                    executor=get_process_pool(),
                 )
+                if extraction.ocr_page_numbers:
+                    # Scanned pages have no text layer; OCR them concurrently
+                    print(
+                        f"Running OCR on {len(extraction.ocr_page_numbers)} pages "
+                        f"of {file_input.name}"
+                    )
+                    ocr_results = await ocr_pdf(
+                        file_input.content,
+                        extraction.ocr_page_numbers,
+                        limit_call=self._call_llm,
+                    )
+                    extraction = await self._run_cpu(
+                        apply_ocr_pages,
+                        extraction,
+                        ocr_results,
+                        file_name=file_input.name,
+                        chunk_size=self.chunk_size,
+                        min_characters_per_chunk=self.min_characters_per_chunk,
+                    )
+                file_input.chunks = extraction.chunks
+                full_text = extraction.full_text
 
-            elif file_input.type in {".jpg", ".jpeg", ".png", ".gif"}:
+            elif file_input.type in IMAGE_FILE_TYPES:
                 full_text = await extract_text_from_image_file(
-                    file_input.content,
+                    file_input.content, limit_call=self._call_llm
                 )
 
             else:
@@ -103,15 +191,20 @@ class DocumentIngestor:
         self, file_input: FileInput, document_id: str
     ) -> list[ChunkCreate]:
         """Parse file into chunks and generate embeddings."""
-        # Parse and chunk the file
-        if file_input.type == ".pdf":
+        # Parse and chunk the file, unless it was chunked during text extraction
+        if file_input.chunks is not None:
+            chunks = file_input.chunks
+
+        elif file_input.type == ".pdf":
             chunks = extract_chunks_from_pdf(
                 file_input.content,
                 file_name=file_input.name,
-                # embedding_model=self.text_embedder.model,
+                chunk_size=self.chunk_size,
+                min_characters_per_chunk=self.min_characters_per_chunk,
+                # embedding_model=self.text_embedder,
             )
 
-        elif file_input.type in {".jpg", ".jpeg", ".png", ".gif"}:
+        elif file_input.type in IMAGE_FILE_TYPES:
             chunks = extract_chunks_from_text(
                 file_input.full_text,
                 file_name=file_input.name,
@@ -122,51 +215,109 @@ class DocumentIngestor:
                 file_input.full_text,
                 file_name=file_input.name,
                 file_type=file_input.type,
-                # embedding_model=self.text_embedder.model,
+                # embedding_model=self.text_embedder,
             )
 
         if not chunks:
             print(f"No chunks extracted from {file_input.name}")
             return []
 
-        # Generate embeddings
-        embedded_chunks: list[ChunkCreate] = []
-        for chunk in chunks:
-            try:
-                embedding = self.text_embedder.get_embedding(text=chunk.chunk_text)
-                if embedding is not None:
-                    # Convert numpy array to list if needed
-                    embedding_list = (
-                        embedding.tolist()
-                        if hasattr(embedding, "tolist")
-                        else list(embedding)
-                    )
+        return self.embed_chunks(chunks, document_id, file_input.name)
 
-                    chunk_with_embedding = ChunkCreate(
-                        chunk_text=chunk.chunk_text,
-                        page_number=chunk.chunk_metadata.page_number,
-                        start_char=chunk.chunk_metadata.start_index,
-                        end_char=chunk.chunk_metadata.end_index,
-                        token_count=chunk.chunk_metadata.token_count,
-                        embedding=embedding_list,
-                        document_id=document_id,
-                    )
-                    embedded_chunks.append(chunk_with_embedding)
-            except Exception as e:
-                print(f"Error embedding chunk from {file_input.name}: {e}")
+    def embed_chunks(
+        self, chunks: list[DocumentChunk], document_id: str, file_name: str
+    ) -> list[ChunkCreate]:
+        """Embed chunks, reusing cached embeddings of previously seen texts."""
+        text_hashes = [hash_text(chunk.chunk_text) for chunk in chunks]
+        vectors = self._get_cached_chunk_embeddings(text_hashes)
+
+        # Encode each distinct uncached text once, in as few calls as possible
+        to_encode: dict[str, str] = {}
+        for chunk, text_hash in zip(chunks, text_hashes):
+            if text_hash not in vectors:
+                to_encode.setdefault(text_hash, chunk.chunk_text)
+
+        if to_encode:
+            miss_hashes = list(to_encode.keys())
+            embeddings, failed = self.text_embedder.get_embeddings_batched(
+                list(to_encode.values()),
+                batch_size=self.embedding_batch_size,
+            )
+            failed_indices = set(failed)
+            for index in failed:
+                print(f"Error embedding chunk text {index} from {file_name}")
+
+            # Single conversion of the whole matrix instead of one per chunk
+            encoded_hashes = [
+                text_hash
+                for index, text_hash in enumerate(miss_hashes)
+                if index not in failed_indices
+            ]
+            new_vectors = dict(zip(encoded_hashes, embeddings.tolist()))
+            vectors.update(new_vectors)
+            self._store_cached_chunk_embeddings(new_vectors)
+
+        embedded_chunks: list[ChunkCreate] = [
+            ChunkCreate(
+                chunk_text=chunk.chunk_text,
+                page_number=chunk.chunk_metadata.page_number,
+                start_char=chunk.chunk_metadata.start_index,
+                end_char=chunk.chunk_metadata.end_index,
+                token_count=chunk.chunk_metadata.token_count,
+                embedding=vectors[text_hash],
+                document_id=document_id,
+            )
+            for chunk, text_hash in zip(chunks, text_hashes)
+            if text_hash in vectors
+        ]
 
         print(
-            f"Successfully embedded {len(embedded_chunks)}/{len(chunks)} chunks from {file_input.name}"
+            f"Successfully embedded {len(embedded_chunks)}/{len(chunks)} chunks from {file_name} "
+            f"({len(chunks) - len(to_encode)} reused from cache or duplicates)"
         )
         return embedded_chunks
 
-    async def extract_knowledge_graph(self, full_text: str) -> ExtractedGraph:
-        """Extract knowledge graph from file content."""
+    def _get_cached_chunk_embeddings(self, text_hashes: list[str]) -> dict:
+        """Bulk lookup of cached chunk embeddings; a cache failure is a full miss."""
+        try:
+            return self.document_service.get_cached_embeddings(
+                model_name=self.text_embedder.model_name, text_hashes=text_hashes
+            )
+        except Exception as e:
+            print(f"Embedding cache lookup failed: {e}")
+            return {}
+
+    def _store_cached_chunk_embeddings(self, embeddings: dict) -> None:
+        """Store new chunk embeddings; failures only cost a future re-encode."""
+        try:
+            self.document_service.store_cached_embeddings(
+                model_name=self.text_embedder.model_name, embeddings=embeddings
+            )
+        except Exception as e:
+            print(f"Embedding cache store failed: {e}")
+
+    async def extract_knowledge_graph(
+        self, full_text: str, chunk_texts: Optional[list[str]] = None
+    ) -> ExtractedGraph:
+        """
+        Extract knowledge graph from file content.
+
+        Text longer than one extraction call is split into overlapping windows
+        (aligned to `chunk_texts` when given) that are extracted concurrently
+        and merged locally.
+        """
         if not full_text:
             print("No text content for knowledge graph extraction")
             return None
 
-        kg = await self.kg_extractor.extract(full_text=full_text)
+        settings = get_settings()
+        if (
+            settings.KG_WINDOWED_EXTRACTION
+            and len(full_text) > self.kg_extractor.text_limit
+        ):
+            kg = await self._extract_windowed_knowledge_graph(full_text, chunk_texts)
+        else:
+            kg = await self._call_llm(self.kg_extractor.extract(full_text=full_text))
         if kg and (kg.nodes or kg.edges):
             node_count = len(kg.nodes)
             edge_count = len(kg.edges)
@@ -176,16 +327,62 @@ class DocumentIngestor:
         print("No knowledge graph extracted")
         return None
 
+    async def _extract_windowed_knowledge_graph(
+        self, full_text: str, chunk_texts: Optional[list[str]]
+    ) -> ExtractedGraph:
+        settings = get_settings()
+        windows = split_text_windows(
+            full_text,
+            window_chars=min(settings.KG_WINDOW_CHARS, self.kg_extractor.text_limit),
+            overlap_chars=settings.KG_WINDOW_OVERLAP_CHARS,
+            pieces=chunk_texts,
+        )
+        if settings.KG_MAX_WINDOWS and len(windows) > settings.KG_MAX_WINDOWS:
+            print(
+                f"Extracting the knowledge graph from the first {settings.KG_MAX_WINDOWS} "
+                f"of {len(windows)} windows"
+            )
+            windows = windows[: settings.KG_MAX_WINDOWS]
+
+        # The permit is held per window call, not across the whole fan-out
+        graphs = await self.kg_extractor.extract_windows(
+            windows,
+            max_concurrency=settings.KG_WINDOW_CONCURRENCY,
+            limit_call=self._call_llm,
+        )
+        graphs = [kg for kg in graphs if kg.nodes]
+        if len(graphs) <= 1:
+            return graphs[0] if graphs else None
+        # Overlapping windows repeat entities; merge them by label similarity
+        return await self._run_cpu(self.kg_merger.merge_kgs, graphs)
+
+    def _graph_text_limit(self) -> int:
+        """Characters of a document that graph extraction can cover."""
+        settings = get_settings()
+        if settings.KG_WINDOWED_EXTRACTION and settings.KG_MAX_WINDOWS:
+            return max(
+                self.kg_extractor.text_limit,
+                settings.KG_WINDOW_CHARS * settings.KG_MAX_WINDOWS,
+            )
+        return self.kg_extractor.text_limit
+
     async def get_document_summary(
-        self, full_text: str, language: Literal["en", "th"] = "en"
+        self,
+        full_text: str,
+        language: Literal["en", "th"] = "en",
+        chunk_texts: Optional[list[str]] = None,
     ) -> document_details:
         """Generate a summary of the document."""
         if not full_text:
             print("No text content for summary generation")
             return document_details()
 
+        # The permit is held per LLM call, not across a map-reduce fan-out
         summary = await self.summary_generator.async_generate_summary(
-            full_text, language=language
+            full_text,
+            language=language,
+            chunk_texts=chunk_texts,
+            limit_call=self._call_llm,
         )
         return summary
 
@@ -203,6 +400,9 @@ class DocumentIngestorService(DocumentIngestor):
         summary_generator,
         chunk_size=512,
         min_characters_per_chunk=24,
+        embedding_batch_size=256,
+        llm_semaphore=None,
+        cpu_executor=None,
     ):
         super().__init__(
             collection_service,
@@ -213,6 +413,9 @@ class DocumentIngestorService(DocumentIngestor):
             summary_generator,
             chunk_size,
             min_characters_per_chunk,
+            embedding_batch_size,
+            llm_semaphore,
+            cpu_executor,
         )
 
     def _relation_to_graph(self, relation: DocumentRelation) -> ExtractedGraph:
@@ -228,25 +431,64 @@ class DocumentIngestorService(DocumentIngestor):
             ],
         )
 
+    async def merge_collection_knowledge_graph(
+        self, kg: ExtractedGraph, collection_id: str, user: User
+    ) -> Optional[ExtractedGraph]:
+        """Merge a graph into the collection off the event loop, one merge per collection at a time."""
+
+        def merge() -> Optional[ExtractedGraph]:
+            # The process lock keeps waiting threads from each holding a
+            # connection; the advisory lock serializes worker processes
+            with (
+                _collection_merge_lock(collection_id),
+                advisory_lock(GRAPH_MERGE_LOCK, collection_id),
+            ):
+                return self._merge_and_store_collection_knowledge_graph(
+                    kg=kg, collection_id=collection_id, user=user
+                )
+
+        return await self._run_cpu(merge)
+
     def _merge_and_store_collection_knowledge_graph(
         self,
         kg: ExtractedGraph,
         collection_id: str,
         user: User,
-    ) -> ExtractedGraph:
-        """Merge and store knowledge graph into the collection."""
+        incremental: bool = True,
+    ) -> Optional[ExtractedGraph]:
+        """
+        Merge and store knowledge graph into the collection.
+
+        In incremental mode only the incoming nodes are embedded and matched
+        against the persisted nodes in the database, and only new nodes and
+        edges are written; existing node IDs are kept. Returns the graph that
+        was written, with persisted node IDs, or None for an empty graph.
+        Otherwise the whole collection graph is re-merged and rewritten.
+        """
+        if not kg or not (kg.nodes or kg.edges):
+            print(f"No knowledge graph to merge into collection {collection_id}")
+            return None
+
+        # At most one relation per collection (unique collection_id)
         relations = self.collection_service.get_collection_relations(
             collection_id=collection_id
         )
 
-        # If somehow multiple relations exist, keep the first and remove extras (enforce invariant)
-        if relations and len(relations) > 1:
-            to_keep = relations[0]
-            for r in relations[1:]:
-                self.collection_service.delete_collection_relation(
-                    relation_id=r.id, user=user
+        if incremental:
+            if relations:
+                relation = relations[0]
+            else:
+                relation = self.collection_service.create_collection_relation(
+                    relation_data=CollectionRelationCreate(
+                        title=f"Relation for {collection_id}",
+                        description="Auto-generated relation",
+                        collection_id=collection_id,
+                    ),
+                    user=user,
                 )
-            relations = [to_keep]
+            return self._merge_into_collection_relation(
+                relation_id=relation.id, kg=kg, user=user
+            )
 
         if relations:
             # Load existing relation fully (with nodes & edges)
@@ -299,6 +541,81 @@ class DocumentIngestorService(DocumentIngestor):
 
             return kg
 
+    def _merge_into_collection_relation(
+        self,
+        relation_id: str,
+        kg: ExtractedGraph,
+        user: User,
+    ) -> ExtractedGraph:
+        """Incrementally merge a graph into a collection relation."""
+        # Nodes stored before label embeddings were persisted are embedded once
+        missing = self.collection_service.get_collection_nodes_without_embedding(
+            relation_id
+        )
+        if missing:
+            backfill = self.kg_merger.embed_labels([label for _, label in missing])
+            self.collection_service.set_collection_node_embeddings(
+                {
+                    node_id: embedding
+                    for (node_id, _), embedding in zip(missing, backfill.tolist())
+                }
+            )
+
+        delta = self.kg_merger.merge_incremental(
+            kg=kg,
+            find_nearest=lambda embeddings: (
+                self.collection_service.find_nearest_collection_nodes(
+                    relation_id, embeddings.tolist()
+                )
+            ),
+        )
+
+        id_map = self.collection_service.upsert_collection_graph(
+            relation_id=relation_id,
+            nodes=[
+                CollectionGraphNode(
+                    id=node.id,
+                    title=node.title,
+                    description=node.description,
+                    type=node.type,
+                    label=node.label,
+                    aliases=node.aliases,
+                )
+                for node in delta.new_nodes
+            ],
+            node_embeddings=delta.new_node_embeddings,
+            edges=[
+                CollectionEdgeBase(
+                    label=edge.label, source=edge.source, target=edge.target
+                )
+                for edge in delta.edges
+            ],
+            user=user,
+            added_aliases=delta.matched_aliases,
+        )
+
+        # Report the written graph under its persisted node IDs
+        new_nodes = [
+            node.model_copy(update={"id": id_map.get(node.id, node.id)})
+            for node in delta.new_nodes
+        ]
+        edges = [
+            edge.model_copy(
+                update={
+                    "source": id_map.get(edge.source, edge.source),
+                    "target": id_map.get(edge.target, edge.target),
+                }
+            )
+            for edge in delta.edges
+        ]
+
+        print(
+            f"Merged {len(kg.nodes)} nodes into relation {relation_id}: "
+            f"{len(new_nodes)} new nodes, {len(delta.matched_aliases)} matched "
+            f"nodes, {len(edges)} edges upserted"
+        )
+        return ExtractedGraph(nodes=new_nodes, edges=edges)
+
     async def _extract_and_store_knowledge_graph(
         self,
         full_text: str,
@@ -315,7 +632,8 @@ class DocumentIngestorService(DocumentIngestor):
             return None
 
         # Store the knowledge graph in the document system
-        document = self.store_document_knowledge_graph(
+        document = await self._run_cpu(
+            self.store_document_knowledge_graph,
             title=title,
             description=description,
             kg=kg,
@@ -336,34 +654,12 @@ class DocumentIngestorService(DocumentIngestor):
         user: User,
     ) -> Document:
         """Store the knowledge graph extracted from a file into the document system."""
-        # Mapping from old node ID to new node ID
-        id_map = {}
-
-        # Create nodes and map their new IDs
-        for node in kg.nodes:
-            node_data = DocumentNodeCreate(
-                id=node.id,
-                title=node.title,
-                description=node.description,
-                type=node.type,
-                label=node.label,
-                document_relation_id=relation.id,
-            )
-            new_node = self.document_service.create_document_node(
-                node_data=node_data, user=user
-            )
-            # Assume create_document_node returns the created node object with its new ID
-            id_map[node.id] = new_node.id
-
-        # Create edges using the new node IDs
-        for edge in kg.edges:
-            edge_data = DocumentEdgeCreate(
-                label=edge.label,
-                source=id_map[edge.source],  # Map old source ID to new ID
-                target=id_map[edge.target],  # Map old target ID to new ID
-                document_relation_id=relation.id,
-            )
-            self.document_service.create_document_edge(edge_data=edge_data, user=user)
+        self.document_service.bulk_create_document_graph(
+            relation_id=relation.id,
+            nodes=kg.nodes,
+            edges=kg.edges,
+            user=user,
+        )
 
         document = self.document_service.update_document(
             document_id=document_id,
@@ -380,36 +676,27 @@ class DocumentIngestorService(DocumentIngestor):
         user: User,
     ) -> None:
         """Store the knowledge graph extracted from a file into the collection system."""
-        # Mapping from old node ID to new node ID
-        id_map = {}
-
-        # Create nodes and map their new IDs
-        for node in kg.nodes:
-            node_data = CollectionNodeCreate(
-                id=node.id,
-                title=node.title,
-                description=node.description,
-                type=node.type,
-                label=node.label,
-                collection_relation_id=relation.id,
-            )
-            new_node = self.collection_service.create_collection_node(
-                node_data=node_data, user=user
-            )
-            # Assume create_collection_node returns the created node object with its new ID
-            id_map[node.id] = new_node.id
-
-        # Create edges using the new node IDs
-        for edge in kg.edges:
-            edge_data = CollectionEdgeCreate(
-                label=edge.label,
-                source=id_map[edge.source],  # Map old source ID to new ID
-                target=id_map[edge.target],  # Map old target ID to new ID
-                collection_relation_id=relation.id,
-            )
-            self.collection_service.create_collection_edge(
-                edge_data=edge_data, user=user
-            )
+        self.collection_service.bulk_create_collection_graph(
+            relation_id=relation.id,
+            nodes=[
+                CollectionGraphNode(
+                    id=node.id,
+                    title=node.title,
+                    description=node.description,
+                    type=node.type,
+                    label=node.label,
+                    aliases=node.aliases,
+                )
+                for node in kg.nodes
+            ],
+            edges=[
+                CollectionEdgeBase(
+                    label=edge.label, source=edge.source, target=edge.target
+                )
+                for edge in kg.edges
+            ],
+            user=user,
+        )
 
     def store_document_knowledge_graph(
         self,
@@ -436,6 +723,33 @@ class DocumentIngestorService(DocumentIngestor):
 
         return relation
 
+    async def _store_extracted_graph(
+        self,
+        kg: Optional[ExtractedGraph],
+        title: str,
+        full_text: str,
+        document: Document,
+        user: User,
+    ) -> None:
+        """Store an extracted graph on the document and merge it into the collection."""
+        if kg:
+            await self._run_cpu(
+                self.store_document_knowledge_graph,
+                title=title,
+                description=full_text[:200],
+                kg=kg,
+                document_id=document.id,
+                user=user,
+            )
+        else:
+            print(f"Failed to extract knowledge graph for {title}")
+
+        await self.merge_collection_knowledge_graph(
+            kg=kg,
+            collection_id=document.collection_id,
+            user=user,
+        )
+
     async def ingest_file(
         self,
         input_file: Union[str, FileInput],
@@ -446,14 +760,16 @@ class DocumentIngestorService(DocumentIngestor):
         """
         Ingest a single file: extract text, generate knowledge graph, chunk, embed, and store.
 
+        Summary, chunk embedding and knowledge graph extraction only depend on
+        the full text, so they run concurrently; their results are stored once
+        all of them have finished. Stages that succeeded are kept when another
+        one fails, and the document is then marked as failed.
+
         Args:
-            db_session: Database session
             input_file: File path (str) or FileInput model instance
-            collection_id: Collection UUID string
+            document: Document record to ingest into
+            graph_extract: Whether to extract a knowledge graph
             user: User model instance
-
-        Returns:
-            Document: The created document record
         """
         try:
             # update document status to processing
@@ -463,15 +779,47 @@ class DocumentIngestorService(DocumentIngestor):
                 user=user,
             )
 
-            # extract document summary
             full_text = await self.extract_full_text(input_file)
             print(
                 f"Extracted full text from {input_file.name}: {len(full_text)} characters"
             )
             input_file.full_text = full_text
-            document_summary = await self.get_document_summary(
-                full_text=input_file.full_text, language="en"
+
+            vectorize = not document.is_vectorized
+            extract_graph = graph_extract and not document.is_graph_extracted
+
+            chunk_texts = (
+                [chunk.chunk_text for chunk in input_file.chunks]
+                if input_file.chunks
+                else None
+            )
+            # Independent stages: summary (LLM), chunk+embed (CPU), graph (LLM)
+            document_summary, embedded_chunks, kg = await asyncio.gather(
+                self.get_document_summary(
+                    full_text=full_text, language="en", chunk_texts=chunk_texts
+                ),
+                self._run_cpu(
+                    self.chunk_and_embed,
+                    file_input=input_file,
+                    document_id=document.id,
+                )
+                if vectorize
+                else asyncio.sleep(0, result=[]),
+                self.extract_knowledge_graph(full_text, chunk_texts=chunk_texts)
+                if extract_graph
+                else asyncio.sleep(0, result=None),
+                return_exceptions=True,
             )
+
+            stage_errors = [
+                result
+                for result in (document_summary, embedded_chunks, kg)
+                if isinstance(result, BaseException)
+            ]
+
+            # get_document_summary falls back to empty details on LLM errors
+            if isinstance(document_summary, BaseException):
+                document_summary = document_details()
             self.document_service.update_document(
                 document_id=document.id,
                 update_data=DocumentUpdate(
@@ -485,42 +833,34 @@ class DocumentIngestorService(DocumentIngestor):
                 f"Document summary extracted for {input_file.name}: {document_summary.title} {document_summary.description[:100]}..."
             )
 
-            # Extract and store vector chunks if not already done
-            if not document.is_vectorized:
-                embedded_chunks = self.chunk_and_embed(
-                    file_input=input_file, document_id=document.id
+            # Store vector chunks
+            if embedded_chunks and not isinstance(embedded_chunks, BaseException):
+                await self._run_cpu(
+                    self.document_service.bulk_create_chunks,
+                    chunks_data=embedded_chunks,
+                    user=user,
                 )
-                if embedded_chunks:
-                    for chunk in embedded_chunks:
-                        self.document_service.create_chunk(
-                            chunk_data=chunk,
-                            user=user,
-                        )
-
-                    document = self.document_service.update_document(
-                        document_id=document.id,
-                        update_data=DocumentUpdate(is_vectorized=True),
-                        user=user,
-                    )
 
-            # Extract knowledge graph if not already done (Optional)
-            if not document.is_graph_extracted and graph_extract:
-                kg = await self._extract_and_store_knowledge_graph(
-                    full_text=input_file.full_text,
-                    title=input_file.name,
-                    description=input_file.full_text[:200],
+                document = self.document_service.update_document(
                     document_id=document.id,
+                    update_data=DocumentUpdate(is_vectorized=True),
                     user=user,
                 )
-                if not kg:
-                    print(f"Failed to extract knowledge graph for {input_file.name}")
 
-                self._merge_and_store_collection_knowledge_graph(
+            # Store the knowledge graph and merge it into the collection (Optional)
+            if extract_graph and not isinstance(kg, BaseException):
+                await self._store_extracted_graph(
                     kg=kg,
-                    collection_id=document.collection_id,
+                    title=input_file.name,
+                    full_text=full_text,
+                    document=document,
                     user=user,
                 )
 
+            # Results of the successful stages are kept; a retry redoes the rest
+            if stage_errors:
+                raise stage_errors[0]
+
             print(f"Finished processing {input_file.name}")
 
             # update status to completed
@@ -540,3 +880,293 @@ class DocumentIngestorService(DocumentIngestor):
                 user=user,
             )
             raise e
+
+    async def ingest_duplicate(
+        self,
+        source: Document,
+        document: Document,
+        graph_extract: bool,
+        user: User,
+    ) -> None:
+        """
+        Ingest a document whose content was already ingested as `source`.
+
+        The text, summary, chunk embeddings and, when `graph_extract` is set,
+        the graph are cloned, so no LLM or embedding calls are made. The graph
+        is merged into the collection only when the source is in another
+        collection, and only extracted when the source has none.
+        """
+        try:
+            self.document_service.update_document(
+                document_id=document.id,
+                update_data=DocumentUpdate(status=enum.IngestionStatus.processing),
+                user=user,
+            )
+
+            cloned = await self._run_cpu(
+                self.document_service.clone_document_content,
+                source_document_id=source.id,
+                document_id=document.id,
+                user=user,
+            )
+            print(f"Reused ingested content of {source.id} for {document.file_name}")
+
+            relations = (
+                self.document_service.get_document_relations(source.id)
+                if graph_extract
+                else []
+            )
+            if source.is_graph_extracted and relations:
+                relation = self.document_service.get_document_relation(relations[0].id)
+                kg = self._relation_to_graph(relation)
+                await self._run_cpu(
+                    self.store_document_knowledge_graph,
+                    title=relation.title,
+                    description=relation.description,
+                    kg=kg,
+                    document_id=document.id,
+                    user=user,
+                )
+                if source.collection_id != document.collection_id:
+                    await self.merge_collection_knowledge_graph(
+                        kg=kg, collection_id=document.collection_id, user=user
+                    )
+            elif graph_extract:
+                kg = await self.extract_knowledge_graph(cloned.document or "")
+                await self._store_extracted_graph(
+                    kg=kg,
+                    title=document.file_name,
+                    full_text=cloned.document or "",
+                    document=document,
+                    user=user,
+                )
+
+            self.document_service.update_document(
+                document_id=document.id,
+                update_data=DocumentUpdate(status=enum.IngestionStatus.ready),
+                user=user,
+            )
+
+        except Exception as e:
+            print(f"Error reusing ingested content for {document.file_name}: {e}")
+            traceback.print_exc()
+            self.document_service.update_document(
+                document_id=document.id,
+                update_data=DocumentUpdate(status=enum.IngestionStatus.failed),
+                user=user,
+            )
+            raise e
+
+    def _stream_text_and_chunks(
+        self,
+        input_file: FileInput,
+        document_id: str,
+        vectorize: bool,
+        text_limit: int,
+        user: User,
+        loop: asyncio.AbstractEventLoop,
+    ) -> tuple[str, int]:
+        """
+        Read a spooled file one page (or text block) at a time.
+
+        Embedded chunks are stored in bounded batches as they are produced,
+        and the text is spooled to a temp file and stored with one write at
+        the end; PDF pages without a text layer are OCRed on `loop` as they
+        are reached, so this must not run on the pool OCR uses. Returns the
+        leading `text_limit` characters, for the LLM stages, and the number
+        of stored chunks.
+        """
+        settings = get_settings()
+        is_pdf = input_file.type == ".pdf"
+
+        def ocr_page(page_number: int, image: bytes) -> str:
+            pages = asyncio.run_coroutine_threadsafe(
+                ocr_pages([page_number], lambda _: image, limit_call=self._call_llm),
+                loop,
+            ).result()
+            return pages[0].text
+
+        if is_pdf:
+            segments = iter_pdf_pages(
+                input_file.content, ocr_page=ocr_page, dpi=settings.OCR_RENDER_DPI
+            )
+        else:
+            segments = iter_text_file_blocks(input_file.content)
+
+        head_parts: list[str] = []
+        head_length = 0
+        pending_text: list[str] = []
+        pending_length = 0
+        spooled_bytes = 0
+
+        def flush_text() -> None:
+            nonlocal pending_text, pending_length, spooled_bytes
+            if pending_text:
+                data = preprocess_content("".join(pending_text)).encode("utf-8")
+                if spooled_bytes + len(data) <= MAX_STORED_TEXT_BYTES:
+                    text_spool.write(data)
+                    spooled_bytes += len(data)
+                elif spooled_bytes < MAX_STORED_TEXT_BYTES:
+                    print(
+                        f"Text of {input_file.name} exceeds {MAX_STORED_TEXT_BYTES} "
+                        "bytes; storing the leading part"
+                    )
+                    spooled_bytes = MAX_STORED_TEXT_BYTES
+                pending_text, pending_length = [], 0
+
+        def record_text(segments: Iterator[TextSegment]) -> Iterator[TextSegment]:
+            nonlocal head_length, pending_length
+            for segment in segments:
+                text = segment[2] + "\n" if is_pdf else segment[2]
+                if head_length < text_limit:
+                    head_parts.append(text[: text_limit - head_length])
+                    head_length += len(head_parts[-1])
+                pending_text.append(text)
+                pending_length += len(text)
+                if pending_length >= settings.STREAMING_INGEST_TEXT_FLUSH_CHARS:
+                    flush_text()
+                yield segment
+
+        chunk_count = 0
+        # Rewriting the stored text per flush would cost quadratic TOAST writes
+        with tempfile.TemporaryFile() as text_spool:
+            if vectorize:
+                chunks = iter_segment_chunks(
+                    record_text(segments),
+                    file_name=input_file.name,
+                    file_type=input_file.type,
+                    chunk_size=self.chunk_size,
+                    min_characters_per_chunk=self.min_characters_per_chunk,
+                )
+                for batch in iter_batches(
+                    chunks, settings.STREAMING_INGEST_BATCH_CHUNKS
+                ):
+                    embedded_chunks = self.embed_chunks(
+                        batch, document_id, input_file.name
+                    )
+                    self.document_service.bulk_create_chunks(
+                        chunks_data=embedded_chunks, user=user
+                    )
+                    chunk_count += len(embedded_chunks)
+            else:
+                for _ in record_text(segments):
+                    pass
+            flush_text()
+
+            text_spool.seek(0)
+            self.document_service.set_document_text(
+                document_id, text_spool.read().decode("utf-8").strip()
+            )
+
+        return preprocess_content("".join(head_parts)).strip(), chunk_count
+
+    async def ingest_file_streaming(
+        self,
+        input_file: FileInput,
+        document: Document,
+        graph_extract: bool,
+        user: User,
+    ) -> None:
+        """
+        Ingest a large file spooled to disk without holding it in memory.
+
+        Pages are read, chunked, embedded and stored in bounded batches; only
+        the leading text needed by the summary and graph stages is kept.
+        Images, and content that is not a local path, use `ingest_file`.
+        """
+        if not input_file.is_path or input_file.type in IMAGE_FILE_TYPES:
+            return await self.ingest_file(input_file, document, graph_extract, user)
+
+        try:
+            # Clear the text of an earlier attempt until this one stores it
+            self.document_service.update_document(
+                document_id=document.id,
+                update_data=DocumentUpdate(
+                    status=enum.IngestionStatus.processing, document=""
+                ),
+                user=user,
+            )
+
+            vectorize = not document.is_vectorized
+            extract_graph = graph_extract and not document.is_graph_extracted
+            text_limit = max(
+                self.summary_generator.max_input_chars,
+                self._graph_text_limit() if extract_graph else 0,
+            )
+
+            # Not on the CPU executor: the stream blocks on OCR, which needs it
+            loop = asyncio.get_running_loop()
+            head_text, chunk_count = await loop.run_in_executor(
+                get_streaming_pool(),
+                functools.partial(
+                    self._stream_text_and_chunks,
+                    input_file,
+                    document.id,
+                    vectorize,
+                    text_limit,
+                    user,
+                    loop,
+                ),
+            )
+            input_file.full_text = head_text
+            print(f"Streamed {input_file.name}: {chunk_count} chunks stored")
+
+            if chunk_count:
+                document = self.document_service.update_document(
+                    document_id=document.id,
+                    update_data=DocumentUpdate(is_vectorized=True),
+                    user=user,
+                )
+
+            document_summary, kg = await asyncio.gather(
+                self.get_document_summary(full_text=head_text, language="en"),
+                self.extract_knowledge_graph(head_text)
+                if extract_graph
+                else asyncio.sleep(0, result=None),
+                return_exceptions=True,
+            )
+            stage_errors = [
+                result
+                for result in (document_summary, kg)
+                if isinstance(result, BaseException)
+            ]
+
+            if isinstance(document_summary, BaseException):
+                document_summary = document_details()
+            self.document_service.update_document(
+                document_id=document.id,
+                update_data=DocumentUpdate(
+                    title=document_summary.title,
+                    description=document_summary.description,
+                ),
+                user=user,
+            )
+
+            if extract_graph and not isinstance(kg, BaseException):
+                await self._store_extracted_graph(
+                    kg=kg,
+                    title=input_file.name,
+                    full_text=head_text,
+                    document=document,
+                    user=user,
+                )
+
+            if stage_errors:
+                raise stage_errors[0]
+
+            print(f"Finished processing {input_file.name}")
+            self.document_service.update_document(
+                document_id=document.id,
+                update_data=DocumentUpdate(status=enum.IngestionStatus.ready),
+                user=user,
+            )
+
+        except Exception as e:
+            print(f"Error ingesting file {input_file.name}: {e}")
+            traceback.print_exc()
+            self.document_service.update_document(
+                document_id=document.id,
+                update_data=DocumentUpdate(status=enum.IngestionStatus.failed),
+                user=user,
+            )
+            raise e
@@ -1,5 +1,14 @@
+import codecs
+import mmap
+import os
 import re
-from typing import Optional, Union
+import tempfile
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Optional, TypeVar, Union
 
 import fitz  # PyMuPDF
 from chonkie import (
@@ -12,8 +21,24 @@ from chonkie import (
     SentenceTransformerEmbeddings,
 )
 
-from .schemas import ChunkMetadata, DocumentChunk
-from .typhoon_ocr.ocr_utils import ocr_image_document
+from ..embedding.embedding import TextEmbedder
+from .schemas import ChunkMetadata, DocumentChunk, PdfExtraction
+from .typhoon_ocr.page_ocr import (
+    CallLimit,
+    OcrPage,
+    join_ocr_pages,
+    ocr_image_pages,
+    page_needs_ocr,
+    render_pdf_page,
+)
+
+# Minimum pages per process-pool task; PDFs up to this size are extracted in
+# the caller
+PDF_MIN_PAGES_PER_TASK = 16
+
+# Streaming extraction yields (page number, char offset, raw text) segments
+TextSegment = tuple[Optional[int], int, str]
+T = TypeVar("T")
 
 
 def _normalize_file_type(file_type: str) -> str:
@@ -23,6 +48,136 @@ def _normalize_file_type(file_type: str) -> str:
     return file_type.lower()
 
 
+ChunkerEmbeddingModel = Union[
+    str, SentenceTransformerEmbeddings, Model2VecEmbeddings, TextEmbedder
+]
+
+
+class ChunkerRegistry:
+    """
+    Thread-safe cache of initialized chunkers.
+
+    Chunkers are keyed by (chunker type, chunk_size, min_characters_per_chunk,
+    embedding model). A chunker is lent to one thread at a time; concurrent
+    callers with the same key get another cached instance, or a new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle: dict[tuple, list] = defaultdict(list)
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def _model_key(embedding_model: Optional[ChunkerEmbeddingModel]):
+        if embedding_model is None or isinstance(embedding_model, str):
+            return embedding_model
+        if isinstance(embedding_model, TextEmbedder):
+            return f"{embedding_model.backend}:{embedding_model.model_name}"
+        return id(embedding_model)
+
+    def _key(
+        self,
+        chunk_size: int,
+        min_characters_per_chunk: int,
+        embedding_model: Optional[ChunkerEmbeddingModel],
+    ) -> tuple:
+        chunker_type = "recursive" if embedding_model is None else "late"
+        return (
+            chunker_type,
+            chunk_size,
+            min_characters_per_chunk,
+            self._model_key(embedding_model),
+        )
+
+    @staticmethod
+    def _build(
+        chunk_size: int,
+        min_characters_per_chunk: int,
+        embedding_model: Optional[ChunkerEmbeddingModel],
+    ) -> Union[RecursiveChunker, LateChunker]:
+        if embedding_model is None:
+            return RecursiveChunker(
+                chunk_size=chunk_size, min_characters_per_chunk=min_characters_per_chunk
+            )
+
+        if isinstance(embedding_model, TextEmbedder):
+            if embedding_model.backend == "sentence_transformer":
+                # Reuse the already-loaded model instead of loading it a second time
+                embedding_model = SentenceTransformerEmbeddings(embedding_model.model)
+            else:
+                # Late chunking needs token embeddings, which a static model
+                # (the model2vec default) does not have
+                print(
+                    f"Warning: late chunking cannot reuse the {embedding_model.backend} "
+                    f"model {embedding_model.model_name}; loading it by name"
+                )
+                embedding_model = embedding_model.model_name
+
+        return LateChunker(
+            embedding_model=embedding_model,
+            chunk_size=chunk_size,
+            min_characters_per_chunk=min_characters_per_chunk,
+        )
+
+    @contextmanager
+    def acquire(
+        self,
+        chunk_size: int = 512,
+        min_characters_per_chunk: int = 24,
+        embedding_model: Optional[ChunkerEmbeddingModel] = None,
+    ) -> Iterator[Union[RecursiveChunker, LateChunker]]:
+        """Borrow a chunker for the given configuration."""
+        key = self._key(chunk_size, min_characters_per_chunk, embedding_model)
+        with self._lock:
+            idle = self._idle[key]
+            chunker = idle.pop() if idle else None
+            if chunker is None:
+                self.created += 1
+            else:
+                self.reused += 1
+
+        if chunker is None:
+            chunker = self._build(chunk_size, min_characters_per_chunk, embedding_model)
+
+        try:
+            yield chunker
+        finally:
+            with self._lock:
+                self._idle[key].append(chunker)
+
+    def warmup(
+        self,
+        chunk_size: int = 512,
+        min_characters_per_chunk: int = 24,
+        embedding_model: Optional[ChunkerEmbeddingModel] = None,
+    ) -> None:
+        """Build and exercise a chunker so the first request does not pay for it."""
+        with self.acquire(chunk_size, min_characters_per_chunk, embedding_model) as c:
+            c(text="warm up", show_progress=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "configurations": len(self._idle),
+                "idle_chunkers": sum(len(idle) for idle in self._idle.values()),
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+
+_CHUNKER_REGISTRY = ChunkerRegistry()
+
+
+def get_chunker_registry() -> ChunkerRegistry:
+    """The process-wide chunker registry."""
+    return _CHUNKER_REGISTRY
+
+
 def _chunk_text(
     text: str,
     file_name: str,
@@ -30,9 +185,8 @@ def _chunk_text(
     chunk_size: int = 512,
     min_characters_per_chunk: int = 24,
     page_number: Optional[int] = None,
-    embedding_model: Optional[
-        Union[str, SentenceTransformerEmbeddings, Model2VecEmbeddings]
-    ] = None,
+    embedding_model: Optional[ChunkerEmbeddingModel] = None,
+    char_offset: int = 0,
 ) -> list[DocumentChunk]:
     """Create chunks from text using consistent chunking logic."""
     if not text.strip():
@@ -40,26 +194,17 @@ def _chunk_text(
 
     document_chunks: list[LateChunk] | list[RecursiveChunk] | list[SemanticChunk]
 
-    if embedding_model:
-        chunker = LateChunker(
-            embedding_model=embedding_model,
-            chunk_size=chunk_size,
-            min_characters_per_chunk=min_characters_per_chunk,
-        )
-
-    else:
-        chunker = RecursiveChunker(
-            chunk_size=chunk_size, min_characters_per_chunk=min_characters_per_chunk
-        )
-
-    document_chunks = chunker(text=text, show_progress=False)
+    with _CHUNKER_REGISTRY.acquire(
+        chunk_size, min_characters_per_chunk, embedding_model or None
+    ) as chunker:
+        document_chunks = chunker(text=text, show_progress=False)
 
     chunk_documents = []
 
     for chunk in document_chunks:
         metadata = ChunkMetadata(
-            start_index=chunk.start_index,
-            end_index=chunk.end_index,
+            start_index=chunk.start_index + char_offset,
+            end_index=chunk.end_index + char_offset,
             token_count=chunk.token_count,
             level=chunk.level,
         )
@@ -85,63 +230,250 @@ def preprocess_content(
     return re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]", "", content)
 
 
-def extract_chunks_from_pdf(
-    file_input: Union[str, bytes],
+def _open_pdf(file_input: Union[str, bytes]) -> fitz.Document:
+    """Open a PDF from a path or bytes."""
+    if isinstance(file_input, str):
+        # File path
+        return fitz.open(file_input)
+    if isinstance(file_input, bytes):
+        # Validate that bytes content is not empty
+        if not file_input:
+            raise ValueError("PDF bytes content is empty")
+        return fitz.open(stream=file_input, filetype="pdf")
+    raise TypeError("file_input must be a string (path) or bytes.")
+
+
+def _extract_pdf_pages(
+    doc: fitz.Document,
     file_name: str,
-    chunk_size: int = 512,
-    min_characters_per_chunk: int = 24,
-    embedding_model: Optional[Union[str, SentenceTransformerEmbeddings]] = None,
-) -> list[DocumentChunk]:
-    """Extract and chunk text from a PDF file."""
-    try:
-        if isinstance(file_input, str):
-            # File path
-            doc = fitz.open(file_input)
-        elif isinstance(file_input, bytes):
-            # Validate that bytes content is not empty
-            if not file_input:
-                raise ValueError("PDF bytes content is empty")
-            doc = fitz.open(stream=file_input, filetype="pdf")
-        else:
-            raise TypeError("file_input must be a string (path) or bytes.")
-    except Exception as e:
-        print(f"Error opening PDF {file_name}: {e}")
-        return []
+    start: int,
+    stop: int,
+    chunk_size: int,
+    min_characters_per_chunk: int,
+    embedding_model: Optional[ChunkerEmbeddingModel] = None,
+) -> tuple[list[str], list[DocumentChunk], list[int]]:
+    """
+    Extract the raw text and chunks of pages [start, stop) of an open PDF,
+    and the 1-based numbers of the pages among them that need OCR.
+    """
+    page_texts = []
+    chunk_list = []
+    ocr_page_numbers = []
+    for page_num in range(start, stop):
+        page = doc.load_page(page_num)
+        page_text = page.get_text()
+        page_texts.append(page_text)
+        if page_needs_ocr(page, page_text):
+            ocr_page_numbers.append(page_num + 1)
+
+        page_text = preprocess_content(page_text)
+        if not page_text.strip():
+            print(f"No text extracted from page {page_num + 1} of {file_name}")
+            continue
+
+        chunk_list.extend(
+            _chunk_text(
+                page_text,
+                file_name,
+                _normalize_file_type(".pdf"),
+                chunk_size,
+                min_characters_per_chunk,
+                page_number=page_num + 1,  # Page numbers are 1-based
+                embedding_model=embedding_model,
+            )
+        )
+    return page_texts, chunk_list, ocr_page_numbers
 
+
+def _extract_pdf_page_range(
+    file_path: str,
+    file_name: str,
+    start: int,
+    stop: int,
+    chunk_size: int,
+    min_characters_per_chunk: int,
+) -> tuple[list[str], list[DocumentChunk], list[int]]:
+    """Process-pool task: open the PDF independently and extract a page range."""
+    doc = _open_pdf(file_path)
     try:
-        chunk_list = []
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            page_text = page.get_text()
-            if page_text:
-                page_text = preprocess_content(page_text)
+        return _extract_pdf_pages(
+            doc, file_name, start, stop, chunk_size, min_characters_per_chunk
+        )
+    finally:
+        doc.close()
 
-                if not page_text.strip():
-                    print(f"No text extracted from page {page_num + 1} of {file_name}")
-                    continue
 
-                normalized_type = _normalize_file_type(".pdf")
+def _pdf_task_ranges(page_count: int, executor: Executor) -> list[tuple[int, int]]:
+    """Page ranges of about one task per worker, of at least PDF_MIN_PAGES_PER_TASK."""
+    workers = getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+    pages_per_task = max(PDF_MIN_PAGES_PER_TASK, -(-page_count // workers))
+    return [
+        (start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+
+
+@contextmanager
+def _pdf_path(file_input: Union[str, bytes]) -> Iterator[str]:
+    """A path to the PDF; bytes are spooled to a temp file for the call."""
+    if isinstance(file_input, str):
+        yield file_input
+        return
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as spooled:
+        spooled.write(file_input)
+        spooled.flush()
+        yield spooled.name
+
 
-                chunks = _chunk_text(
-                    page_text,
+def extract_pdf(
+    file_input: Union[str, bytes],
+    file_name: str,
+    chunk_size: int = 512,
+    min_characters_per_chunk: int = 24,
+    embedding_model: Optional[ChunkerEmbeddingModel] = None,
+    executor: Optional[Executor] = None,
+) -> PdfExtraction:
+    """
+    Extract the full text and per-page chunks of a PDF in a single pass.
+
+    With an executor (a process pool), PDFs longer than PDF_MIN_PAGES_PER_TASK
+    pages are split into about one page range per worker, extracted in
+    parallel. Tasks are sent the path of the PDF, spooled to disk once if
+    given as bytes, and each opens it itself, since open documents cannot be
+    shared across processes. Late chunking with an embedding model always
+    runs in the caller.
+    """
+    doc = _open_pdf(file_input)
+    try:
+        page_count = len(doc)
+        results = None
+        if (
+            executor is None
+            or embedding_model is not None
+            or page_count <= PDF_MIN_PAGES_PER_TASK
+        ):
+            results = [
+                _extract_pdf_pages(
+                    doc,
                     file_name,
-                    normalized_type,
+                    0,
+                    page_count,
                     chunk_size,
                     min_characters_per_chunk,
-                    page_number=page_num + 1,  # Page numbers are 1-based
-                    embedding_model=embedding_model,
+                    embedding_model,
                 )
-
-                if chunks:
-                    chunk_list.extend(chunks)
-
+            ]
     finally:
         doc.close()
 
-    if not chunk_list:
+    if results is None:
+        with _pdf_path(file_input) as path:
+            futures = [
+                executor.submit(
+                    _extract_pdf_page_range,
+                    path,
+                    file_name,
+                    start,
+                    stop,
+                    chunk_size,
+                    min_characters_per_chunk,
+                )
+                for start, stop in _pdf_task_ranges(page_count, executor)
+            ]
+            results = [future.result() for future in futures]
+
+    page_texts = [text for texts, _, _ in results for text in texts]
+    return PdfExtraction(
+        full_text=_join_pdf_page_texts(page_texts),
+        chunks=[chunk for _, chunks, _ in results for chunk in chunks],
+        page_count=page_count,
+        page_texts=page_texts,
+        ocr_page_numbers=[number for _, _, numbers in results for number in numbers],
+    )
+
+
+def _join_pdf_page_texts(page_texts: list[str]) -> str:
+    full_text = "".join(text + "\n" for text in page_texts)
+    return preprocess_content(full_text.strip())
+
+
+def apply_ocr_pages(
+    extraction: PdfExtraction,
+    ocr_results: list[OcrPage],
+    file_name: str,
+    chunk_size: int = 512,
+    min_characters_per_chunk: int = 24,
+) -> PdfExtraction:
+    """Merge OCRed pages into a PDF extraction, keeping text and chunks in page order."""
+    ocr_texts = {
+        page.page_number: preprocess_content(page.text)
+        for page in ocr_results
+        if page.text.strip()
+    }
+    if not ocr_texts:
+        return extraction
+
+    page_texts = list(extraction.page_texts)
+    chunks = [
+        chunk
+        for chunk in extraction.chunks
+        if chunk.chunk_metadata.page_number not in ocr_texts
+    ]
+    for page_number, text in ocr_texts.items():
+        page_texts[page_number - 1] = text
+        chunks.extend(
+            _chunk_text(
+                text,
+                file_name,
+                _normalize_file_type(".pdf"),
+                chunk_size,
+                min_characters_per_chunk,
+                page_number=page_number,
+            )
+        )
+    # sorted() is stable, so chunks keep their order within a page
+    chunks = sorted(chunks, key=lambda chunk: chunk.chunk_metadata.page_number)
+
+    return extraction.model_copy(
+        update={
+            "full_text": _join_pdf_page_texts(page_texts),
+            "chunks": chunks,
+            "page_texts": page_texts,
+            "ocr_page_numbers": [
+                number
+                for number in extraction.ocr_page_numbers
+                if number not in ocr_texts
+            ],
+        }
+    )
+
+
+def extract_chunks_from_pdf(
+    file_input: Union[str, bytes],
+    file_name: str,
+    chunk_size: int = 512,
+    min_characters_per_chunk: int = 24,
+    embedding_model: Optional[ChunkerEmbeddingModel] = None,
+    executor: Optional[Executor] = None,
+) -> list[DocumentChunk]:
+    """Extract and chunk text from a PDF file."""
+    try:
+        extraction = extract_pdf(
+            file_input,
+            file_name,
+            chunk_size,
+            min_characters_per_chunk,
+            embedding_model,
+            executor,
+        )
+    except Exception as e:
+        print(f"Error opening PDF {file_name}: {e}")
+        return []
+
+    if not extraction.chunks:
         print(f"No text extracted from {file_name}")
         return []
-    return chunk_list
+    return extraction.chunks
 
 
 def extract_chunks_from_text_file(
@@ -150,7 +482,7 @@ def extract_chunks_from_text_file(
     file_type: str,
     chunk_size: int = 512,
     min_characters_per_chunk: int = 24,
-    embedding_model: Optional[Union[str, SentenceTransformerEmbeddings]] = None,
+    embedding_model: Optional[ChunkerEmbeddingModel] = None,
 ) -> list[DocumentChunk]:
     """Extract and chunk text from a text file."""
 
@@ -175,24 +507,12 @@ def extract_chunks_from_text_file(
 
 def extract_text_from_pdf_file(
     file_input: Union[str, bytes],
+    executor: Optional[Executor] = None,
 ) -> str:
     """Extract text from a PDF file."""
-    if isinstance(file_input, str):
-        doc = fitz.open(file_input)
-    else:
-        # Validate that content is not empty before opening
-        if not file_input:
-            raise ValueError("PDF content is empty")
-        doc = fitz.open(stream=file_input, filetype="pdf")
-
-    full_text = ""
-    try:
-        for page in doc:
-            full_text += page.get_text("text") + "\n"
-    finally:
-        doc.close()
-
-    return preprocess_content(full_text.strip())
+    if not isinstance(file_input, str) and not file_input:
+        raise ValueError("PDF content is empty")
+    return extract_pdf(file_input, file_name="", executor=executor).full_text
 
 
 def extract_text_from_text_file(
@@ -215,9 +535,10 @@ def extract_text_from_text_file(
 
 async def extract_text_from_image_file(
     file_input: Union[str, bytes],
+    limit_call: Optional[CallLimit] = None,
 ) -> str:
-    """Extract and chunk text from an image file using OCR."""
-    content = await ocr_image_document(file_input, task_type="default")
+    """Extract text from an image file using OCR, page by page for multi-page TIFFs."""
+    content = join_ocr_pages(await ocr_image_pages(file_input, limit_call=limit_call))
     return preprocess_content(content.strip())
 
 
@@ -227,7 +548,7 @@ def extract_chunks_from_text(
     file_type: str,
     chunk_size: int = 512,
     min_characters_per_chunk: int = 24,
-    embedding_model: Optional[Union[str, SentenceTransformerEmbeddings]] = None,
+    embedding_model: Optional[ChunkerEmbeddingModel] = None,
 ) -> list[DocumentChunk]:
     """Extract and chunk text from a string."""
     if not file_text.strip():
@@ -244,3 +565,97 @@ def extract_chunks_from_text(
         min_characters_per_chunk,
         embedding_model=embedding_model,
     )
+
+
+# === Streaming extraction (large files) ===
+
+
+def iter_pdf_pages(
+    file_path: str,
+    ocr_page: Optional[Callable[[int, bytes], str]] = None,
+    dpi: int = 200,
+) -> Iterator[TextSegment]:
+    """
+    Yield PDF pages one at a time; PyMuPDF reads pages from disk on demand.
+
+    With `ocr_page`, a page without a text layer is rendered at `dpi` and
+    `ocr_page(page_number, png_bytes)` supplies its text instead.
+    """
+    doc = _open_pdf(file_path)
+    try:
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            text = page.get_text()
+            if ocr_page is not None and page_needs_ocr(page, text):
+                image = render_pdf_page(doc, page_num + 1, dpi)
+                text = ocr_page(page_num + 1, image) or text
+            yield page_num + 1, 0, text
+    finally:
+        doc.close()
+
+
+def iter_text_file_blocks(
+    file_path: str, block_size: int = 1024 * 1024
+) -> Iterator[TextSegment]:
+    """
+    Yield blocks of a memory-mapped text file, split at line ends.
+
+    A block without a line end is cut at `block_size`, possibly inside a
+    multi-byte character, so the bytes are decoded incrementally.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            char_offset = 0
+            size = len(mapped)
+            while start < size:
+                end = min(start + block_size, size)
+                if end < size:
+                    line_end = mapped.rfind(b"\n", start, end)
+                    if line_end > start:
+                        end = line_end + 1
+                text = decoder.decode(mapped[start:end], final=end == size)
+                start = end
+                if not text:
+                    continue
+                yield None, char_offset, text
+                char_offset += len(text)
+
+
+def iter_segment_chunks(
+    segments: Iterable[TextSegment],
+    file_name: str,
+    file_type: str,
+    chunk_size: int = 512,
+    min_characters_per_chunk: int = 24,
+) -> Iterator[DocumentChunk]:
+    """Chunk text segments lazily, one segment at a time."""
+    normalized_type = _normalize_file_type(file_type)
+    for page_number, char_offset, text in segments:
+        text = preprocess_content(text)
+        if not text.strip():
+            continue
+        yield from _chunk_text(
+            text,
+            file_name,
+            normalized_type,
+            chunk_size,
+            min_characters_per_chunk,
+            page_number=page_number,
+            char_offset=char_offset,
+        )
+
+
+def iter_batches(items: Iterable[T], batch_size: int) -> Iterator[list[T]]:
+    """Group an iterable into lists of at most `batch_size` items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
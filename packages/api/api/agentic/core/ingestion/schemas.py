@@ -16,6 +16,9 @@ class FileInput(BaseModel):
     name: str = Field(..., description="File name without path")
     type: str = Field(..., description="File type (e.g., pdf, txt, docx)")
     is_path: bool = Field(False, description="Indicates if the content is a file path")
+    chunks: Optional[list["DocumentChunk"]] = Field(
+        None, description="Chunks extracted together with the full text, if any"
+    )
 
 
 class ChunkMetadata(BaseModel):
@@ -48,6 +51,23 @@ class DocumentChunk(BaseModel):
     )
 
 
+class PdfExtraction(BaseModel):
+    """Full text and per-page chunks of a PDF, extracted in a single pass."""
+
+    full_text: str = Field(..., description="Text of all pages")
+    chunks: list[DocumentChunk] = Field(
+        default_factory=list, description="Chunks of all pages, in page order"
+    )
+    page_count: int = Field(..., description="Number of pages in the PDF")
+    page_texts: list[str] = Field(
+        default_factory=list, description="Raw text of each page, in page order"
+    )
+    ocr_page_numbers: list[int] = Field(
+        default_factory=list,
+        description="1-based numbers of the pages without a text layer",
+    )
+
+
 # ------
 class document_details(BaseModel):
     """Schema for document generated details."""
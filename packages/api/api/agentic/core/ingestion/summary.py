@@ -1,26 +1,143 @@
-from typing import Literal
+"""
+Document summaries.
 
-from ..call_llm import call_structured_llm_async
-from ..prompts import render_summary_generate_prompt
+A text within `text_limit` is summarized with one structured LLM call. Longer
+texts are summarized map-reduce style: sections are summarized concurrently
+with a short-output prompt, the partial summaries are condensed in groups,
+level by level, until they fit in one call, and that final call writes the
+title and description. Estimated LLM tokens per document are bounded by a
+budget, and partial summaries are cached in the `summary_cache` table, so a
+re-ingested document only summarizes the sections that changed.
+"""
+
+import asyncio
+import hashlib
+from collections.abc import Awaitable
+from functools import lru_cache
+from typing import Any, Callable, Literal, Optional
+
+from ....config import get_settings
+from ....database import SessionLocal
+from ..cache_service import CacheService
+from ..call_llm import call_llm_async, call_structured_llm_async
+from ..call_llm import model as llm_model
+from ..embedding.embedding import hash_text
+from ..executors import run_in_thread
+from ..graph import split_text_windows
+from ..prompts import render_summary_generate_prompt, render_summary_section_prompt
 from .schemas import document_details
 
+# Rough token estimates; only used to stay within the token budget
+CHARS_PER_TOKEN = 4
+PROMPT_OVERHEAD_TOKENS = 150
+TOKENS_PER_WORD = 2
+# Default length of the description, in words
+DEFAULT_MAX_LENGTH = 100
+# Stands in for the section text when hashing the section prompt template
+_PROMPT_PLACEHOLDER = "{section_text}"
+
+# Wraps each LLM call, e.g. to hold a caller's LLM concurrency permit
+CallLimit = Callable[[Awaitable[Any]], Awaitable[Any]]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+@lru_cache
+def section_prompt_hash(tone: str, language: str, max_length: int) -> str:
+    """SHA-256 of the rendered section summary prompt template."""
+    prompt = render_summary_section_prompt(
+        _PROMPT_PLACEHOLDER, tone=tone, language=language, max_length=max_length
+    )
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class TokenBudget:
+    """Estimated LLM tokens spent against a fixed limit."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+
+    def try_spend(self, tokens: int) -> bool:
+        if self.used + tokens > self.limit:
+            return False
+        self.used += tokens
+        return True
+
 
 class SummaryGenerator:
     def __init__(
         self,
         text_limit: int = 15000,
+        hierarchical: Optional[bool] = None,
+        section_chars: Optional[int] = None,
+        section_max_words: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        map_concurrency: Optional[int] = None,
+        reduce_concurrency: Optional[int] = None,
+        reduce_fan_in: Optional[int] = None,
+        use_cache: Optional[bool] = None,
     ):
+        settings = get_settings()
         self.prompt_renderer = render_summary_generate_prompt
         self.text_limit = text_limit
+        self.hierarchical = (
+            settings.SUMMARY_HIERARCHICAL if hierarchical is None else hierarchical
+        )
+        self.section_chars = section_chars or settings.SUMMARY_SECTION_CHARS
+        self.section_max_words = section_max_words or settings.SUMMARY_SECTION_MAX_WORDS
+        self.token_budget = token_budget or settings.SUMMARY_TOKEN_BUDGET
+        self.map_concurrency = map_concurrency or settings.SUMMARY_MAP_CONCURRENCY
+        self.reduce_concurrency = (
+            reduce_concurrency or settings.SUMMARY_REDUCE_CONCURRENCY
+        )
+        # At least two partial summaries per group, so every level shrinks
+        self.reduce_fan_in = max(2, reduce_fan_in or settings.SUMMARY_REDUCE_FAN_IN)
+        self.use_cache = (
+            settings.SUMMARY_CACHE_ENABLED if use_cache is None else use_cache
+        )
+        final_call_tokens = self._final_call_tokens(DEFAULT_MAX_LENGTH)
+        if self.hierarchical and self.token_budget <= final_call_tokens:
+            raise ValueError(
+                f"SUMMARY_TOKEN_BUDGET ({self.token_budget}) must exceed the "
+                f"final summary call (~{final_call_tokens} tokens)"
+            )
+
+    @property
+    def max_input_chars(self) -> int:
+        """Length of the leading text the summary can make use of."""
+        if not self.hierarchical:
+            return self.text_limit
+        return max(self.text_limit, self.token_budget * CHARS_PER_TOKEN)
 
     async def async_generate_summary(
         self,
         full_text: str,
         tone: str = "professional",
         language: Literal["en", "th"] = "en",
-        max_length: int = 100,
+        max_length: int = DEFAULT_MAX_LENGTH,
+        chunk_texts: Optional[list[str]] = None,
+        limit_call: Optional[CallLimit] = None,
     ) -> document_details:
-        """Generate a summary of the provided text."""
+        """
+        Generate a summary of the provided text. Texts beyond `text_limit` are
+        first reduced to partial summaries (sections aligned to `chunk_texts`
+        when given). `limit_call` wraps each LLM call.
+        """
+        if self.hierarchical and len(full_text) > self.text_limit:
+            try:
+                full_text = await self._reduce_text(
+                    full_text, tone, language, max_length, chunk_texts, limit_call
+                )
+            except Exception as e:
+                print(f"Error in hierarchical summary, using the leading text: {e}")
+
         prompt = self.prompt_renderer(
             full_text=full_text,
             text_limit=self.text_limit,
@@ -30,10 +147,221 @@ class SummaryGenerator:
         )
 
         try:
-            summary = await call_structured_llm_async(
-                prompt, response_model=document_details
+            call = call_structured_llm_async(
+                prompt, response_model=document_details, use_cache=True
             )
+            summary = await (limit_call(call) if limit_call else call)
             return summary
         except Exception as e:
             print(f"Error generating summary: {e}")
             return document_details()
+
+    async def _reduce_text(
+        self,
+        full_text: str,
+        tone: str,
+        language: str,
+        max_length: int,
+        chunk_texts: Optional[list[str]],
+        limit_call: Optional[CallLimit] = None,
+    ) -> str:
+        """Map sections to partial summaries and reduce them to fit `text_limit`."""
+        final_call_tokens = self._final_call_tokens(max_length)
+        budget = TokenBudget(self.token_budget - final_call_tokens)
+        prompt_hash = section_prompt_hash(tone, language, self.section_max_words)
+
+        sections = split_text_windows(full_text, self.section_chars, pieces=chunk_texts)
+        cached = await self._get_cached_summaries(
+            prompt_hash, [hash_text(section) for section in sections]
+        )
+        selected = self._fit_sections(sections, cached, budget.remaining)
+        if len(selected) < len(sections):
+            print(
+                f"Summary token budget covers {len(selected)} of "
+                f"{len(sections)} sections"
+            )
+
+        summaries = await self._summarize_level(
+            selected,
+            tone,
+            language,
+            prompt_hash,
+            cached,
+            budget,
+            self.map_concurrency,
+            limit_call,
+        )
+        # A section the budget cannot cover is passed on as is
+        partials = [
+            summary if summary is not None else text
+            for summary, text in zip(summaries, selected)
+        ]
+        partials = [partial for partial in partials if partial]
+        if not partials:
+            return full_text[: self.text_limit]
+
+        levels = 0
+        while len(partials) > 1 and len("\n\n".join(partials)) > self.text_limit:
+            groups = self._group_partials(partials)
+            joined = ["\n\n".join(group) for group in groups]
+            cached = await self._get_cached_summaries(
+                prompt_hash, [hash_text(text) for text in joined]
+            )
+            summaries = await self._summarize_level(
+                joined,
+                tone,
+                language,
+                prompt_hash,
+                cached,
+                budget,
+                self.reduce_concurrency,
+                limit_call,
+            )
+            # A group the budget cannot cover is passed on as is
+            partials = [
+                summary if summary is not None else text
+                for summary, text in zip(summaries, joined)
+            ]
+            partials = [partial for partial in partials if partial]
+            levels += 1
+            if None in summaries:
+                break
+
+        print(
+            f"Hierarchical summary: {len(sections)} sections, {levels} reduce "
+            f"levels, ~{budget.used + final_call_tokens} tokens"
+        )
+        return "\n\n".join(partials)
+
+    def _final_call_tokens(self, max_length: int) -> int:
+        """Estimated tokens of the final call, which writes the title and description."""
+        return (
+            self.text_limit // CHARS_PER_TOKEN
+            + PROMPT_OVERHEAD_TOKENS
+            + max_length * TOKENS_PER_WORD
+        )
+
+    def _call_tokens(self, text: str) -> int:
+        return (
+            estimate_tokens(text)
+            + PROMPT_OVERHEAD_TOKENS
+            + self.section_max_words * TOKENS_PER_WORD
+        )
+
+    def _fit_sections(
+        self, sections: list[str], cached: dict[str, str], budget_tokens: int
+    ) -> list[str]:
+        """
+        Evenly spaced sections whose map calls, plus an allowance for reducing
+        their partial summaries, fit in the budget. Cached sections cost nothing.
+        """
+        reduce_tokens = 2 * self.section_max_words * TOKENS_PER_WORD
+        costs = [
+            reduce_tokens
+            + (0 if hash_text(section) in cached else self._call_tokens(section))
+            for section in sections
+        ]
+        if sum(costs) <= budget_tokens:
+            return sections
+
+        average_cost = sum(costs) / len(costs)
+        count = max(1, int(budget_tokens / average_cost))
+        return [sections[i * len(sections) // count] for i in range(count)]
+
+    def _group_partials(self, partials: list[str]) -> list[list[str]]:
+        """Consecutive groups of up to `reduce_fan_in` partials within `text_limit`."""
+        groups: list[list[str]] = []
+        current: list[str] = []
+        size = 0
+        for partial in partials:
+            if len(current) >= self.reduce_fan_in or (
+                len(current) >= 2 and size + len(partial) > self.text_limit
+            ):
+                groups.append(current)
+                current, size = [], 0
+            current.append(partial)
+            size += len(partial) + 2
+        if current:
+            groups.append(current)
+        return groups
+
+    async def _summarize_level(
+        self,
+        texts: list[str],
+        tone: str,
+        language: str,
+        prompt_hash: str,
+        cached: dict[str, str],
+        budget: TokenBudget,
+        concurrency: int,
+        limit_call: Optional[CallLimit] = None,
+    ) -> list[Optional[str]]:
+        """
+        Partial summaries of `texts`, computed concurrently, with `limit_call`
+        wrapping each call. A failed call gives an empty summary and a call
+        beyond the budget gives None.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        computed: dict[str, str] = {}
+
+        async def summarize(text: str) -> Optional[str]:
+            text_hash = hash_text(text)
+            if text_hash in cached:
+                return cached[text_hash]
+            if not budget.try_spend(self._call_tokens(text)):
+                return None
+            prompt = render_summary_section_prompt(
+                text, tone=tone, language=language, max_length=self.section_max_words
+            )
+            async with semaphore:
+                try:
+                    # Partial summaries have their own cache
+                    call = call_llm_async(prompt)
+                    summary = (await (limit_call(call) if limit_call else call)).strip()
+                except Exception as e:
+                    print(f"Error summarizing section: {e}")
+                    return ""
+            if summary.startswith("Error:"):
+                return ""
+            computed[text_hash] = summary
+            return summary
+
+        summaries = await asyncio.gather(*(summarize(text) for text in texts))
+        await self._store_cached_summaries(prompt_hash, computed)
+        return summaries
+
+    async def _get_cached_summaries(
+        self, prompt_hash: str, text_hashes: list[str]
+    ) -> dict[str, str]:
+        """Best-effort cache lookup; a database failure is a miss."""
+        if not self.use_cache:
+            return {}
+
+        def lookup() -> dict[str, str]:
+            with SessionLocal() as db:
+                return CacheService(db).get_cached_summaries(
+                    llm_model, prompt_hash, text_hashes
+                )
+
+        try:
+            return await run_in_thread(lookup)
+        except Exception as e:
+            print(f"Summary cache lookup failed: {e}")
+            return {}
+
+    async def _store_cached_summaries(
+        self, prompt_hash: str, summaries: dict[str, str]
+    ) -> None:
+        if not self.use_cache or not summaries:
+            return
+
+        def store() -> None:
+            with SessionLocal() as db:
+                CacheService(db).store_cached_summaries(
+                    llm_model, prompt_hash, summaries
+                )
+
+        try:
+            await run_in_thread(store)
+        except Exception as e:
+            print(f"Summary cache store failed: {e}")
@@ -0,0 +1,127 @@
+"""
+Persistent OCR result cache.
+
+Entries live in the `ocr_cache` table, keyed by VLM model, a hash of the OCR
+prompt template and a hash of the decoded image pixels. Changing the prompt
+template changes its hash, so old entries stop matching; `invalidate` removes
+them. Lookups and writes are best-effort: a database failure is a miss.
+"""
+
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Optional
+
+from PIL import Image
+
+from .....config import get_settings
+from .....database import SessionLocal
+from ...cache_service import CacheService
+from ...prompts import render_ocr_prompt
+
+OCR_TASK_TYPES = ("default", "structured")
+OCR_TEXT_LENGTH = 1500
+# Stands in for the per-image anchor text when hashing the prompt template
+_PROMPT_PLACEHOLDER = "{anchor_text}"
+
+
+@lru_cache
+def ocr_prompt_hash(task_type: str = "default", text_length: int = OCR_TEXT_LENGTH):
+    """SHA-256 of the rendered OCR prompt template."""
+    prompt = render_ocr_prompt(
+        _PROMPT_PLACEHOLDER, task_type=task_type, text_length=text_length
+    )
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def hash_image(img: Image.Image) -> str:
+    """SHA-256 of an image's RGB pixels, independent of its file encoding."""
+    rgb = img.convert("RGB")
+    digest = hashlib.sha256(f"{rgb.width}x{rgb.height}:".encode())
+    digest.update(rgb.tobytes())
+    return digest.hexdigest()
+
+
+class OcrCache:
+    """Postgres-backed OCR cache with in-process hit and miss counters."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return get_settings().OCR_CACHE_ENABLED
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, model_name: str, prompt_hash: str, image_hash: str) -> Optional[str]:
+        """Cached OCR text of an image, or None."""
+        if not self.enabled:
+            return None
+        try:
+            with SessionLocal() as db:
+                text = CacheService(db).get_cached_ocr_text(
+                    model_name, prompt_hash, image_hash
+                )
+        except Exception as e:
+            print(f"OCR cache lookup failed: {e}")
+            self._count("errors")
+            text = None
+        self._count("misses" if text is None else "hits")
+        return text
+
+    def put(self, model_name: str, prompt_hash: str, image_hash: str, text: str):
+        """Cache the OCR text of an image; failures only cost a future VLM call."""
+        if not self.enabled or not text:
+            return
+        try:
+            with SessionLocal() as db:
+                CacheService(db).store_cached_ocr_text(
+                    model_name, prompt_hash, image_hash, text
+                )
+            self._count("stores")
+        except Exception as e:
+            print(f"OCR cache store failed: {e}")
+            self._count("errors")
+
+    def invalidate(
+        self, model_name: Optional[str] = None, stale_only: bool = True
+    ) -> int:
+        """
+        Delete cached entries, of one model if given. With `stale_only`, only
+        entries made with an outdated prompt template are deleted.
+        """
+        keep_prompt_hashes = None
+        if stale_only:
+            keep_prompt_hashes = [
+                ocr_prompt_hash(task_type) for task_type in OCR_TASK_TYPES
+            ]
+        with SessionLocal() as db:
+            return CacheService(db).delete_cached_ocr_texts(
+                model_name=model_name, keep_prompt_hashes=keep_prompt_hashes
+            )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_OCR_CACHE = OcrCache()
+
+
+def get_ocr_cache() -> OcrCache:
+    """The process-wide OCR cache."""
+    return _OCR_CACHE
@@ -9,8 +9,10 @@ from typing import Any, Union
 
 from PIL import Image
 
-from ...call_llm import call_vlm_async
+from ...call_llm import call_vlm_async, vlm_model
+from ...executors import run_in_thread
 from ...prompts import render_ocr_prompt
+from .ocr_cache import OCR_TEXT_LENGTH, get_ocr_cache, hash_image, ocr_prompt_hash
 
 # -----------------------------
 # OCR Types & Data Structures
@@ -85,6 +87,18 @@ def ensure_image_bytes(input_data: Union[str, bytes]) -> bytes:
     raise ValueError("Input must be a path, bytes, or base64-encoded image string.")
 
 
+def prepare_image(image_input: Union[str, bytes]) -> tuple[str, str, str]:
+    """Decode an image once; returns (base64 JPEG, anchor text, pixel hash)."""
+    # Ensure image data is in bytes
+    image_data = ensure_image_bytes(image_input)
+    with Image.open(io.BytesIO(image_data)) as img:
+        return (
+            image_to_base64png(img),
+            get_anchor_text_from_image(img),
+            hash_image(img),
+        )
+
+
 # -----------------------------
 # Main OCR Function
 # -----------------------------
@@ -95,12 +109,25 @@ async def ocr_image_document(
     task_type: str = "default",
     litellm_params: dict[str, Any] = None,
 ) -> str:
-    # Ensure image data is in bytes
-    image_data = ensure_image_bytes(image_input)
-    img = Image.open(io.BytesIO(image_data))
-    image_base64 = image_to_base64png(img)
-    anchor_text = get_anchor_text_from_image(img)
-    prompt_text = render_ocr_prompt(anchor_text, task_type=task_type, text_length=1500)
+    # Decoding and re-encoding large scans is CPU-bound
+    image_base64, anchor_text, image_hash = await run_in_thread(
+        prepare_image, image_input
+    )
+
+    # Identical pixels, prompt and model give the same OCR text
+    cache = get_ocr_cache()
+    cache_key = (
+        (litellm_params or {}).get("model", vlm_model),
+        ocr_prompt_hash(task_type, OCR_TEXT_LENGTH),
+        image_hash,
+    )
+    cached_text = await run_in_thread(cache.get, *cache_key)
+    if cached_text is not None:
+        return cached_text
+
+    prompt_text = render_ocr_prompt(
+        anchor_text, task_type=task_type, text_length=OCR_TEXT_LENGTH
+    )
 
     # Call the VLM with the image and prompt
     response = await call_vlm_async(
@@ -109,12 +136,14 @@ async def ocr_image_document(
         litellm_params=litellm_params,
     )
 
+    text = response.strip()
     try:
         parsed = json.loads(response)
         if isinstance(parsed, dict) and "natural_text" in parsed:
-            return str(parsed["natural_text"]).strip()
+            text = str(parsed["natural_text"]).strip()
     except json.JSONDecodeError:
+        # Fallback: keep the raw stripped response
         pass
 
-    # Fallback: return raw stripped response
-    return response.strip()
+    await run_in_thread(cache.put, *cache_key, text)
+    return text
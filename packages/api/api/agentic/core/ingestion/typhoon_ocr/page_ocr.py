@@ -0,0 +1,232 @@
+"""
+Page-level OCR for scanned PDFs and multi-page images.
+
+Pages without a text layer are rendered with PyMuPDF, sent to the VLM
+concurrently and returned in page order. The concurrency and request rate
+limits are process-wide, so they hold across every document being ingested
+and every event loop of the process. The VLM endpoint is taken from TYPHOON_BASE_URL, or
+`litellm_params["base_url"]`, so the pipeline can run against a local mock.
+"""
+
+import asyncio
+import io
+import threading
+import time
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+import fitz
+from PIL import Image, ImageSequence
+
+from .....config import get_settings
+from ...executors import run_in_thread
+from ...llm_gateway import ModelLimiter, ModelLimits
+from .ocr_utils import ensure_image_bytes, ocr_image_document
+
+# Pages with fewer characters than this in their text layer are OCRed
+MIN_TEXT_LAYER_CHARS = 16
+
+# Wraps each VLM call, e.g. to hold a caller's LLM concurrency permit
+CallLimit = Callable[[Awaitable[str]], Awaitable[str]]
+
+
+@dataclass(frozen=True)
+class OcrPage:
+    page_number: int
+    text: str
+
+
+class RequestRateLimiter:
+    """Spaces out request starts to at most `requests_per_second` (0 disables)."""
+
+    def __init__(self, requests_per_second: float = 0):
+        self.interval = 1 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_start = 0.0
+        # A thread lock, so callers on any event loop share the spacing
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Book the next start slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+            return start - now
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_LIMITERS: dict[tuple[int, float], tuple[ModelLimiter, RequestRateLimiter]] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_page_ocr_limiter(
+    max_concurrency: int, requests_per_second: float
+) -> tuple[ModelLimiter, RequestRateLimiter]:
+    """Process-wide OCR slots and request spacing; equal limits share one limiter."""
+    key = (max_concurrency, requests_per_second)
+    with _LIMITERS_LOCK:
+        if key not in _LIMITERS:
+            _LIMITERS[key] = (
+                ModelLimiter("page_ocr", ModelLimits(max_concurrency=max_concurrency)),
+                RequestRateLimiter(requests_per_second),
+            )
+        return _LIMITERS[key]
+
+
+def page_needs_ocr(page: fitz.Page, text: str) -> bool:
+    """A page needs OCR when it has images but (almost) no text layer."""
+    return len(text.strip()) < MIN_TEXT_LAYER_CHARS and bool(page.get_images())
+
+
+def find_pages_without_text(doc: fitz.Document) -> list[int]:
+    """1-based numbers of the pages of an open PDF that need OCR."""
+    page_numbers = []
+    for page_num in range(len(doc)):
+        page = doc.load_page(page_num)
+        if page_needs_ocr(page, page.get_text()):
+            page_numbers.append(page_num + 1)
+    return page_numbers
+
+
+def render_pdf_page(doc: fitz.Document, page_number: int, dpi: int) -> bytes:
+    """Render a 1-based page of an open PDF to PNG bytes."""
+    return doc.load_page(page_number - 1).get_pixmap(dpi=dpi).tobytes("png")
+
+
+def split_image_pages(image_input: Union[str, bytes]) -> list[bytes]:
+    """Split a multi-page TIFF into PNG bytes per page; other images are one page."""
+    image_data = ensure_image_bytes(image_input)
+    with Image.open(io.BytesIO(image_data)) as img:
+        if img.format != "TIFF" or getattr(img, "n_frames", 1) == 1:
+            return [image_data]
+
+        pages = []
+        for frame in ImageSequence.Iterator(img):
+            buffered = io.BytesIO()
+            frame.convert("RGB").save(buffered, format="PNG")
+            pages.append(buffered.getvalue())
+        return pages
+
+
+async def ocr_pages(
+    page_numbers: list[int],
+    load_page_image: Callable[[int], bytes],
+    *,
+    max_concurrency: Optional[int] = None,
+    requests_per_second: Optional[float] = None,
+    task_type: str = "default",
+    litellm_params: dict[str, Any] = None,
+    limit_call: Optional[CallLimit] = None,
+) -> list[OcrPage]:
+    """
+    OCR pages concurrently and return them in page order.
+
+    Page images are loaded lazily, once a request slot is free, so only
+    `max_concurrency` rendered pages are held at a time across the process.
+    `limit_call` wraps each VLM call. A page whose OCR fails is returned with
+    empty text.
+    """
+    settings = get_settings()
+    slots, rate_limiter = get_page_ocr_limiter(
+        max_concurrency or settings.OCR_MAX_CONCURRENCY,
+        settings.OCR_REQUESTS_PER_SECOND
+        if requests_per_second is None
+        else requests_per_second,
+    )
+
+    async def ocr_page(page_number: int) -> OcrPage:
+        await slots.acquire_async(0)
+        try:
+            image = await run_in_thread(load_page_image, page_number)
+            await rate_limiter.wait()
+            call = ocr_image_document(
+                image, task_type=task_type, litellm_params=litellm_params
+            )
+            text = await (limit_call(call) if limit_call else call)
+        except Exception as e:
+            print(f"Error running OCR on page {page_number}: {e}")
+            text = ""
+        finally:
+            slots.release(0, None)
+        return OcrPage(page_number=page_number, text=text.strip())
+
+    results = await asyncio.gather(*(ocr_page(n) for n in page_numbers))
+    return sorted(results, key=lambda page: page.page_number)
+
+
+async def ocr_pdf(
+    file_input: Union[str, bytes],
+    page_numbers: Optional[list[int]] = None,
+    *,
+    dpi: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    requests_per_second: Optional[float] = None,
+    litellm_params: dict[str, Any] = None,
+    limit_call: Optional[CallLimit] = None,
+) -> list[OcrPage]:
+    """
+    OCR pages of a PDF, by default every page without a text layer.
+
+    `page_numbers` are 1-based. Pages are rendered at `dpi`
+    (OCR_RENDER_DPI if unset).
+    """
+    dpi = dpi or get_settings().OCR_RENDER_DPI
+    if isinstance(file_input, str):
+        doc = fitz.open(file_input)
+    else:
+        doc = fitz.open(stream=file_input, filetype="pdf")
+
+    # Open documents are not thread-safe; renders share one document
+    render_lock = threading.Lock()
+
+    def render(page_number: int) -> bytes:
+        with render_lock:
+            return render_pdf_page(doc, page_number, dpi)
+
+    try:
+        if page_numbers is None:
+            page_numbers = await run_in_thread(find_pages_without_text, doc)
+        if not page_numbers:
+            return []
+        return await ocr_pages(
+            page_numbers,
+            render,
+            max_concurrency=max_concurrency,
+            requests_per_second=requests_per_second,
+            litellm_params=litellm_params,
+            limit_call=limit_call,
+        )
+    finally:
+        doc.close()
+
+
+async def ocr_image_pages(
+    image_input: Union[str, bytes],
+    *,
+    max_concurrency: Optional[int] = None,
+    requests_per_second: Optional[float] = None,
+    litellm_params: dict[str, Any] = None,
+    limit_call: Optional[CallLimit] = None,
+) -> list[OcrPage]:
+    """OCR every page of an image; multi-page TIFFs are split and run concurrently."""
+    pages = await run_in_thread(split_image_pages, image_input)
+    return await ocr_pages(
+        list(range(1, len(pages) + 1)),
+        lambda page_number: pages[page_number - 1],
+        max_concurrency=max_concurrency,
+        requests_per_second=requests_per_second,
+        litellm_params=litellm_params,
+        limit_call=limit_call,
+    )
+
+
+def join_ocr_pages(pages: list[OcrPage]) -> str:
+    """Join OCR page texts in page order, one page per block."""
+    return "\n".join(page.text for page in pages if page.text)
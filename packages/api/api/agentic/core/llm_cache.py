@@ -0,0 +1,157 @@
+"""
+Persistent LLM response cache.
+
+Responses live in the `llm_cache` table, keyed by a SHA-256 of the model,
+messages, response model JSON schema and sampling parameters, so only a
+byte-identical request is a hit. Entries expire after LLM_CACHE_TTL_SECONDS,
+and every LLM_CACHE_EVICT_EVERY stores the least recently used entries are
+evicted until the cache fits in LLM_CACHE_MAX_BYTES. Lookups and writes are
+best-effort: a database failure is a miss.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from ...config import get_settings
+from ...database import SessionLocal
+from .cache_service import CacheService
+from .executors import run_in_thread
+
+
+def llm_cache_key(
+    model: str,
+    messages: list[dict],
+    response_model: Optional[type[BaseModel]] = None,
+    params: Optional[dict[str, Any]] = None,
+) -> str:
+    """SHA-256 of everything that determines an LLM response."""
+    request = {
+        "model": model,
+        "messages": messages,
+        "response_schema": response_model.model_json_schema()
+        if response_model
+        else None,
+        "params": params or {},
+    }
+    encoded = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Postgres-backed LLM response cache with in-process counters."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+        self._stores_since_eviction = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return get_settings().LLM_CACHE_ENABLED
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, cache_key: str) -> Optional[str]:
+        """Cached response of a request, or None."""
+        if not self.enabled:
+            return None
+        try:
+            with SessionLocal() as db:
+                response = CacheService(db).get_cached_llm_response(
+                    cache_key, ttl_seconds=get_settings().LLM_CACHE_TTL_SECONDS
+                )
+        except Exception as e:
+            print(f"LLM cache lookup failed: {e}")
+            self._count("errors")
+            response = None
+        self._count("misses" if response is None else "hits")
+        return response
+
+    def put(self, cache_key: str, model_name: str, response: str) -> None:
+        """Cache a response; failures only cost a future LLM call."""
+        if not self.enabled or not response:
+            return
+        try:
+            with SessionLocal() as db:
+                CacheService(db).store_cached_llm_response(
+                    cache_key, model_name, response
+                )
+            self._count("stores")
+        except Exception as e:
+            print(f"LLM cache store failed: {e}")
+            self._count("errors")
+            return
+
+        with self._lock:
+            self._stores_since_eviction += 1
+            due = self._stores_since_eviction >= get_settings().LLM_CACHE_EVICT_EVERY
+            if due:
+                self._stores_since_eviction = 0
+        if due:
+            self.evict()
+
+    async def aget(self, cache_key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        return await run_in_thread(self.get, cache_key)
+
+    async def aput(self, cache_key: str, model_name: str, response: str) -> None:
+        if not self.enabled or not response:
+            return
+        await run_in_thread(self.put, cache_key, model_name, response)
+
+    def evict(self) -> int:
+        """Delete expired entries and the least recently used ones beyond the size cap."""
+        settings = get_settings()
+        try:
+            with SessionLocal() as db:
+                deleted = CacheService(db).evict_cached_llm_responses(
+                    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                    max_bytes=settings.LLM_CACHE_MAX_BYTES,
+                )
+        except Exception as e:
+            print(f"LLM cache eviction failed: {e}")
+            self._count("errors")
+            return 0
+        self._count("evictions", deleted)
+        return deleted
+
+    def clear(self, model_name: Optional[str] = None) -> int:
+        """Delete cached responses, of one model if given."""
+        with SessionLocal() as db:
+            return CacheService(db).delete_cached_llm_responses(model_name)
+
+    def usage(self) -> dict:
+        """Entries and bytes currently stored."""
+        with SessionLocal() as db:
+            return CacheService(db).get_llm_cache_usage()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_LLM_CACHE = LLMResponseCache()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """The process-wide LLM response cache."""
+    return _LLM_CACHE
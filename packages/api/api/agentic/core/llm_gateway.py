@@ -0,0 +1,370 @@
+"""
+Shared gateway for LLM and VLM calls.
+
+Every call in `call_llm` goes through `LLMGateway`, which applies per-model
+limits on concurrent requests, requests per minute and tokens per minute,
+retries rate-limited and transient failures with jittered exponential backoff
+(waiting at least the provider's Retry-After), and counts in-flight and queued
+calls for the health metrics.
+
+Limiter state is guarded by a thread lock rather than asyncio primitives, so
+one gateway serves the API event loop, the worker's per-job `asyncio.run`
+loops and synchronous callers in threads alike. Waiters poll for a free slot.
+
+Sync calls share one keep-alive `httpx.Client`. Async calls reuse litellm's
+per-event-loop clients: an `httpx.AsyncClient` is bound to the loop it was
+first used on, so one cannot be shared across the worker's job loops.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Awaitable
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
+
+import httpx
+import litellm
+
+from ...config import get_settings
+
+# Rough prompt size estimate; actual usage is charged once the response arrives
+CHARS_PER_TOKEN = 4
+# How often a caller waiting for a concurrency slot checks again
+SLOT_POLL_SECONDS = 0.05
+MAX_WAIT_SECONDS = 1.0
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    max_concurrency: int
+    # 0 disables the limit
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+
+
+class TokenBucket:
+    """Refills `per_minute` units evenly, holding at most one minute's worth."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Charge (or refund) the difference between estimated and actual usage."""
+        self.level = min(self.capacity, self.level - amount)
+
+
+class ModelLimiter:
+    """Concurrency slots and rate limits of one model."""
+
+    def __init__(self, model: str, limits: ModelLimits):
+        self.model = model
+        self.limits = limits
+        self.requests = (
+            TokenBucket(limits.requests_per_minute)
+            if limits.requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        )
+        self.in_flight = 0
+        self.waiting = 0
+        self.blocked_until = 0.0
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: int) -> float:
+        """Take a slot and rate budget, or return how long to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.in_flight >= self.limits.max_concurrency:
+                return SLOT_POLL_SECONDS
+
+            buckets = [
+                (bucket, amount)
+                for bucket, amount in ((self.requests, 1), (self.tokens, tokens))
+                if bucket is not None
+            ]
+            wait = max(
+                (bucket.wait_time(amount, now) for bucket, amount in buckets),
+                default=0.0,
+            )
+            if wait > 0:
+                return wait
+            for bucket, amount in buckets:
+                bucket.take(amount)
+            self.in_flight += 1
+            self.calls += 1
+            return 0.0
+
+    async def acquire_async(self, tokens: int) -> None:
+        """Wait for `try_acquire` to succeed without blocking the event loop."""
+        wait = self.try_acquire(tokens)
+        if not wait:
+            return
+        start = time.monotonic()
+        self.count("waiting")
+        try:
+            while wait:
+                await asyncio.sleep(min(wait, MAX_WAIT_SECONDS))
+                wait = self.try_acquire(tokens)
+        finally:
+            self.count("waiting", -1)
+            self.count("wait_seconds", time.monotonic() - start)
+
+    def acquire_sync(self, tokens: int) -> None:
+        """Blocking counterpart of `acquire_async`."""
+        wait = self.try_acquire(tokens)
+        if not wait:
+            return
+        start = time.monotonic()
+        self.count("waiting")
+        try:
+            while wait:
+                time.sleep(min(wait, MAX_WAIT_SECONDS))
+                wait = self.try_acquire(tokens)
+        finally:
+            self.count("waiting", -1)
+            self.count("wait_seconds", time.monotonic() - start)
+
+    def release(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if self.tokens is not None and actual_tokens is not None:
+                self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def block(self, seconds: float) -> None:
+        """Hold back every caller of this model, e.g. after a 429."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def count(self, counter: str, amount: float = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def stats(self) -> dict:
+        return {
+            "limits": asdict(self.limits),
+            "in_flight": self.in_flight,
+            "queued": self.waiting,
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+def estimate_tokens(messages: list[dict], max_tokens: Optional[int] = None) -> int:
+    """Prompt tokens estimated from text length, plus the completion allowance."""
+    chars = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            chars += sum(len(part.get("text", "")) for part in content)
+    completion = max_tokens or get_settings().LLM_DEFAULT_COMPLETION_TOKENS
+    return chars // CHARS_PER_TOKEN + completion
+
+
+def response_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported by a litellm response or an instructor result."""
+    raw = getattr(response, "_raw_response", response)
+    usage = getattr(raw, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    # instructor may wrap the provider error
+    while error is not None:
+        status_code = getattr(error, "status_code", None)
+        if isinstance(status_code, int):
+            return status_code
+        error = error.__cause__
+    return None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Retry-After of a provider error, in seconds, if it has one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(
+        error, "litellm_response_headers", None
+    )
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (litellm.Timeout, litellm.APIConnectionError)):
+        return True
+    return _status_code(error) in RETRYABLE_STATUS_CODES
+
+
+class LLMGateway:
+    """Routes LLM calls through per-model limiters with retries."""
+
+    def __init__(self):
+        settings = get_settings()
+        self.default_limits = ModelLimits(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        )
+        self.model_limits = {
+            model: ModelLimits(**{**asdict(self.default_limits), **limits})
+            for model, limits in settings.LLM_MODEL_LIMITS.items()
+        }
+        self.max_retries = settings.LLM_MAX_RETRIES
+        self.backoff_base = settings.LLM_BACKOFF_BASE_SECONDS
+        self.backoff_max = settings.LLM_BACKOFF_MAX_SECONDS
+        self._limiters: dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+        self._install_http_client(settings)
+
+    @staticmethod
+    def _install_http_client(settings) -> None:
+        if litellm.client_session is None:
+            litellm.client_session = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(settings.LLM_HTTP_TIMEOUT_SECONDS),
+                follow_redirects=True,
+            )
+
+    def limiter(self, model: str) -> ModelLimiter:
+        with self._lock:
+            if model not in self._limiters:
+                self._limiters[model] = ModelLimiter(
+                    model, self.model_limits.get(model, self.default_limits)
+                )
+            return self._limiters[model]
+
+    def _backoff(self, limiter: ModelLimiter, attempt: int, error: Exception) -> float:
+        """Full-jitter backoff, at least the provider's Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        retry_after = retry_after_seconds(error)
+        if _status_code(error) == 429:
+            limiter.count("rate_limited")
+            # Pause the whole model, so queued callers do not pile on
+            limiter.block(retry_after or delay)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        limiter.count("retries")
+        return delay
+
+    def _give_up(self, limiter: ModelLimiter, attempt: int, error: Exception) -> bool:
+        if attempt < self.max_retries and is_retryable(error):
+            return False
+        limiter.count("errors")
+        return True
+
+    async def acall(self, func: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+        """Await `func(**kwargs)`, a litellm-style call with `model` and `messages`."""
+        limiter = self.limiter(kwargs["model"])
+        tokens = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+        attempt = 0
+        while True:
+            await limiter.acquire_async(tokens)
+            actual_tokens = None
+            try:
+                response = await func(**kwargs)
+                actual_tokens = response_tokens(response)
+                return response
+            except Exception as e:
+                if self._give_up(limiter, attempt, e):
+                    raise
+                delay = self._backoff(limiter, attempt, e)
+            finally:
+                limiter.release(tokens, actual_tokens)
+            print(f"LLM call to {limiter.model} failed, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def call(self, func: Callable[..., Any], **kwargs) -> Any:
+        """Blocking counterpart of `acall`."""
+        limiter = self.limiter(kwargs["model"])
+        tokens = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+        attempt = 0
+        while True:
+            limiter.acquire_sync(tokens)
+            actual_tokens = None
+            try:
+                response = func(**kwargs)
+                actual_tokens = response_tokens(response)
+                return response
+            except Exception as e:
+                if self._give_up(limiter, attempt, e):
+                    raise
+                delay = self._backoff(limiter, attempt, e)
+            finally:
+                limiter.release(tokens, actual_tokens)
+            print(f"LLM call to {limiter.model} failed, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {
+            "queued": sum(limiter.waiting for limiter in limiters),
+            "in_flight": sum(limiter.in_flight for limiter in limiters),
+            "models": {limiter.model: limiter.stats() for limiter in limiters},
+        }
+
+
+_GATEWAY: Optional[LLMGateway] = None
+_GATEWAY_LOCK = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """The process-wide LLM gateway, created on first use."""
+    global _GATEWAY
+    with _GATEWAY_LOCK:
+        if _GATEWAY is None:
+            _GATEWAY = LLMGateway()
+        return _GATEWAY
@@ -11,6 +11,7 @@ from .prompt_render import (
     render_knowledge_graph_extraction_prompt,
     render_ocr_prompt,
     render_summary_generate_prompt,
+    render_summary_section_prompt,
     render_summary_to_topic_extraction,
 )
 from .schemas import (
@@ -24,6 +25,7 @@ __all__ = [
     "render_collection_rag_agent_prompt",
     "render_summary_to_topic_extraction",
     "render_summary_generate_prompt",
+    "render_summary_section_prompt",
     "render_ocr_prompt",
     "RenderTreeRequest",
 ]
@@ -128,6 +128,34 @@ def render_summary_generate_prompt(
     )
 
 
+# Section Summary Prompt
+def render_summary_section_prompt(
+    section_text: str,
+    tone: str = "professional",
+    language: Literal["en", "th"] = "en",
+    max_length: int = 80,
+) -> str:
+    """
+    Convenience function to render the partial summary prompt of one section
+    of a long document.
+
+    Args:
+        section_text: The section (or joined partial summaries) to summarize
+        max_length: Maximum number of words in the partial summary
+
+    Returns:
+        Rendered prompt string
+    """
+    manager = get_prompt_manager()
+    return manager.render_template(
+        "summary_section.j2",
+        section_text=section_text,
+        tone=tone,
+        language=language,
+        max_length=max_length,
+    )
+
+
 # OCR Prompt
 def render_ocr_prompt(
     base_text: str,
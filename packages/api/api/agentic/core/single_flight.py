@@ -0,0 +1,121 @@
+"""
+Coalescing of identical in-flight calls ("single flight").
+
+While a call for a key is running, later callers with the same key wait for
+its result instead of starting their own. Errors reach every waiter. An async
+waiter that is cancelled only stops waiting; the shared call is cancelled
+once no waiter is left. Async calls are shared per event loop, since a task
+cannot be awaited from another loop; sync calls are shared across threads.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable
+from concurrent.futures import Future
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its result."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._async_calls: dict[tuple[int, Any], tuple[asyncio.Task, list[int]]] = {}
+        self._sync_calls: dict[Any, Future] = {}
+        self._lock = threading.Lock()
+
+    async def do(self, key: Any, func: Callable[[], Awaitable[T]]) -> T:
+        """Await `func()`, or the running call with the same key."""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            flight = self._async_calls.get(flight_key)
+            if flight is None:
+                task = loop.create_task(func())
+                # Number of callers still waiting on the task
+                flight = (task, [0])
+                self._async_calls[flight_key] = flight
+                task.add_done_callback(lambda _: self._forget(flight_key, task))
+                self.calls += 1
+            else:
+                self.coalesced += 1
+            task, waiters = flight
+            waiters[0] += 1
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                with self._lock:
+                    waiters[0] -= 1
+                    abandoned = waiters[0] == 0
+                if abandoned:
+                    task.cancel()
+            raise
+
+    def _forget(self, flight_key: tuple[int, Any], task: asyncio.Task) -> None:
+        with self._lock:
+            flight = self._async_calls.get(flight_key)
+            if flight is not None and flight[0] is task:
+                del self._async_calls[flight_key]
+
+    def do_sync(self, key: Any, func: Callable[[], T]) -> T:
+        """Call `func()`, or block on the running call with the same key."""
+        with self._lock:
+            future = self._sync_calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._sync_calls[key] = future
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._sync_calls.get(key) is future:
+                    del self._sync_calls[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._async_calls) + len(self._sync_calls)
+        total = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": in_flight,
+            "coalesced_rate": self.coalesced / total if total else 0.0,
+        }
+
+
+_FLIGHTS: dict[str, SingleFlight] = {}
+_FLIGHTS_LOCK = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """The process-wide coalescer of one kind of call, e.g. "llm"."""
+    with _FLIGHTS_LOCK:
+        if name not in _FLIGHTS:
+            _FLIGHTS[name] = SingleFlight(name)
+        return _FLIGHTS[name]
+
+
+def get_single_flight_stats() -> dict:
+    with _FLIGHTS_LOCK:
+        flights = list(_FLIGHTS.values())
+    return {flight.name: flight.stats() for flight in flights}
@@ -1,3 +1,5 @@
+import functools
+
 from fastapi import Depends
 
 from api.agentic.core.graph.graph_merge import KnowledgeGraphMerger
@@ -52,7 +54,8 @@ def get_knowledge_graph_extractor() -> KnowledgeGraphExtractor:
     """
     Returns an instance of KnowledgeGraphExtractor with the necessary dependencies.
     """
-    llm_caller = call_llm_async
+    # Extraction of the same text may reuse a cached response
+    llm_caller = functools.partial(call_llm_async, use_cache=True)
     prompt_renderer = render_knowledge_graph_extraction_prompt
 
     return KnowledgeGraphExtractor(
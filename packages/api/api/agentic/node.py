@@ -183,6 +183,7 @@ class GetUserIntentNode(Node):
             prompt=f"You are an intent classifier. Classify the following question: {user_question}",
             response_model=UserIntent,
             max_retries=3,
+            use_cache=True,
         )
         return user_intent
 
@@ -232,11 +233,20 @@ class EmbedQueryNode(Node):
 
 class SearchCollectionNode(Node):
     def __init__(
-        self, document_service: DocumentService, name="", max_retries=3, wait=0, TOP_K=5
+        self,
+        document_service: DocumentService,
+        name="",
+        max_retries=3,
+        wait=0,
+        TOP_K=5,
+        search_mode: Literal["vector", "hybrid"] = "vector",
+        fusion_weight: float = 0.5,
     ):
         super().__init__(name, max_retries, wait)
         self.document_service = document_service
         self.TOP_K = TOP_K
+        self.search_mode = search_mode
+        self.fusion_weight = fusion_weight
 
     def prep(self, shared: SharedStore) -> Optional[dict[str, Any]]:
         if shared.query_embedding is None:
@@ -246,6 +256,7 @@ class SearchCollectionNode(Node):
             "embedding": shared.query_embedding,
             "collection_id": shared.chat_session.collection_id,
             "top_k": self.TOP_K,
+            "query_text": shared.user_question,
         }
 
     def exec(self, inputs: dict[str, Any]) -> list[ChunkSearchResponse]:
@@ -256,6 +267,9 @@ class SearchCollectionNode(Node):
                 collection_id=inputs.get("collection_id"),
                 query_embedding=inputs.get("embedding"),
                 top_k=inputs.get("top_k"),
+                mode=self.search_mode,
+                query_text=inputs.get("query_text"),
+                fusion_weight=self.fusion_weight,
             )
             print(
                 f"SearchPgvectorNode: Retrieved {len(retrieved_docs)} documents from DB."
@@ -436,6 +450,7 @@ class GenerateResponseFromContextNode(Node):
 
         print(f"GenerateResponseNode: Calling LLM with {len(contexts)} contexts.")
         try:
+            # Answers are not cached, so regenerating gives a fresh one
             llm_answer = call_llm(chat_history)
             return llm_answer
         except Exception as e:
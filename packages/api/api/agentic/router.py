@@ -1,27 +1,37 @@
 import asyncio
+import functools
+import io
+import os
+from typing import Optional
 
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
+    Query,
     UploadFile,
     status,
 )
 
 from api.agentic.agent import rag_agent
 from api.agentic.schemas import AgentResponse, RAGQueryRequest
-from api.auth.schemas import UserResponse
+from api.auth.dependencies import get_current_admin
 from api.chat.dependencies import get_chat_or_404
 from api.clustering.schemas import ClusteringResponse
+from api.config import get_settings
 from api.document.schemas import (
     DocumentCreate,
-    DocumentResponse,
     DocumentResponseTruncated,
+    DocumentUpdate,
 )
+from api.message_queue import QueueService, get_queue_service
 from api.models.chat import CollectionChat
+from api.models.enum import IngestionStatus
 from api.storage import storage_service
 
-from .core.ingestion.schemas import FileInput
+from .core.executors import run_in_thread
+from .core.ingestion.typhoon_ocr.ocr_cache import get_ocr_cache
+from .core.llm_cache import get_llm_cache
 from .dependencies import (
     DocumentIngestorService,
     DocumentService,
@@ -33,7 +43,8 @@ from .dependencies import (
     get_rag_agent,
     get_topic_modelling_service,
 )
-from .utils import normalize_file_input
+from .utils import hash_content, spool_upload_to_file
+from .worker import build_ingestion_job, ingest_documents_concurrently
 
 router = APIRouter(prefix="/agentic", tags=["agentic"])
 
@@ -46,50 +57,70 @@ router = APIRouter(prefix="/agentic", tags=["agentic"])
 )
 async def upload_and_ingest_documents(
     collection_id: str,
-    document_ingestor: DocumentIngestorService = Depends(get_document_ingestor),
     document_service: DocumentService = Depends(get_document_service),
     topic_modelling_service: TopicModellingService = Depends(
         get_topic_modelling_service
     ),
+    queue_service: QueueService = Depends(get_queue_service),
     current_user: User = Depends(get_current_user),
     *,
     input_files: list[UploadFile],
+    background: bool = Query(
+        False, description="Queue ingestion for the worker processes"
+    ),
 ):
     """
     Ingest multiple documents into the system.
     This endpoint allows users to upload multiple documents for processing and storage.
-    Returns after all documents have been ingested and clustering has been completed.
+    By default the files are ingested concurrently and it returns after all documents
+    have been ingested and clustering has been completed. With `background=true`
+    documents are queued for the ingestion workers and returned as pending; progress
+    is published as document events.
     """
     created_documents = []
     errors = []
+    # (document, content) pairs to ingest inline when not in background mode
+    pending = []
+    # Temp copies of very large uploads, removed once they are ingested or queued
+    spooled_paths = []
+    settings = get_settings()
+    streaming_threshold = settings.STREAMING_INGEST_THRESHOLD_BYTES
     for input_file in input_files:
         try:
-            object_name, file_type, _ = DocumentService.prepare_file_upload(
-                input_file, current_user.id, collection_id
-            )
-
-            # Read file content once at the beginning
-            file_content = await input_file.read()
-            if not file_content:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Uploaded file is empty: {input_file.filename}",
+            spooled = (input_file.size or 0) > streaming_threshold
+            if spooled:
+                # Spool to disk so the file is never held in memory; it is
+                # ingested page by page from the local copy
+                file_content, file_size, content_hash = await run_in_thread(
+                    spool_upload_to_file, input_file
                 )
+                spooled_paths.append(file_content)
+            else:
+                # Read file content once at the beginning
+                file_content = await input_file.read()
+                file_size = len(file_content)
+                if not file_content:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Uploaded file is empty: {input_file.filename}",
+                    )
+                content_hash = await run_in_thread(hash_content, file_content)
 
-            # Rewind the file to be read again by the storage service
-            await input_file.seek(0)
-
-            stored_path = await storage_service.upload_file_to_storage(
-                input_file, object_name
+            # Content-addressed: identical files are stored once
+            object_name, file_type, _ = DocumentService.prepare_file_upload(
+                input_file, current_user.id, collection_id, content_hash=content_hash
             )
 
+            # The document is committed before the file is stored, so a
+            # concurrent delete of an identical upload keeps the file
             document = document_service.create_document(
                 document_data=DocumentCreate(
                     file_name=input_file.filename or "uploaded_file",
                     file_type=file_type,
-                    file_size=len(file_content),
-                    source_file_path=stored_path,
+                    file_size=file_size,
+                    source_file_path=object_name,
                     collection_id=collection_id,
+                    content_hash=content_hash,
                 ),
                 user=current_user,
             )
@@ -97,34 +128,88 @@ async def upload_and_ingest_documents(
                 raise RuntimeError(
                     f"Failed to create document record for {input_file.filename}"
                 )
-            formatted_input = FileInput(
-                name=input_file.filename or "uploaded_file",
-                file_name=input_file.filename or "uploaded_file",
-                content=file_content,
-                type=file_type,
-                is_path=False,
-            )
-            input_file_model: FileInput = normalize_file_input(formatted_input)
 
-            # detach user/ document
-            current_user = UserResponse.model_validate(current_user)
-            current_document = DocumentResponse.model_validate(document)
+            if spooled:
+                upload = functools.partial(
+                    storage_service.upload_file_from_path,
+                    file_content,
+                    object_name,
+                    input_file.content_type,
+                )
+            else:
+                upload = functools.partial(
+                    storage_service.upload_file_from_fileobj,
+                    settings.MINIO_BUCKET_NAME,
+                    object_name,
+                    io.BytesIO(file_content),
+                    file_size,
+                    input_file.content_type,
+                )
+            try:
+                await run_in_thread(
+                    DocumentService.store_source_file, object_name, upload
+                )
+            except Exception:
+                document_service.delete_document(document.id, current_user)
+                raise
 
-            # Ingest the document
-            await document_ingestor.ingest_file(
-                input_file=input_file_model,
-                document=current_document,
-                graph_extract=True,
-                user=current_user,
-            )
-            created_documents.append(document)
+            if background:
+                try:
+                    # pika is blocking; keep it off the event loop
+                    await run_in_thread(
+                        queue_service.publish_ingestion_job,
+                        build_ingestion_job(document, current_user.id),
+                    )
+                    await run_in_thread(
+                        queue_service.publish_document_event,
+                        document.id,
+                        "ingestion_queued",
+                        {"status": IngestionStatus.pending.value},
+                    )
+                except Exception:
+                    document_service.update_document(
+                        document.id,
+                        DocumentUpdate(status=IngestionStatus.failed),
+                        current_user,
+                    )
+                    raise
+                created_documents.append(document)
+                continue
+
+            pending.append((document, file_content))
         except Exception as e:
             errors.append({"file": input_file.filename, "error": str(e)})
+
+    try:
+        if pending:
+            # Each file is ingested in its own session; a failure only affects that file
+            results = await ingest_documents_concurrently(
+                jobs=[
+                    build_ingestion_job(document, current_user.id)
+                    for document, _ in pending
+                ],
+                contents=[content for _, content in pending],
+            )
+            for (document, _), error in zip(pending, results):
+                if error is not None:
+                    errors.append({"file": document.file_name, "error": str(error)})
+                    continue
+                document_service.db.refresh(document)
+                created_documents.append(document)
+    finally:
+        for path in spooled_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
     if not created_documents:
         raise HTTPException(
             status_code=500, detail=f"No documents created. Errors: {errors}"
         )
 
+    # Workers cluster the collection once its queued documents are ingested
+    if background:
+        return created_documents
+
     # Trigger clustering after a short delay
     await asyncio.sleep(2)
     try:
@@ -183,7 +268,7 @@ async def graph_extract(
         user=current_user,
     )
 
-    document_ingestor._merge_and_store_collection_knowledge_graph(
+    await document_ingestor.merge_collection_knowledge_graph(
         kg=kg,
         collection_id=document.collection_id,
         user=current_user,
@@ -227,6 +312,68 @@ async def cluster_documents(
     )
 
 
+@router.delete(
+    "/ocr_cache",
+    tags=["agentic"],
+    status_code=status.HTTP_200_OK,
+)
+async def invalidate_ocr_cache(
+    stale_only: bool = Query(
+        True, description="Only delete entries made with an outdated OCR prompt"
+    ),
+    model_name: Optional[str] = Query(
+        None, description="Only delete entries of this VLM model"
+    ),
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    Invalidate cached OCR results (ADMIN_EMAILS only), e.g. after the OCR prompt changes.
+    """
+    ocr_cache = get_ocr_cache()
+    try:
+        deleted = await run_in_thread(
+            ocr_cache.invalidate, model_name=model_name, stale_only=stale_only
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to invalidate OCR cache: {str(e)}"
+        ) from e
+    return {"deleted": deleted, "stats": ocr_cache.stats()}
+
+
+@router.delete(
+    "/llm_cache",
+    tags=["agentic"],
+    status_code=status.HTTP_200_OK,
+)
+async def clear_llm_cache(
+    expired_only: bool = Query(
+        True,
+        description="Only evict expired entries and those beyond the size limit",
+    ),
+    model_name: Optional[str] = Query(
+        None, description="Only delete entries of this LLM model"
+    ),
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    Clear cached LLM responses (ADMIN_EMAILS only), e.g. after changing a prompt's meaning
+    without changing its text.
+    """
+    llm_cache = get_llm_cache()
+    try:
+        if expired_only:
+            deleted = await run_in_thread(llm_cache.evict)
+        else:
+            deleted = await run_in_thread(llm_cache.clear, model_name)
+        usage = await run_in_thread(llm_cache.usage)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to clear LLM cache: {str(e)}"
+        ) from e
+    return {"deleted": deleted, "usage": usage, "stats": llm_cache.stats()}
+
+
 @router.post(
     "/rag_query",
     response_model=AgentResponse,
@@ -249,7 +396,9 @@ async def rag_query(
     else:
         rag_agent.create_flow(flow_type="collection")
 
-    shared_store = rag_agent.run(
+    # The agent flow is synchronous (LLM, embedding and DB calls)
+    shared_store = await run_in_thread(
+        rag_agent.run,
         user_question=request.user_question,
         collection_chat_id=collection_chat.id,
         references=request.reference,
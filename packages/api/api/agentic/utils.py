@@ -1,8 +1,14 @@
+import hashlib
 import os
+import tempfile
 from typing import Union
 
+from fastapi import UploadFile
+
 from .core.ingestion.schemas import FileInput
 
+SPOOL_COPY_BUFFER_BYTES = 1024 * 1024
+
 MIME_TYPE_MAPPING = {
     # Common file types and their extensions
     "application/pdf": ".pdf",
@@ -31,6 +37,7 @@ MIME_TYPE_MAPPING = {
     "image/gif": ".gif",
     "image/bmp": ".bmp",
     "image/webp": ".webp",
+    "image/tiff": ".tiff",
 }
 
 
@@ -89,3 +96,32 @@ def normalize_file_input(input_file: Union[str, FileInput]) -> FileInput:
 
     else:
         raise ValueError("Input must be a file path (str) or FileInput instance")
+
+
+def create_spool_file(file_name: str = "") -> str:
+    """Create an empty temp file for spooling, keeping the file extension."""
+    suffix = os.path.splitext(file_name)[1]
+    with tempfile.NamedTemporaryFile(
+        prefix="ingest-", suffix=suffix, delete=False
+    ) as spool:
+        return spool.name
+
+
+def hash_content(content: bytes) -> str:
+    """SHA-256 of file content, used to deduplicate uploads."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def spool_upload_to_file(upload: UploadFile) -> tuple[str, int, str]:
+    """
+    Copy an upload to a temp file in fixed-size blocks, hashing it on the way.
+    Returns (path, size, SHA-256).
+    """
+    path = create_spool_file(upload.filename or "")
+    digest = hashlib.sha256()
+    upload.file.seek(0)
+    with open(path, "wb") as spool:
+        while block := upload.file.read(SPOOL_COPY_BUFFER_BYTES):
+            digest.update(block)
+            spool.write(block)
+        return path, spool.tell(), digest.hexdigest()
@@ -0,0 +1,407 @@
+"""
+Ingestion worker processes.
+
+Consumes document ingestion jobs published by `/agentic/upload_ingest` from the
+ingestion queue, runs the ingestion pipeline and reports progress through
+document events. Failed jobs are re-queued through a delayed retry queue with
+an incremented attempt count and dead-lettered once `INGESTION_MAX_RETRIES` is
+exhausted.
+
+Usage:
+    python -m api.agentic.worker --processes 2 --prefetch 1
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Optional, Union
+
+from dotenv import load_dotenv
+
+from api.auth.schemas import UserResponse
+from api.clustering.service import ClusteringService
+from api.collection.service import CollectionService
+from api.config import get_settings
+from api.database import SessionLocal, advisory_lock
+from api.document.schemas import DocumentResponse
+from api.document.service import DocumentService
+from api.message_queue.client import QueueClient
+from api.message_queue.service import INGESTION_QUEUE, QueueService
+from api.models.document import Document
+from api.models.enum import IngestionStatus
+from api.models.user import User
+from api.storage import storage_service
+
+from .core import DocumentIngestorService, TopicModellingService
+from .core.executors import run_in_thread
+from .core.ingestion.ingest_methods import get_chunker_registry
+from .core.ingestion.schemas import FileInput
+from .dependencies import (
+    get_knowledge_graph_extractor,
+    get_knowledge_graph_merger,
+    get_summary_generator,
+    get_text_embedder,
+)
+from .utils import create_spool_file, normalize_file_input
+
+RETRY_BASE_DELAY_SECONDS = 5
+RETRY_MAX_DELAY_SECONDS = 60
+# Advisory lock namespace of collection clustering, held across processes
+CLUSTERING_LOCK = "collection_clustering"
+
+
+def build_ingestion_job(
+    document: Document, user_id: str, graph_extract: bool = True
+) -> dict[str, Any]:
+    """Build the queue message for ingesting a stored document."""
+    return {
+        "document_id": document.id,
+        "collection_id": document.collection_id,
+        "user_id": user_id,
+        "graph_extract": graph_extract,
+        "attempt": 0,
+    }
+
+
+def build_document_ingestor(
+    db,
+    llm_semaphore: Optional[asyncio.Semaphore] = None,
+    cpu_executor: Optional[Executor] = None,
+) -> DocumentIngestorService:
+    """Build a DocumentIngestorService bound to the given session."""
+    text_embedder = get_text_embedder()
+    return DocumentIngestorService(
+        collection_service=CollectionService(db),
+        document_service=DocumentService(db),
+        text_embedder=text_embedder,
+        kg_extractor=get_knowledge_graph_extractor(),
+        kg_merger=get_knowledge_graph_merger(text_embedder),
+        summary_generator=get_summary_generator(),
+        llm_semaphore=llm_semaphore,
+        cpu_executor=cpu_executor,
+    )
+
+
+async def ingest_document_job(
+    job: dict[str, Any],
+    content: Optional[Union[bytes, str]] = None,
+    llm_semaphore: Optional[asyncio.Semaphore] = None,
+    cpu_executor: Optional[Executor] = None,
+) -> bool:
+    """
+    Run the ingestion pipeline for one job in its own session.
+
+    `content` skips the download when the caller still holds the file, either
+    as bytes or as the path of a spooled copy. Path content, and stored files
+    above STREAMING_INGEST_THRESHOLD_BYTES, are ingested in streaming mode.
+    Returns False if there is nothing to do.
+    """
+    spool_path = None
+    db = SessionLocal()
+    try:
+        document_service = DocumentService(db)
+        document = document_service.get_document(job["document_id"])
+        if not document:
+            print(f"Document {job['document_id']} no longer exists, skipping job")
+            return False
+
+        user = db.get(User, job["user_id"])
+        if not user:
+            print(f"User {job['user_id']} no longer exists, skipping job")
+            return False
+
+        # A failed attempt may have stored chunks without marking the document
+        if job.get("attempt", 0) > 0 and not document.is_vectorized:
+            document_service.delete_document_chunks(document.id)
+
+        # Content that was already ingested is cloned instead of re-processed
+        source = None
+        if document.content_hash and not document.is_vectorized:
+            source = document_service.get_document_by_content_hash(
+                document.content_hash, exclude_document_id=document.id
+            )
+        if source:
+            ingestor = build_document_ingestor(db, llm_semaphore, cpu_executor)
+            await ingestor.ingest_duplicate(
+                source=source,
+                document=DocumentResponse.model_validate(document),
+                graph_extract=job.get("graph_extract", True),
+                user=UserResponse.model_validate(user),
+            )
+            return True
+
+        if content is None:
+            streaming_threshold = get_settings().STREAMING_INGEST_THRESHOLD_BYTES
+            if (document.file_size or 0) > streaming_threshold:
+                spool_path = create_spool_file(document.file_name)
+                content = await run_in_thread(
+                    storage_service.download_file_to_path,
+                    document.source_file_path,
+                    spool_path,
+                )
+            else:
+                content = await run_in_thread(
+                    storage_service.download_file_from_storage,
+                    document.source_file_path,
+                )
+        streaming = isinstance(content, str)
+        input_file = normalize_file_input(
+            FileInput(
+                name=document.file_name,
+                file_name=document.file_name,
+                content=content,
+                type=document.file_type,
+                is_path=streaming,
+            )
+        )
+
+        ingestor = build_document_ingestor(db, llm_semaphore, cpu_executor)
+        ingest = ingestor.ingest_file_streaming if streaming else ingestor.ingest_file
+        await ingest(
+            input_file=input_file,
+            document=DocumentResponse.model_validate(document),
+            graph_extract=job.get("graph_extract", True),
+            user=UserResponse.model_validate(user),
+        )
+        return True
+    finally:
+        db.close()
+        if spool_path and os.path.exists(spool_path):
+            os.remove(spool_path)
+
+
+async def ingest_documents_concurrently(
+    jobs: list[dict[str, Any]],
+    contents: Optional[list[Union[bytes, str]]] = None,
+) -> list[Optional[Exception]]:
+    """
+    Ingest a batch of documents concurrently.
+
+    Each file runs in its own session, so one failure does not affect the
+    others. LLM calls, CPU-bound parsing/embedding and the number of files in
+    flight are bounded by the INGESTION_* settings and the shared CPU pools.
+    Returns one entry per job: None on success, otherwise the exception raised.
+    """
+    settings = get_settings()
+    llm_semaphore = asyncio.Semaphore(settings.INGESTION_LLM_CONCURRENCY)
+    file_semaphore = asyncio.Semaphore(settings.INGESTION_MAX_CONCURRENT_FILES)
+    contents = contents or [None] * len(jobs)
+
+    async def ingest(job: dict[str, Any], content: Optional[Union[bytes, str]]) -> None:
+        async with file_semaphore:
+            await ingest_document_job(job, content, llm_semaphore)
+
+    return await asyncio.gather(
+        *(ingest(job, content) for job, content in zip(jobs, contents)),
+        return_exceptions=True,
+    )
+
+
+async def cluster_collection_if_idle(collection_id: str, user_id: str) -> bool:
+    """
+    Cluster a collection once none of its documents are waiting for ingestion.
+
+    Runs under an advisory lock, so workers cluster a collection one at a time
+    and each sees the documents ingested before it.
+    """
+    with advisory_lock(CLUSTERING_LOCK, collection_id):
+        return await _cluster_collection_if_idle(collection_id, user_id)
+
+
+async def _cluster_collection_if_idle(collection_id: str, user_id: str) -> bool:
+    db = SessionLocal()
+    try:
+        in_progress = (
+            db.query(Document.id)
+            .filter(
+                Document.collection_id == collection_id,
+                Document.status.in_(
+                    [IngestionStatus.pending, IngestionStatus.processing]
+                ),
+            )
+            .first()
+        )
+        if in_progress:
+            return False
+
+        user = db.get(User, user_id)
+        topic_modelling_service = TopicModellingService(
+            document_service=DocumentService(db),
+            clustering_service=ClusteringService(db),
+            embedding_model=get_text_embedder(),
+        )
+        await topic_modelling_service.cluster_and_store_documents(
+            collection_id=collection_id,
+            user=user,
+            cluster_title_top_n_topics=5,
+            cluster_title_top_n_words=50,
+            title_generated_methods="by_summaries",
+        )
+        return True
+    finally:
+        db.close()
+
+
+def mark_document_pending(document_id: str) -> None:
+    """Put a failed document back to pending while its retry is queued."""
+    db = SessionLocal()
+    try:
+        db.query(Document).filter(Document.id == document_id).update(
+            {Document.status: IngestionStatus.pending}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+class IngestionJobHandler:
+    """Queue callback that runs one ingestion job with retry and progress events."""
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max_retries
+        # QueueService holds a single connection, so each handler thread gets its own
+        self._local = threading.local()
+
+    @property
+    def queue_service(self) -> QueueService:
+        if not hasattr(self._local, "queue_service"):
+            self._local.queue_service = QueueService()
+        return self._local.queue_service
+
+    def _publish_progress(
+        self, document_id: str, event_type: str, data: dict[str, Any]
+    ) -> None:
+        try:
+            self.queue_service.publish_document_event(document_id, event_type, data)
+        except Exception as e:
+            print(f"Failed to publish {event_type} for document {document_id}: {e}")
+
+    def __call__(self, job: dict[str, Any]) -> None:
+        document_id = job["document_id"]
+        attempt = job.get("attempt", 0)
+        self._publish_progress(
+            document_id,
+            "ingestion_started",
+            {"status": IngestionStatus.processing.value, "attempt": attempt},
+        )
+
+        try:
+            ingested = asyncio.run(ingest_document_job(job))
+        except Exception as e:
+            if attempt < self.max_retries:
+                delay = min(
+                    RETRY_BASE_DELAY_SECONDS * 2**attempt, RETRY_MAX_DELAY_SECONDS
+                )
+                # Pending, not failed, so the collection is not clustered
+                # before the retry has run
+                mark_document_pending(document_id)
+                self._publish_progress(
+                    document_id,
+                    "ingestion_retry",
+                    {
+                        "status": IngestionStatus.pending.value,
+                        "attempt": attempt,
+                        "error": str(e),
+                        "retry_in_seconds": delay,
+                    },
+                )
+                # The retry is a new message; this delivery is acknowledged
+                self.queue_service.publish_ingestion_retry(
+                    {**job, "attempt": attempt + 1}, delay
+                )
+                return
+
+            self._publish_progress(
+                document_id,
+                "ingestion_failed",
+                {"status": IngestionStatus.failed.value, "error": str(e)},
+            )
+            # Raising nacks the delivery, which dead-letters it
+            raise
+
+        if not ingested:
+            return
+
+        self._publish_progress(
+            document_id,
+            "ingestion_completed",
+            {"status": IngestionStatus.ready.value, "attempt": attempt},
+        )
+
+        try:
+            if asyncio.run(
+                cluster_collection_if_idle(job["collection_id"], job["user_id"])
+            ):
+                self.queue_service.publish_collection_event(
+                    job["collection_id"], "clustering_completed", {}
+                )
+        except Exception as e:
+            print(f"Automatic clustering failed for {job['collection_id']}: {e}")
+
+
+def run_worker(prefetch_count: int) -> None:
+    """Consume ingestion jobs until the process is stopped."""
+    settings = get_settings()
+    QueueService().initialize_ingestion_queues()
+    get_chunker_registry().warmup()
+    handler = IngestionJobHandler(max_retries=settings.INGESTION_MAX_RETRIES)
+
+    with QueueClient() as consumer:
+        consumer.consume_messages(
+            INGESTION_QUEUE,
+            handler,
+            prefetch_count=prefetch_count,
+            threaded=True,
+        )
+
+
+def main():
+    load_dotenv()
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Document ingestion workers")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.INGESTION_WORKER_PROCESSES,
+        help="Number of worker processes.",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=settings.INGESTION_WORKER_PREFETCH,
+        help="Jobs each worker process runs concurrently.",
+    )
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+
+    def start() -> multiprocessing.Process:
+        process = context.Process(target=run_worker, args=(args.prefetch,))
+        process.start()
+        return process
+
+    print(f"Starting {args.processes} ingestion workers (prefetch {args.prefetch})")
+    processes = [start() for _ in range(args.processes)]
+    try:
+        while True:
+            for index, process in enumerate(processes):
+                if not process.is_alive():
+                    print(
+                        f"Ingestion worker {process.pid} exited with "
+                        f"{process.exitcode}, restarting"
+                    )
+                    processes[index] = start()
+            time.sleep(5)
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from .dependencies import (
     get_auth_service,
     get_current_account,
     get_current_account_optional,
+    get_current_admin,
     get_current_user,
     get_current_user_optional,
 )
@@ -25,6 +26,7 @@ __all__ = [
     "get_current_user_optional",
     "get_current_account",
     "get_current_account_optional",
+    "get_current_admin",
     "UserRegisterRequest",
     "UserLoginRequest",
     "UserResponse",
@@ -6,6 +6,7 @@ from typing import Optional
 from fastapi import Cookie, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
+from ..config import get_settings
 from ..database import get_db
 from ..models.user import Account, User
 from .service import AuthService
@@ -53,6 +54,15 @@ def get_current_user(
     return current_user
 
 
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Get current user, who must be listed in ADMIN_EMAILS."""
+    if current_user.email.lower() not in get_settings().ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return current_user
+
+
 def get_current_account_optional(
     request: Request,
     session_token: Optional[str] = Cookie(None, alias="session"),
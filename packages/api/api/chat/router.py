@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Query, status
 
 from ..agentic.agent import rag_agent
+from ..agentic.core.executors import run_in_thread
 from ..agentic.dependencies import get_rag_agent
 from ..auth.dependencies import get_current_user
 from ..message_queue.service import get_queue_service
@@ -45,7 +46,9 @@ async def create_chat_with_rag(
         else:
             rag_agent.create_flow(flow_type="collection")
 
-        shared_store = rag_agent.run(
+        # The agent flow is synchronous (LLM, embedding and DB calls)
+        shared_store = await run_in_thread(
+            rag_agent.run,
             collection_chat_id=chat.id,
             user_question=chat_data.message,
             references=None,
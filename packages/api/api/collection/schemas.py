@@ -96,6 +96,15 @@ class CollectionNodeBase(BaseModel):
     )
     type: str = Field(..., min_length=1, max_length=100, description="Node type")
     label: str = Field(..., min_length=1, max_length=255, description="Node label")
+    aliases: list[str] = Field(
+        default_factory=list, description="Labels merged into this node"
+    )
+
+
+class CollectionGraphNode(CollectionNodeBase):
+    """Schema for a node written as part of a bulk graph insert."""
+
+    id: str = Field(..., description="Caller-side node ID, remapped on insert")
 
 
 class CollectionNodeCreate(CollectionNodeBase):
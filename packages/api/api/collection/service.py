@@ -4,6 +4,8 @@ from typing import Optional
 from uuid import uuid4
 
 from fastapi import HTTPException, status
+from pgvector import Vector
+from sqlalchemy import insert, text, tuple_, update
 from sqlalchemy.orm import Session, joinedload
 
 from ..models.collection import (
@@ -16,7 +18,9 @@ from ..models.user import User
 from .permission.service import CollectionPermissionService
 from .schemas import (
     CollectionCreate,
+    CollectionEdgeBase,
     CollectionEdgeCreate,
+    CollectionGraphNode,
     CollectionNodeCreate,
     CollectionRelationCreate,
     CollectionUpdate,
@@ -224,6 +228,7 @@ class CollectionService:
             description=node_data.description,
             type=node_data.type,
             label=node_data.label,
+            aliases=node_data.aliases,
             created_by=user.id,
             updated_by=user.id,
         )
@@ -270,6 +275,308 @@ class CollectionService:
         self.db.refresh(edge)
         return edge
 
+    # Bulk graph operations
+    def bulk_create_collection_graph(
+        self,
+        relation_id: str,
+        nodes: list[CollectionGraphNode],
+        edges: list[CollectionEdgeBase],
+        user: User,
+    ) -> dict[str, str]:
+        """
+        Insert all nodes and edges of a graph into a relation in one transaction.
+
+        The relation and the user's permission are checked once. Edge endpoints
+        are remapped from caller-side node IDs to the generated ones; edges that
+        reference unknown nodes are skipped. Returns the old-to-new node ID map.
+        """
+        relation = (
+            self.db.query(CollectionRelation)
+            .filter(CollectionRelation.id == relation_id)
+            .first()
+        )
+
+        if not relation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Relation not found"
+            )
+
+        if not self._can_modify_relation(relation, user):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to modify this relation",
+            )
+
+        id_map: dict[str, str] = {}
+        node_rows = []
+        for node in nodes:
+            if node.id in id_map:
+                continue
+            id_map[node.id] = str(uuid4())
+            node_rows.append(
+                {
+                    "id": id_map[node.id],
+                    "collection_relation_id": relation_id,
+                    "title": node.title,
+                    "description": node.description,
+                    "type": node.type,
+                    "label": node.label,
+                    "aliases": node.aliases,
+                    "created_by": user.id,
+                    "updated_by": user.id,
+                }
+            )
+
+        edge_rows = [
+            {
+                "id": str(uuid4()),
+                "collection_relation_id": relation_id,
+                "label": edge.label,
+                "source": id_map[edge.source],
+                "target": id_map[edge.target],
+                "created_by": user.id,
+                "updated_by": user.id,
+            }
+            for edge in edges
+            if edge.source in id_map and edge.target in id_map
+        ]
+
+        try:
+            if node_rows:
+                self.db.execute(insert(CollectionNode), node_rows)
+            if edge_rows:
+                self.db.execute(insert(CollectionEdge), edge_rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return id_map
+
+    def get_collection_nodes_without_embedding(
+        self, relation_id: str
+    ) -> list[tuple[str, str]]:
+        """Get (id, label) of the nodes in a relation that have no label embedding."""
+        return (
+            self.db.query(CollectionNode.id, CollectionNode.label)
+            .filter(
+                CollectionNode.collection_relation_id == relation_id,
+                CollectionNode.embedding.is_(None),
+            )
+            .all()
+        )
+
+    def find_nearest_collection_nodes(
+        self, relation_id: str, embeddings: list[list[float]]
+    ) -> list[Optional[tuple[str, float]]]:
+        """
+        For each label embedding, the (id, cosine similarity) of the most
+        similar node in a relation, or None if it has no embedded nodes.
+        The search runs in the database, one lateral lookup per embedding.
+        """
+        if not embeddings:
+            return []
+
+        rows = self.db.execute(
+            text(
+                """
+                SELECT q.position, nearest.id, 1 - nearest.distance AS similarity
+                FROM unnest(CAST(:embeddings AS text[]))
+                    WITH ORDINALITY AS q(embedding, position)
+                CROSS JOIN LATERAL (
+                    SELECT n.id, n.embedding <=> CAST(q.embedding AS vector) AS distance
+                    FROM collection_node n
+                    WHERE n.collection_relation_id = :relation_id
+                      AND n.embedding IS NOT NULL
+                    ORDER BY distance
+                    LIMIT 1
+                ) nearest
+                """
+            ),
+            {
+                "embeddings": [Vector(embedding).to_text() for embedding in embeddings],
+                "relation_id": relation_id,
+            },
+        ).all()
+
+        nearest: list[Optional[tuple[str, float]]] = [None] * len(embeddings)
+        for position, node_id, similarity in rows:
+            nearest[position - 1] = (node_id, float(similarity))
+        return nearest
+
+    def set_collection_node_embeddings(
+        self, embeddings: dict[str, list[float]]
+    ) -> None:
+        """Store label embeddings for existing nodes, keyed by node ID."""
+        if not embeddings:
+            return
+
+        try:
+            self.db.execute(
+                update(CollectionNode),
+                [
+                    {"id": node_id, "embedding": embedding}
+                    for node_id, embedding in embeddings.items()
+                ],
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def upsert_collection_graph(
+        self,
+        relation_id: str,
+        nodes: list[CollectionGraphNode],
+        node_embeddings: list[list[float]],
+        edges: list[CollectionEdgeBase],
+        user: User,
+        added_aliases: Optional[dict[str, list[str]]] = None,
+    ) -> dict[str, str]:
+        """
+        Add new nodes and edges to an existing relation in one transaction.
+
+        Edge endpoints may reference either the caller-side IDs of `nodes` or
+        IDs of nodes already in the relation. Edges that already exist are not
+        written again. Existing nodes are only changed by `added_aliases`,
+        labels added to their aliases, keyed by node ID. Returns the
+        caller-side to generated ID map of the inserted nodes.
+        """
+        relation = (
+            self.db.query(CollectionRelation)
+            .filter(CollectionRelation.id == relation_id)
+            .first()
+        )
+
+        if not relation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Relation not found"
+            )
+
+        if not self._can_modify_relation(relation, user):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to modify this relation",
+            )
+
+        id_map: dict[str, str] = {}
+        node_rows = []
+        for node, embedding in zip(nodes, node_embeddings):
+            if node.id in id_map:
+                continue
+            id_map[node.id] = str(uuid4())
+            node_rows.append(
+                {
+                    "id": id_map[node.id],
+                    "collection_relation_id": relation_id,
+                    "title": node.title,
+                    "description": node.description,
+                    "type": node.type,
+                    "label": node.label,
+                    "aliases": node.aliases,
+                    "embedding": embedding,
+                    "created_by": user.id,
+                    "updated_by": user.id,
+                }
+            )
+
+        # Only the persisted nodes and edges the new edges touch are looked up
+        endpoints = [
+            (id_map.get(edge.source, edge.source), id_map.get(edge.target, edge.target))
+            for edge in edges
+        ]
+        referenced_ids = {node_id for pair in endpoints for node_id in pair} - set(
+            id_map.values()
+        )
+        existing_node_ids = (
+            {
+                node_id
+                for (node_id,) in self.db.query(CollectionNode.id).filter(
+                    CollectionNode.collection_relation_id == relation_id,
+                    CollectionNode.id.in_(referenced_ids),
+                )
+            }
+            if referenced_ids
+            else set()
+        )
+        known_node_ids = set(id_map.values()) | existing_node_ids
+        candidate_edges = {
+            (source, target, edge.label)
+            for (source, target), edge in zip(endpoints, edges)
+            if source in existing_node_ids and target in existing_node_ids
+        }
+        existing_edges = (
+            set(
+                self.db.query(
+                    CollectionEdge.source, CollectionEdge.target, CollectionEdge.label
+                )
+                .filter(
+                    CollectionEdge.collection_relation_id == relation_id,
+                    tuple_(
+                        CollectionEdge.source,
+                        CollectionEdge.target,
+                        CollectionEdge.label,
+                    ).in_(candidate_edges),
+                )
+                .all()
+            )
+            if candidate_edges
+            else set()
+        )
+
+        edge_rows = []
+        for (source, target), edge in zip(endpoints, edges):
+            if source not in known_node_ids or target not in known_node_ids:
+                continue
+            if (source, target, edge.label) in existing_edges:
+                continue
+            existing_edges.add((source, target, edge.label))
+            edge_rows.append(
+                {
+                    "id": str(uuid4()),
+                    "collection_relation_id": relation_id,
+                    "label": edge.label,
+                    "source": source,
+                    "target": target,
+                    "created_by": user.id,
+                    "updated_by": user.id,
+                }
+            )
+
+        alias_rows = []
+        if added_aliases:
+            current_aliases = dict(
+                self.db.query(CollectionNode.id, CollectionNode.aliases).filter(
+                    CollectionNode.collection_relation_id == relation_id,
+                    CollectionNode.id.in_(added_aliases),
+                )
+            )
+            for node_id, aliases in added_aliases.items():
+                current = current_aliases.get(node_id)
+                if current is None or set(aliases) <= set(current):
+                    continue
+                alias_rows.append(
+                    {
+                        "id": node_id,
+                        "aliases": sorted(set(current) | set(aliases)),
+                        "updated_by": user.id,
+                    }
+                )
+
+        try:
+            if node_rows:
+                self.db.execute(insert(CollectionNode), node_rows)
+            if edge_rows:
+                self.db.execute(insert(CollectionEdge), edge_rows)
+            if alias_rows:
+                self.db.execute(update(CollectionNode), alias_rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return id_map
+
     # Permission helper methods
     def _can_access_collection(self, collection: Collection, user: User) -> bool:
         """Check if user can access a collection."""
@@ -1,5 +1,6 @@
 """Application configuration."""
 
+import json
 import os
 from functools import lru_cache
 
@@ -26,6 +27,130 @@ class Settings:
     RABBITMQ_PASSWORD: str = os.getenv("RABBITMQ_DEFAULT_PASS", "guest")
     RABBITMQ_VHOST: str = os.getenv("RABBITMQ_VHOST", "/")
 
+    # Comma-separated emails of users allowed to run maintenance endpoints
+    ADMIN_EMAILS: list[str] = [
+        email.strip().lower()
+        for email in os.getenv("ADMIN_EMAILS", "").split(",")
+        if email.strip()
+    ]
+
+    # LLM gateway (see api.agentic.core.llm_gateway); rate limits of 0 are off
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    LLM_REQUESTS_PER_MINUTE: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+    # Per-model overrides, e.g. {"openai/typhoon-ocr-preview": {"max_concurrency": 2}}
+    LLM_MODEL_LIMITS: dict = json.loads(os.getenv("LLM_MODEL_LIMITS", "{}") or "{}")
+    # Completion tokens assumed for rate limiting when a call sets no max_tokens
+    LLM_DEFAULT_COMPLETION_TOKENS: int = int(
+        os.getenv("LLM_DEFAULT_COMPLETION_TOKENS", "1024")
+    )
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    LLM_BACKOFF_BASE_SECONDS: float = float(
+        os.getenv("LLM_BACKOFF_BASE_SECONDS", "1.0")
+    )
+    LLM_BACKOFF_MAX_SECONDS: float = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+    LLM_HTTP_MAX_KEEPALIVE: int = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+    LLM_HTTP_TIMEOUT_SECONDS: float = float(
+        os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "600")
+    )
+
+    # Persistent LLM response cache (see the llm_cache table); a TTL of 0 never expires
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL_SECONDS: int = int(
+        os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600))
+    )
+    LLM_CACHE_MAX_BYTES: int = int(
+        os.getenv("LLM_CACHE_MAX_BYTES", str(1024 * 1024 * 1024))
+    )
+    # Evict expired and least recently used entries after this many stores
+    LLM_CACHE_EVICT_EVERY: int = int(os.getenv("LLM_CACHE_EVICT_EVERY", "200"))
+
+    # Ingestion worker settings
+    INGESTION_WORKER_PROCESSES: int = int(os.getenv("INGESTION_WORKER_PROCESSES", "2"))
+    INGESTION_WORKER_PREFETCH: int = int(os.getenv("INGESTION_WORKER_PREFETCH", "1"))
+    INGESTION_MAX_RETRIES: int = int(os.getenv("INGESTION_MAX_RETRIES", "3"))
+    # Concurrency within one ingestion batch
+    INGESTION_MAX_CONCURRENT_FILES: int = int(
+        os.getenv("INGESTION_MAX_CONCURRENT_FILES", "8")
+    )
+    INGESTION_LLM_CONCURRENCY: int = int(os.getenv("INGESTION_LLM_CONCURRENCY", "8"))
+    # Files above this size are spooled to disk and ingested page by page
+    STREAMING_INGEST_THRESHOLD_BYTES: int = int(
+        os.getenv("STREAMING_INGEST_THRESHOLD_BYTES", str(50 * 1024 * 1024))
+    )
+    STREAMING_INGEST_BATCH_CHUNKS: int = int(
+        os.getenv("STREAMING_INGEST_BATCH_CHUNKS", "256")
+    )
+    # Streamed text held in memory before it is spooled to disk
+    STREAMING_INGEST_TEXT_FLUSH_CHARS: int = int(
+        os.getenv("STREAMING_INGEST_TEXT_FLUSH_CHARS", str(4 * 1024 * 1024))
+    )
+
+    # Shared executors for CPU-bound work (see api.agentic.core.executors)
+    CPU_THREAD_POOL_WORKERS: int = int(
+        os.getenv("CPU_THREAD_POOL_WORKERS", str(min(32, (os.cpu_count() or 1) + 4)))
+    )
+    CPU_PROCESS_POOL_WORKERS: int = int(
+        os.getenv("CPU_PROCESS_POOL_WORKERS", str(os.cpu_count() or 1))
+    )
+    EVENT_LOOP_LAG_INTERVAL: float = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+
+    # Windowed knowledge graph extraction for texts beyond one LLM call
+    KG_WINDOWED_EXTRACTION: bool = (
+        os.getenv("KG_WINDOWED_EXTRACTION", "true").lower() == "true"
+    )
+    KG_WINDOW_CHARS: int = int(os.getenv("KG_WINDOW_CHARS", "15000"))
+    KG_WINDOW_OVERLAP_CHARS: int = int(os.getenv("KG_WINDOW_OVERLAP_CHARS", "1000"))
+    KG_WINDOW_CONCURRENCY: int = int(os.getenv("KG_WINDOW_CONCURRENCY", "4"))
+    # Caps LLM calls per document; later text is not extracted
+    KG_MAX_WINDOWS: int = int(os.getenv("KG_MAX_WINDOWS", "64"))
+
+    # Map-reduce summaries of texts beyond one LLM call
+    SUMMARY_HIERARCHICAL: bool = (
+        os.getenv("SUMMARY_HIERARCHICAL", "true").lower() == "true"
+    )
+    SUMMARY_SECTION_CHARS: int = int(os.getenv("SUMMARY_SECTION_CHARS", "8000"))
+    SUMMARY_SECTION_MAX_WORDS: int = int(os.getenv("SUMMARY_SECTION_MAX_WORDS", "80"))
+    SUMMARY_MAP_CONCURRENCY: int = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "8"))
+    SUMMARY_REDUCE_CONCURRENCY: int = int(os.getenv("SUMMARY_REDUCE_CONCURRENCY", "4"))
+    SUMMARY_REDUCE_FAN_IN: int = int(os.getenv("SUMMARY_REDUCE_FAN_IN", "8"))
+    # Estimated LLM tokens per document summary; sections beyond it are sampled
+    SUMMARY_TOKEN_BUDGET: int = int(os.getenv("SUMMARY_TOKEN_BUDGET", "200000"))
+    # Reuse partial summaries of unchanged sections (see the summary_cache table)
+    SUMMARY_CACHE_ENABLED: bool = (
+        os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+    )
+
+    # OCR of scanned PDF pages and multi-page images
+    OCR_RENDER_DPI: int = int(os.getenv("OCR_RENDER_DPI", "200"))
+    # Limits per process, shared by every document being OCRed
+    OCR_MAX_CONCURRENCY: int = int(os.getenv("OCR_MAX_CONCURRENCY", "4"))
+    # 0 disables the request rate limit
+    OCR_REQUESTS_PER_SECOND: float = float(os.getenv("OCR_REQUESTS_PER_SECOND", "0"))
+    # Reuse OCR results of previously seen images (see the ocr_cache table)
+    OCR_CACHE_ENABLED: bool = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+
+    # Vector search settings (chunk embeddings)
+    HNSW_EF_SEARCH: int = int(os.getenv("HNSW_EF_SEARCH", "100"))
+    IVFFLAT_PROBES: int = int(os.getenv("IVFFLAT_PROBES", "10"))
+    # pgvector >= 0.8 keeps scanning the index until a filtered top-k is filled;
+    # set to "" on older pgvector, where the setting does not exist
+    VECTOR_ITERATIVE_SCAN: str = os.getenv("VECTOR_ITERATIVE_SCAN", "strict_order")
+    # Minimum vector share of hybrid search for Thai queries: the 'simple'
+    # full-text config does not segment Thai, so its lexical rank is weak
+    HYBRID_THAI_VECTOR_WEIGHT: float = float(
+        os.getenv("HYBRID_THAI_VECTOR_WEIGHT", "0.9")
+    )
+
+    # In-process cache of single-text (query) embeddings
+    EMBEDDING_QUERY_CACHE_SIZE: int = int(
+        os.getenv("EMBEDDING_QUERY_CACHE_SIZE", "2048")
+    )
+    EMBEDDING_QUERY_CACHE_TTL: float = float(
+        os.getenv("EMBEDDING_QUERY_CACHE_TTL", "3600")
+    )
+
     @property
     def MINIO_POLICY(self):
         return {
@@ -1,8 +1,9 @@
 """Database configuration and dependencies."""
 
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, select
 from sqlalchemy.orm import sessionmaker
 
 from .config import get_settings
@@ -24,3 +25,28 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def advisory_lock(namespace: str, key: str, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold a Postgres advisory lock on (namespace, key) across processes.
+
+    The lock is session-level on a dedicated connection, so it survives the
+    commits made by the work it guards and is released if the process dies.
+    Yields whether the lock was acquired; with `blocking` it always is.
+    """
+    lock_args = (func.hashtext(namespace), func.hashtext(key))
+    with engine.connect() as conn:
+        if blocking:
+            conn.execute(select(func.pg_advisory_lock(*lock_args)))
+            acquired = True
+        else:
+            acquired = conn.execute(
+                select(func.pg_try_advisory_lock(*lock_args))
+            ).scalar_one()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(select(func.pg_advisory_unlock(*lock_args)))
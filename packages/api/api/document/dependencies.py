@@ -7,6 +7,7 @@ from ..auth.dependencies import get_current_user
 from ..database import get_db
 from ..models.document import Document, DocumentRelation
 from ..models.user import User
+from .service import ChunkVectorIndexService
 from .service import DocumentServiceSearch as DocumentService
 
 
@@ -15,6 +16,13 @@ def get_document_service(db: Session = Depends(get_db)) -> DocumentService:
     return DocumentService(db)
 
 
+def get_chunk_vector_index_service(
+    db: Session = Depends(get_db),
+) -> ChunkVectorIndexService:
+    """Get chunk vector index service instance."""
+    return ChunkVectorIndexService(db)
+
+
 def get_document_or_404(
     document_id: str,
     db: Session = Depends(get_db),
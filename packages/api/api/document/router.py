@@ -1,15 +1,17 @@
 """Document API routes."""
 
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session, joinedload
 
 from ..agentic.dependencies import TextEmbedder, get_text_embedder
-from ..auth.dependencies import get_current_user
+from ..auth.dependencies import get_current_admin, get_current_user
 from ..database import get_db
 from ..models.document import Document, DocumentRelation
 from ..models.user import User
-from ..storage import storage_service
 from .dependencies import (
+    get_chunk_vector_index_service,
     get_document_or_404,
     get_document_relation_or_404,
     get_document_relation_with_modify_permission,
@@ -33,7 +35,10 @@ from .schemas import (
     DocumentSearchResponse,
     DocumentSearchResponseTruncated,
     DocumentUpdate,
+    VectorIndexCreate,
+    VectorIndexResponse,
 )
+from .service import ChunkVectorIndexService
 from .service import DocumentServiceSearch as DocumentService
 
 router = APIRouter(prefix="/documents", tags=["documents"])
@@ -48,6 +53,54 @@ def list_user_documents(
     return document_service.get_user_documents(current_user.id)
 
 
+# Chunk embedding index routes
+@router.get("/chunks/index", response_model=list[VectorIndexResponse])
+def list_chunk_vector_indexes(
+    current_user: User = Depends(get_current_user),
+    index_service: ChunkVectorIndexService = Depends(get_chunk_vector_index_service),
+):
+    """List ANN indexes on chunk embeddings."""
+    return index_service.list_indexes()
+
+
+@router.post(
+    "/chunks/index",
+    response_model=VectorIndexResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_chunk_vector_index(
+    index_data: VectorIndexCreate,
+    current_user: User = Depends(get_current_admin),
+    index_service: ChunkVectorIndexService = Depends(get_chunk_vector_index_service),
+):
+    """Build (or rebuild with new parameters) an ANN index on chunk embeddings."""
+    return index_service.create_index(index_data)
+
+
+@router.post("/chunks/index/{method}/reindex", response_model=VectorIndexResponse)
+def reindex_chunk_vector_index(
+    method: Literal["hnsw", "ivfflat"],
+    current_user: User = Depends(get_current_admin),
+    index_service: ChunkVectorIndexService = Depends(get_chunk_vector_index_service),
+):
+    """Rebuild an ANN index on chunk embeddings in place."""
+    return index_service.reindex(method)
+
+
+@router.delete("/chunks/index/{method}", status_code=status.HTTP_204_NO_CONTENT)
+def drop_chunk_vector_index(
+    method: Literal["hnsw", "ivfflat"],
+    current_user: User = Depends(get_current_admin),
+    index_service: ChunkVectorIndexService = Depends(get_chunk_vector_index_service),
+):
+    """Drop an ANN index on chunk embeddings."""
+    if not index_service.drop_index(method):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No {method} index on chunk embeddings",
+        )
+
+
 @router.get("/{document_id}", response_model=DocumentDetailResponse)
 def get_document(
     document: Document = Depends(get_document_or_404),
@@ -80,9 +133,8 @@ def delete_document(
     document_service: DocumentService = Depends(get_document_service),
 ):
     """Delete a document."""
-    # Delete the document file from storage
-    storage_service.delete_file_from_storage(document.source_file_path)
-    document_service.delete_document(document.id, current_user)
+    # The stored file is kept while identical uploads share it
+    document_service.delete_document_and_source_file(document, current_user)
 
 
 # Chunk routes
@@ -153,6 +205,16 @@ def search_collection_chunks(
         min_length=1,
         description="Search query for chunks",
     ),
+    mode: Literal["vector", "hybrid"] = Query(
+        "vector",
+        description="vector: embedding distance only; hybrid: fused with full-text rank",
+    ),
+    fusion_weight: float = Query(
+        0.5,
+        ge=0.0,
+        le=1.0,
+        description="Share of the vector ranking in hybrid mode",
+    ),
     text_embedder: TextEmbedder = Depends(get_text_embedder),
     document_service: DocumentService = Depends(get_document_service),
 ) -> list[ChunkSearchResponse]:
@@ -160,9 +222,14 @@ def search_collection_chunks(
     # Convert query to embedding
     query_embedding = text_embedder.get_embedding(query)
 
-    # Search chunks using the embedding
+    # Search chunks using the embedding (and the query text in hybrid mode)
     return document_service.search_collection_chunks(
-        collection_id=collection_id, query_embedding=query_embedding, top_k=5
+        collection_id=collection_id,
+        query_embedding=query_embedding,
+        top_k=5,
+        mode=mode,
+        query_text=query,
+        fusion_weight=fusion_weight,
     )
 
 
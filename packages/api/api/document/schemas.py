@@ -1,7 +1,7 @@
 """Document schemas for request/response validation."""
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -30,6 +30,7 @@ class DocumentCreate(DocumentBase):
     collection_id: str = Field(
         ..., description="Collection ID this document belongs to"
     )
+    content_hash: Optional[str] = Field(None, description="SHA-256 of the file content")
 
 
 class DocumentUpdate(BaseModel):
@@ -153,6 +154,9 @@ class ChunkSearchResponse(ChunkResponse):
         None, description="Document description"
     )
     distance: float = Field(..., description="Distance score for similarity search")
+    score: Optional[float] = Field(
+        None, description="Fused relevance score for hybrid search"
+    )
 
     # Truncate description if too long
     @field_validator("document_description", mode="before")
@@ -176,6 +180,34 @@ class DocumentSearchResponseTruncated(TruncatedDocumentMixin, DocumentSearchResp
     pass
 
 
+class VectorIndexCreate(BaseModel):
+    """Schema for building an ANN index on chunk embeddings."""
+
+    method: Literal["hnsw", "ivfflat"] = Field(
+        "hnsw", description="Index access method"
+    )
+    m: int = Field(16, ge=2, le=100, description="HNSW max connections per layer")
+    ef_construction: int = Field(
+        64, ge=4, le=1000, description="HNSW candidate list size during build"
+    )
+    lists: int = Field(
+        1000, ge=1, le=32768, description="IVFFlat number of inverted lists"
+    )
+    replace_existing: bool = Field(
+        True, description="Drop other chunk embedding indexes after building"
+    )
+
+
+class VectorIndexResponse(BaseModel):
+    """Schema for an ANN index on chunk embeddings."""
+
+    name: str = Field(..., description="Index name")
+    method: str = Field(..., description="Index access method")
+    definition: str = Field(..., description="Index definition")
+    size_bytes: int = Field(..., description="On-disk index size in bytes")
+    is_valid: bool = Field(..., description="Whether the index is usable by queries")
+
+
 class DocumentRelationBase(BaseModel):
     """Base document relation schema."""
 
@@ -226,6 +258,9 @@ class DocumentNodeBase(BaseModel):
     )
     type: str = Field(..., description="Node type")
     label: str = Field(..., description="Node label")
+    aliases: list[str] = Field(
+        default_factory=list, description="Labels merged into this node"
+    )
 
 
 class DocumentNodeCreate(DocumentNodeBase):
@@ -1,19 +1,37 @@
 """Document service for managing documents and related entities."""
 
-from typing import Optional
+import re
+from typing import Any, Callable, Literal, Optional
 from uuid import uuid4
 
 from fastapi import HTTPException, UploadFile, status
-from sqlalchemy import text
+from sqlalchemy import (
+    Float,
+    Text,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session, aliased, joinedload
 
+from ..config import get_settings
+from ..database import advisory_lock
 from ..models.document import (
     Chunk,
     Document,
     DocumentEdge,
     DocumentNode,
     DocumentRelation,
+    EmbeddingCache,
 )
+from ..models.enum import IngestionStatus
 from ..models.user import User
 from ..storage import storage_service
 from .schemas import (
@@ -22,14 +40,50 @@ from .schemas import (
     ChunkSearchResponse,
     ChunkUpdate,
     DocumentCreate,
+    DocumentEdgeBase,
     DocumentEdgeCreate,
+    DocumentNodeBase,
     DocumentNodeCreate,
     DocumentRelationCreate,
     DocumentResponse,
     DocumentSearchResponse,
     DocumentUpdate,
+    VectorIndexCreate,
+    VectorIndexResponse,
 )
 
+# Operator class of chunk embedding indexes; must match Chunk.embedding.l2_distance
+VECTOR_INDEX_OPCLASS = "vector_l2_ops"
+
+# Reciprocal rank fusion constant; dampens the weight of the very top ranks
+RRF_K = 60
+
+# Thai script; written without spaces between words, so not segmented by the
+# 'simple' full-text config
+THAI_SCRIPT = re.compile(r"[\u0e00-\u0e7f]")
+
+# Upper bound on the OR-ed terms of the lexical half of hybrid search
+MAX_LEXICAL_QUERY_TERMS = 32
+
+
+def _any_term_tsquery(query_text: str):
+    """
+    tsquery matching any whitespace-separated term of the query. A term with
+    punctuation, such as an identifier, must match all of its parts.
+    """
+    terms = query_text.split()[:MAX_LEXICAL_QUERY_TERMS]
+    ts_query = func.plainto_tsquery("simple", terms[0])
+    for term in terms[1:]:
+        ts_query = ts_query.op("||", return_type=TSQUERY)(
+            func.plainto_tsquery("simple", term)
+        )
+    return ts_query
+
+
+# Advisory lock namespace of content-addressed source files, shared by
+# uploads that reuse a stored file and deletes that remove it
+SOURCE_FILE_LOCK = "source_file"
+
 
 class DocumentService:
     """Service for managing documents and related operations."""
@@ -50,6 +104,7 @@ class DocumentService:
             source_file_path=document_data.source_file_path,
             file_type=document_data.file_type,
             file_size=document_data.file_size,
+            content_hash=document_data.content_hash,
             collection_id=document_data.collection_id,
             created_by=user.id,
             updated_by=user.id,
@@ -157,6 +212,13 @@ class DocumentService:
         self.db.refresh(document)
         return document
 
+    def set_document_text(self, document_id: str, text: str) -> None:
+        """Store a document's text without loading the document."""
+        self.db.execute(
+            update(Document).where(Document.id == document_id).values(document=text)
+        )
+        self.db.commit()
+
     def delete_document(self, document_id: str, user: User) -> bool:
         """Delete a document."""
         document = self.get_document(document_id)
@@ -175,6 +237,114 @@ class DocumentService:
         self.db.commit()
         return True
 
+    def get_document_by_content_hash(
+        self, content_hash: str, exclude_document_id: Optional[str] = None
+    ) -> Optional[Document]:
+        """
+        Get a fully ingested document with the given content hash, preferring
+        one with an extracted graph, then the most recent.
+        """
+        query = self.db.query(Document).filter(
+            Document.content_hash == content_hash,
+            Document.status == IngestionStatus.ready,
+            Document.is_vectorized.is_(True),
+        )
+        if exclude_document_id:
+            query = query.filter(Document.id != exclude_document_id)
+        return query.order_by(
+            Document.is_graph_extracted.desc(), Document.created_at.desc()
+        ).first()
+
+    def count_source_file_references(self, source_file_path: str) -> int:
+        """Number of documents stored in the given object."""
+        return (
+            self.db.query(func.count(Document.id))
+            .filter(Document.source_file_path == source_file_path)
+            .scalar()
+        )
+
+    @staticmethod
+    def store_source_file(object_name: str, upload: Callable[[], Any]) -> None:
+        """
+        Run `upload` unless the content-addressed object is stored already.
+
+        Call it once the document referencing the object is committed: under
+        the object's advisory lock, a concurrent delete either sees that
+        document and keeps the object, or removes it before the check here.
+        """
+        with advisory_lock(SOURCE_FILE_LOCK, object_name):
+            if not storage_service.file_exists(object_name):
+                upload()
+
+    def delete_document_and_source_file(self, document: Document, user: User) -> bool:
+        """Delete a document, and its stored file once no document shares it."""
+        source_file_path = document.source_file_path
+        with advisory_lock(SOURCE_FILE_LOCK, source_file_path):
+            self.delete_document(document.id, user)
+            if not self.count_source_file_references(source_file_path):
+                storage_service.delete_file_from_storage(source_file_path)
+        return True
+
+    def clone_document_content(
+        self, source_document_id: str, document_id: str, user: User
+    ) -> Document:
+        """
+        Copy the text, summary and chunk embeddings of an ingested document
+        into another document. Chunks are copied in the database, so their
+        embeddings never leave it; existing chunks of the target are replaced.
+        """
+        source = self.get_document(source_document_id)
+        document = self.get_document(document_id)
+        if not source or not document:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
+            )
+
+        try:
+            self.db.execute(delete(Chunk).where(Chunk.document_id == document_id))
+            self.db.execute(
+                insert(Chunk).from_select(
+                    [
+                        "id",
+                        "document_id",
+                        "chunk_text",
+                        "embedding",
+                        "page_number",
+                        "start_char",
+                        "end_char",
+                        "token_count",
+                        "created_by",
+                        "updated_by",
+                    ],
+                    select(
+                        cast(func.gen_random_uuid(), Text),
+                        literal(document_id, Text),
+                        Chunk.chunk_text,
+                        Chunk.embedding,
+                        Chunk.page_number,
+                        Chunk.start_char,
+                        Chunk.end_char,
+                        Chunk.token_count,
+                        literal(user.id, Text),
+                        literal(user.id, Text),
+                    ).where(Chunk.document_id == source_document_id),
+                )
+            )
+
+            document.title = source.title
+            document.document = source.document
+            document.description = source.description
+            document.summary = source.summary
+            document.is_vectorized = source.is_vectorized
+            document.updated_by = user.id
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.db.refresh(document)
+        return document
+
     def get_document_with_details(self, document_id: str) -> Optional[dict]:
         """Get document with all related data and MinIO file URL."""
         creator_alias = aliased(User)
@@ -234,6 +404,97 @@ class DocumentService:
         self.db.refresh(chunk)
         return chunk
 
+    def bulk_create_chunks(
+        self, chunks_data: list[ChunkCreate], user: User, batch_size: int = 1000
+    ) -> list[str]:
+        """
+        Create many chunks in a single transaction.
+
+        Rows are sent as multi-row INSERT statements of `batch_size` rows each
+        instead of one add/commit/refresh round-trip per chunk. Returns the
+        generated chunk IDs in input order.
+        """
+        if not chunks_data:
+            return []
+
+        rows = [
+            {
+                "id": str(uuid4()),
+                "document_id": chunk_data.document_id,
+                "chunk_text": chunk_data.chunk_text,
+                "embedding": chunk_data.embedding,
+                "start_char": chunk_data.start_char,
+                "page_number": chunk_data.page_number,
+                "end_char": chunk_data.end_char,
+                "token_count": chunk_data.token_count,
+                "created_by": user.id,
+                "updated_by": user.id,
+            }
+            for chunk_data in chunks_data
+        ]
+
+        try:
+            for start in range(0, len(rows), batch_size):
+                self.db.execute(insert(Chunk), rows[start : start + batch_size])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return [row["id"] for row in rows]
+
+    def get_cached_embeddings(
+        self, model_name: str, text_hashes: list[str], batch_size: int = 1000
+    ) -> dict[str, list[float]]:
+        """Look up cached embeddings by text hash; returns hash -> embedding."""
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        cached = {}
+        try:
+            for start in range(0, len(unique_hashes), batch_size):
+                rows = self.db.execute(
+                    select(EmbeddingCache.text_hash, EmbeddingCache.embedding).where(
+                        EmbeddingCache.model_name == model_name,
+                        EmbeddingCache.text_hash.in_(
+                            unique_hashes[start : start + batch_size]
+                        ),
+                    )
+                ).all()
+                cached.update(
+                    (text_hash, list(map(float, embedding)))
+                    for text_hash, embedding in rows
+                )
+        except Exception:
+            # Callers treat a failed lookup as a miss and keep using the session
+            self.db.rollback()
+            raise
+        return cached
+
+    def store_cached_embeddings(
+        self,
+        model_name: str,
+        embeddings: dict[str, list[float]],
+        batch_size: int = 1000,
+    ) -> None:
+        """Store embeddings by text hash, keeping existing entries on conflict."""
+        if not embeddings:
+            return
+
+        rows = [
+            {"model_name": model_name, "text_hash": text_hash, "embedding": embedding}
+            for text_hash, embedding in embeddings.items()
+        ]
+        try:
+            for start in range(0, len(rows), batch_size):
+                self.db.execute(
+                    pg_insert(EmbeddingCache)
+                    .values(rows[start : start + batch_size])
+                    .on_conflict_do_nothing(index_elements=["model_name", "text_hash"])
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
     def get_document_chunks(
         self, document_id: str, embedding: bool = False
     ) -> list[Chunk]:
@@ -285,6 +546,16 @@ class DocumentService:
         self.db.commit()
         return True
 
+    def delete_document_chunks(self, document_id: str) -> int:
+        """Delete all chunks of a document, e.g. left over by a failed ingestion."""
+        deleted = (
+            self.db.query(Chunk)
+            .filter(Chunk.document_id == document_id)
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return deleted
+
     # Document Relation CRUD operations
     def create_document_relation(
         self, relation_data: DocumentRelationCreate, user: User
@@ -366,6 +637,66 @@ class DocumentService:
         self.db.refresh(edge)
         return edge
 
+    # Bulk graph operations
+    def bulk_create_document_graph(
+        self,
+        relation_id: str,
+        nodes: list[DocumentNodeBase],
+        edges: list[DocumentEdgeBase],
+        user: User,
+    ) -> dict[str, str]:
+        """
+        Insert all nodes and edges of a graph into a relation in one transaction.
+
+        Edge endpoints are remapped from caller-side node IDs to the generated
+        ones; edges that reference unknown nodes are skipped. Returns the
+        old-to-new node ID map.
+        """
+        id_map: dict[str, str] = {}
+        node_rows = []
+        for node in nodes:
+            if node.id in id_map:
+                continue
+            id_map[node.id] = str(uuid4())
+            node_rows.append(
+                {
+                    "id": id_map[node.id],
+                    "document_relation_id": relation_id,
+                    "title": node.title,
+                    "description": node.description,
+                    "type": node.type,
+                    "label": node.label,
+                    "created_by": user.id,
+                    "updated_by": user.id,
+                }
+            )
+
+        edge_rows = [
+            {
+                "id": str(uuid4()),
+                "document_relation_id": relation_id,
+                "label": edge.label,
+                "source": id_map[edge.source],
+                "target": id_map[edge.target],
+                "created_by": user.id,
+                "updated_by": user.id,
+            }
+            for edge in edges
+            if edge.source in id_map and edge.target in id_map
+        ]
+
+        try:
+            if node_rows:
+                self.db.execute(insert(DocumentNode), node_rows)
+            if edge_rows:
+                self.db.execute(insert(DocumentEdge), edge_rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return id_map
+
     # Permission helpers
     def _can_modify_document(self, document: Document, user: User) -> bool:
         """Check if user can modify the document."""
@@ -398,9 +729,16 @@ class DocumentService:
         return storage_service.get_file_url_from_storage(object_name, bucket_name)
 
     @staticmethod
-    def prepare_file_upload(file: UploadFile, user_id: str, collection_id: str):
+    def prepare_file_upload(
+        file: UploadFile,
+        user_id: str,
+        collection_id: str,
+        content_hash: Optional[str] = None,
+    ):
         """
         Prepare storage object name and extract file type (MIME type) for an uploaded file.
+        With a content hash the object name is content-addressed, so identical
+        files share one object.
         Returns (object_name, file_type, file_extension).
         """
         from uuid import uuid4
@@ -410,9 +748,12 @@ class DocumentService:
         if file.filename and "." in file.filename:
             file_extension = "." + file.filename.split(".")[-1].lower()
 
-        # Generate UUID-based filename for storage
-        uuid_filename = str(uuid4()) + file_extension
-        object_name = f"users/{user_id}/collections/{collection_id}/{uuid_filename}"
+        if content_hash:
+            object_name = f"content/{content_hash[:2]}/{content_hash}{file_extension}"
+        else:
+            # Generate UUID-based filename for storage
+            uuid_filename = str(uuid4()) + file_extension
+            object_name = f"users/{user_id}/collections/{collection_id}/{uuid_filename}"
 
         # Get MIME type
         file_type = file.content_type or "unknown"
@@ -420,12 +761,150 @@ class DocumentService:
         return object_name, file_type, file_extension
 
 
+class ChunkVectorIndexService:
+    """Service for managing ANN indexes on chunk embeddings."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _index_name(method: str) -> str:
+        return f"ix_chunk_embedding_{method}"
+
+    def _execute_autocommit(self, statements: list[str]) -> None:
+        """Run statements outside a transaction, as CONCURRENTLY requires."""
+        # End the session's own transaction so the index build does not wait on it
+        self.db.commit()
+        engine = self.db.get_bind()
+        with engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+
+    def list_indexes(self) -> list[VectorIndexResponse]:
+        """List HNSW and IVFFlat indexes on the chunk table."""
+        rows = (
+            self.db.execute(
+                text(
+                    """
+                    SELECT i.relname AS name,
+                           am.amname AS method,
+                           pg_get_indexdef(i.oid) AS definition,
+                           pg_relation_size(i.oid) AS size_bytes,
+                           ix.indisvalid AS is_valid
+                    FROM pg_index ix
+                    JOIN pg_class i ON i.oid = ix.indexrelid
+                    JOIN pg_class t ON t.oid = ix.indrelid
+                    JOIN pg_am am ON am.oid = i.relam
+                    WHERE t.relname = 'chunk' AND am.amname IN ('hnsw', 'ivfflat')
+                    ORDER BY i.relname
+                    """
+                )
+            )
+            .mappings()
+            .all()
+        )
+        return [VectorIndexResponse(**row) for row in rows]
+
+    def get_index(self, method: str) -> Optional[VectorIndexResponse]:
+        """Get the chunk embedding index built with the given method."""
+        name = self._index_name(method)
+        return next(
+            (index for index in self.list_indexes() if index.name == name), None
+        )
+
+    def create_index(self, index_data: VectorIndexCreate) -> VectorIndexResponse:
+        """
+        (Re)build a chunk embedding index without blocking writes.
+
+        The new index is built under a temporary name and swapped in, so
+        searches keep using the old one until the build has finished.
+        """
+        name = self._index_name(index_data.method)
+        build_name = f"{name}_build"
+        if index_data.method == "hnsw":
+            options = (
+                f"m = {index_data.m}, ef_construction = {index_data.ef_construction}"
+            )
+        else:
+            options = f"lists = {index_data.lists}"
+
+        # A failed earlier build leaves an invalid index under the temporary name
+        drop_build = f"DROP INDEX CONCURRENTLY IF EXISTS {build_name}"
+        try:
+            self._execute_autocommit(
+                [
+                    drop_build,
+                    f"CREATE INDEX CONCURRENTLY {build_name} ON chunk "
+                    f"USING {index_data.method} (embedding {VECTOR_INDEX_OPCLASS}) "
+                    f"WITH ({options})",
+                ]
+            )
+        except Exception:
+            self._execute_autocommit([drop_build])
+            raise
+
+        statements = [
+            f"DROP INDEX CONCURRENTLY IF EXISTS {name}",
+            f"ALTER INDEX {build_name} RENAME TO {name}",
+        ]
+        if index_data.replace_existing:
+            statements.extend(
+                f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"
+                for index in self.list_indexes()
+                if index.name not in (name, build_name)
+            )
+        self._execute_autocommit(statements)
+
+        return self.get_index(index_data.method)
+
+    def reindex(self, method: str) -> VectorIndexResponse:
+        """Rebuild an existing index, e.g. after bulk loads degrade IVFFlat lists."""
+        if not self.get_index(method):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No {method} index on chunk embeddings",
+            )
+        self._execute_autocommit(
+            [f"REINDEX INDEX CONCURRENTLY {self._index_name(method)}"]
+        )
+        return self.get_index(method)
+
+    def drop_index(self, method: str) -> bool:
+        """Drop the chunk embedding index built with the given method."""
+        if not self.get_index(method):
+            return False
+        self._execute_autocommit(
+            [f"DROP INDEX CONCURRENTLY IF EXISTS {self._index_name(method)}"]
+        )
+        return True
+
+
 class DocumentServiceSearch(DocumentService):
     """Service for searching documents and related entities."""
 
     def __init__(self, db: Session):
         super().__init__(db)
 
+    def _apply_vector_search_settings(self, top_k: int) -> None:
+        """Tune ANN index scans for the current transaction."""
+        settings = get_settings()
+        params = {
+            # HNSW can never return more rows than ef_search
+            "hnsw.ef_search": max(settings.HNSW_EF_SEARCH, top_k),
+            "ivfflat.probes": settings.IVFFLAT_PROBES,
+        }
+        if settings.VECTOR_ITERATIVE_SCAN:
+            params["hnsw.iterative_scan"] = settings.VECTOR_ITERATIVE_SCAN
+            params["ivfflat.iterative_scan"] = settings.VECTOR_ITERATIVE_SCAN
+
+        for name, value in params.items():
+            self.db.execute(
+                text("SELECT set_config(:name, :value, true)"),
+                {"name": name, "value": str(value)},
+            )
+
     def _search_collection_chunks_with_distances(
         self,
         collection_id: str,
@@ -434,6 +913,7 @@ class DocumentServiceSearch(DocumentService):
         embedding: bool = False,
     ) -> list[tuple[Chunk, float]]:
         """Get chunks from a collection with their distances to the query embedding."""
+        self._apply_vector_search_settings(top_k)
         return (
             self.db.query(
                 Chunk,
@@ -446,10 +926,85 @@ class DocumentServiceSearch(DocumentService):
             .all()
         )
 
+    def _search_collection_chunks_hybrid(
+        self,
+        collection_id: str,
+        query_embedding: list[float],
+        query_text: str,
+        top_k: int,
+        fusion_weight: float = 0.5,
+    ) -> list[tuple[Chunk, float, float]]:
+        """
+        Get chunks from a collection ranked by reciprocal rank fusion of vector
+        distance and full-text rank, in a single query.
+        fusion_weight is the share of the vector ranking (1.0 = vector only,
+        0.0 = lexical only).
+        """
+        candidates = max(top_k * 4, 50)
+        self._apply_vector_search_settings(candidates)
+
+        distance = Chunk.embedding.l2_distance(query_embedding)
+        vector_ranked = (
+            select(
+                Chunk.id.label("id"),
+                func.row_number().over(order_by=distance).label("rank"),
+            )
+            .join(Document, Chunk.document_id == Document.id)
+            .where(Document.collection_id == collection_id)
+            .order_by(distance)
+            .limit(candidates)
+            .cte("vector_ranked")
+        )
+
+        # Match any query term; plainto_tsquery alone would require all of them
+        ts_query = _any_term_tsquery(query_text)
+        lexical_rank = func.ts_rank_cd(Chunk.chunk_tsv, ts_query)
+        lexical_ranked = (
+            select(
+                Chunk.id.label("id"),
+                func.row_number().over(order_by=lexical_rank.desc()).label("rank"),
+            )
+            .join(Document, Chunk.document_id == Document.id)
+            .where(Document.collection_id == collection_id)
+            .where(Chunk.chunk_tsv.op("@@")(ts_query))
+            .order_by(lexical_rank.desc())
+            .limit(candidates)
+            .cte("lexical_ranked")
+        )
+
+        vector_weight = literal(fusion_weight, Float)
+        lexical_weight = literal(1.0 - fusion_weight, Float)
+        score = func.coalesce(
+            vector_weight / (RRF_K + vector_ranked.c.rank), 0.0
+        ) + func.coalesce(lexical_weight / (RRF_K + lexical_ranked.c.rank), 0.0)
+        fused = (
+            select(
+                func.coalesce(vector_ranked.c.id, lexical_ranked.c.id).label("id"),
+                score.label("score"),
+            )
+            .select_from(
+                vector_ranked.join(
+                    lexical_ranked,
+                    vector_ranked.c.id == lexical_ranked.c.id,
+                    full=True,
+                )
+            )
+            .cte("fused")
+        )
+
+        return (
+            self.db.query(Chunk, distance.label("distance"), fused.c.score)
+            .join(fused, Chunk.id == fused.c.id)
+            .order_by(fused.c.score.desc())
+            .limit(top_k)
+            .all()
+        )
+
     def _search_document_chunks_with_distances(
         self, document_id: str, query_embedding: list[float], top_k: int
     ) -> list[tuple[Chunk, float]]:
         """Get chunks from a document with their distances to the query embedding."""
+        self._apply_vector_search_settings(top_k)
         return (
             self.db.query(
                 Chunk,
@@ -467,18 +1022,40 @@ class DocumentServiceSearch(DocumentService):
         query_embedding: list[float],
         top_k: int = 5,
         embedding: bool = False,
+        mode: Literal["vector", "hybrid"] = "vector",
+        query_text: Optional[str] = None,
+        fusion_weight: float = 0.5,
     ) -> list[ChunkSearchResponse]:
-        """Search for chunks in a collection based on the query embedding."""
-        chunk_results: list[tuple[Chunk, float]] = (
-            self._search_collection_chunks_with_distances(
+        """
+        Search for chunks in a collection based on the query embedding.
+        In hybrid mode the query text is also matched with full-text search and
+        both rankings are fused; without query text it falls back to vector mode.
+        Thai queries get at least HYBRID_THAI_VECTOR_WEIGHT of the vector side.
+        """
+        if mode == "hybrid" and query_text and query_text.strip():
+            if THAI_SCRIPT.search(query_text):
+                fusion_weight = max(
+                    fusion_weight, get_settings().HYBRID_THAI_VECTOR_WEIGHT
+                )
+            chunk_results = self._search_collection_chunks_hybrid(
                 collection_id=collection_id,
                 query_embedding=query_embedding,
+                query_text=query_text,
                 top_k=top_k,
+                fusion_weight=fusion_weight,
             )
-        )
+        else:
+            chunk_results = [
+                (chunk, distance, None)
+                for chunk, distance in self._search_collection_chunks_with_distances(
+                    collection_id=collection_id,
+                    query_embedding=query_embedding,
+                    top_k=top_k,
+                )
+            ]
 
         response_list = []
-        for chunk, distance in chunk_results:
+        for chunk, distance, score in chunk_results:
             response = ChunkResponse.model_validate(chunk)
             if not embedding:
                 response.embedding = []
@@ -489,6 +1066,7 @@ class DocumentServiceSearch(DocumentService):
                     document_title=chunk.document.title,
                     document_description=chunk.document.description,
                     distance=float(distance),
+                    score=score,
                 )
             )
 
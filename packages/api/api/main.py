@@ -1,17 +1,37 @@
 """FastAPI application."""
 
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.agentic.core.executors import (
+    get_loop_lag_monitor,
+    run_in_thread,
+    shutdown_executors,
+)
+from api.agentic.core.ingestion.ingest_methods import get_chunker_registry
 from api.v1.routers import api_router
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    monitor = get_loop_lag_monitor()
+    monitor.start()
+    await run_in_thread(get_chunker_registry().warmup)
+    yield
+    monitor.stop()
+    shutdown_executors()
+
+
 app = FastAPI(
     title="The Codex API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -1,7 +1,9 @@
 """RabbitMQ client using pika."""
 
+import functools
 import json
 import logging
+import threading
 from typing import Any, Callable, Optional
 
 import pika
@@ -21,6 +23,8 @@ class QueueClient:
         self.settings = get_settings()
         self._connection: Optional[Connection] = None
         self._channel: Optional[BlockingChannel] = None
+        # A pika connection is not thread-safe; one `with` block at a time
+        self._lock = threading.RLock()
 
     def connect(self) -> None:
         """Establish connection to RabbitMQ."""
@@ -68,6 +72,7 @@ class QueueClient:
         durable: bool = True,
         exclusive: bool = False,
         auto_delete: bool = False,
+        arguments: Optional[dict[str, Any]] = None,
     ) -> None:
         """Declare a queue."""
         if not self._channel:
@@ -78,6 +83,7 @@ class QueueClient:
             durable=durable,
             exclusive=exclusive,
             auto_delete=auto_delete,
+            arguments=arguments,
         )
         logger.info(f"Queue '{queue_name}' declared")
 
@@ -126,14 +132,16 @@ class QueueClient:
         routing_key: str,
         message: dict[str, Any],
         persistent: bool = True,
+        expiration_ms: Optional[int] = None,
     ) -> None:
-        """Publish a message to an exchange."""
+        """Publish a message to an exchange, optionally expiring after `expiration_ms`."""
         if not self._channel:
             raise RuntimeError("Not connected to RabbitMQ")
 
         properties = pika.BasicProperties(
             delivery_mode=2 if persistent else 1,  # Make message persistent
             content_type="application/json",
+            expiration=str(expiration_ms) if expiration_ms is not None else None,
         )
 
         message_body = json.dumps(message)
@@ -169,22 +177,52 @@ class QueueClient:
         queue_name: str,
         callback: Callable[[dict[str, Any]], None],
         auto_ack: bool = False,
+        prefetch_count: Optional[int] = None,
+        threaded: bool = False,
     ) -> None:
-        """Start consuming messages from a queue."""
+        """
+        Start consuming messages from a queue.
+
+        With `threaded`, each callback runs in its own thread while the
+        connection keeps serving heartbeats, so long-running handlers do not
+        get the connection dropped; acks are sent back on the connection thread.
+        `prefetch_count` bounds the number of unacknowledged deliveries.
+        """
         if not self._channel:
             raise RuntimeError("Not connected to RabbitMQ")
 
-        def wrapper(ch, method, properties, body):
+        if prefetch_count is not None:
+            self._channel.basic_qos(prefetch_count=prefetch_count)
+
+        def settle(ch, delivery_tag: int, success: bool) -> None:
+            if auto_ack or not ch.is_open:
+                return
+            if success:
+                ch.basic_ack(delivery_tag=delivery_tag)
+            else:
+                ch.basic_nack(delivery_tag=delivery_tag, requeue=False)
+
+        def handle(ch, method, body) -> bool:
             try:
                 message = json.loads(body.decode())
                 callback(message)
-
-                if not auto_ack:
-                    ch.basic_ack(delivery_tag=method.delivery_tag)
+                return True
             except Exception as e:
                 logger.error(f"Error processing message: {e}")
-                if not auto_ack:
-                    ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+                return False
+
+        def wrapper(ch, method, properties, body):
+            if not threaded:
+                settle(ch, method.delivery_tag, handle(ch, method, body))
+                return
+
+            def run():
+                success = handle(ch, method, body)
+                self._connection.add_callback_threadsafe(
+                    functools.partial(settle, ch, method.delivery_tag, success)
+                )
+
+            threading.Thread(target=run, daemon=True).start()
 
         self._channel.basic_consume(
             queue=queue_name,
@@ -229,9 +267,17 @@ class QueueClient:
 
     def __enter__(self):
         """Context manager entry."""
-        self.connect()
+        self._lock.acquire()
+        try:
+            self.connect()
+        except Exception:
+            self._lock.release()
+            raise
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        self.disconnect()
+        try:
+            self.disconnect()
+        finally:
+            self._lock.release()
@@ -15,6 +15,13 @@ class QueueType(str, Enum):
     SYSTEM_EVENTS = "system_events"
 
 
+# Work queue for document ingestion; failed jobs are dead-lettered
+INGESTION_QUEUE = "ingestion_jobs"
+INGESTION_DEAD_LETTER_QUEUE = "ingestion_jobs.dead"
+# Delayed retries wait in an unconsumed queue per delay, then dead-letter back
+INGESTION_RETRY_QUEUE_PREFIX = "ingestion_jobs.retry"
+
+
 class QueueService:
     """High-level service for queue operations."""
 
@@ -43,6 +50,61 @@ class QueueService:
 
             logger.info("Default queues initialized")
 
+    def initialize_ingestion_queues(self) -> None:
+        """Declare the ingestion work queue and its dead-letter queue."""
+        with self.client:
+            self.client.declare_queue(INGESTION_DEAD_LETTER_QUEUE, durable=True)
+            self.client.declare_queue(
+                INGESTION_QUEUE,
+                durable=True,
+                arguments={
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": INGESTION_DEAD_LETTER_QUEUE,
+                },
+            )
+        self._initialized_queues.update({INGESTION_QUEUE, INGESTION_DEAD_LETTER_QUEUE})
+
+    def publish_ingestion_job(self, job: dict[str, Any]) -> None:
+        """Enqueue a document ingestion job for the ingestion workers."""
+        if INGESTION_QUEUE not in self._initialized_queues:
+            self.initialize_ingestion_queues()
+
+        with self.client:
+            self.client.publish_to_queue(INGESTION_QUEUE, job)
+
+        logger.info(f"Queued ingestion job for document {job.get('document_id')}")
+
+    def publish_ingestion_retry(self, job: dict[str, Any], delay_seconds: int) -> None:
+        """
+        Enqueue an ingestion job to run again after `delay_seconds`.
+
+        Each delay has its own retry queue with a fixed TTL, since RabbitMQ
+        only expires messages at the head of a queue.
+        """
+        delay_ms = delay_seconds * 1000
+        retry_queue = f"{INGESTION_RETRY_QUEUE_PREFIX}.{delay_ms}"
+        if INGESTION_QUEUE not in self._initialized_queues:
+            self.initialize_ingestion_queues()
+
+        with self.client:
+            if retry_queue not in self._initialized_queues:
+                self.client.declare_queue(
+                    retry_queue,
+                    durable=True,
+                    arguments={
+                        "x-message-ttl": delay_ms,
+                        "x-dead-letter-exchange": "",
+                        "x-dead-letter-routing-key": INGESTION_QUEUE,
+                    },
+                )
+                self._initialized_queues.add(retry_queue)
+            self.client.publish_to_queue(retry_queue, job)
+
+        logger.info(
+            f"Queued ingestion retry for document {job.get('document_id')} "
+            f"in {delay_seconds}s"
+        )
+
     def publish_system_event(
         self,
         event_type: str,
@@ -15,6 +15,10 @@ from .document import (
     DocumentEdge,
     DocumentNode,
     DocumentRelation,
+    EmbeddingCache,
+    LlmCache,
+    OcrCache,
+    SummaryCache,
 )
 from .user import User
 
@@ -29,6 +33,10 @@ __all__ = [
     "DocumentEdge",
     "DocumentNode",
     "DocumentRelation",
+    "EmbeddingCache",
+    "LlmCache",
+    "OcrCache",
+    "SummaryCache",
     "User",
     "CollectionChat",
     "CollectionChatHistory",
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import TIMESTAMP, Enum, ForeignKey, Text
+from sqlalchemy import TIMESTAMP, Enum, ForeignKey, Index, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -14,7 +14,10 @@ class CollectionChat(Base):
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     collection_id: Mapped[str] = mapped_column(
-        Text, ForeignKey("collection.id", ondelete="CASCADE"), nullable=False
+        Text,
+        ForeignKey("collection.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     title: Mapped[str] = mapped_column(Text, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -50,6 +53,14 @@ class CollectionChat(Base):
 
 class CollectionChatHistory(Base):
     __tablename__ = "collection_chat_history"
+    __table_args__ = (
+        # Chat history loads, in message order
+        Index(
+            "ix_collection_chat_history_collection_chat_id_created_at",
+            "collection_chat_id",
+            "created_at",
+        ),
+    )
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     collection_chat_id: Mapped[str] = mapped_column(
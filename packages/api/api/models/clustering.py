@@ -20,7 +20,10 @@ class Clustering(Base):
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     collection_id: Mapped[str] = mapped_column(
-        Text, ForeignKey("collection.id", ondelete="CASCADE"), nullable=False
+        Text,
+        ForeignKey("collection.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     search_word: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     title: Mapped[str] = mapped_column(Text, nullable=False)
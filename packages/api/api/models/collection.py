@@ -3,7 +3,9 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import TIMESTAMP, Enum, ForeignKey, Text
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import TIMESTAMP, Enum, ForeignKey, Index, Text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -88,6 +90,22 @@ class Collection(Base):
 
 class CollectionPermission(Base):
     __tablename__ = "collection_permission"
+    __table_args__ = (
+        # Permission checks; covering so the level is read from the index
+        Index(
+            "ix_collection_permission_collection_id_user_id",
+            "collection_id",
+            "user_id",
+            postgresql_include=["permission_level"],
+        ),
+        # Collections a user can edit or own
+        Index(
+            "ix_collection_permission_user_id_permission_level",
+            "user_id",
+            "permission_level",
+            postgresql_include=["collection_id"],
+        ),
+    )
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     collection_id: Mapped[str] = mapped_column(
@@ -166,8 +184,13 @@ class CollectionRelation(Base):
     __tablename__ = "collection_relation"
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
+    # A collection has a single graph relation
     collection_id: Mapped[str] = mapped_column(
-        Text, ForeignKey("collection.id", ondelete="CASCADE"), nullable=False
+        Text,
+        ForeignKey("collection.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        unique=True,
     )
     title: Mapped[str] = mapped_column(Text, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -206,7 +229,10 @@ class CollectionEdge(Base):
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     collection_relation_id: Mapped[str] = mapped_column(
-        Text, ForeignKey("collection_relation.id", ondelete="CASCADE"), nullable=False
+        Text,
+        ForeignKey("collection_relation.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     label: Mapped[str] = mapped_column(Text, nullable=False)
     source: Mapped[str] = mapped_column(Text, nullable=False)
@@ -239,12 +265,23 @@ class CollectionNode(Base):
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     collection_relation_id: Mapped[str] = mapped_column(
-        Text, ForeignKey("collection_relation.id", ondelete="CASCADE"), nullable=False
+        Text,
+        ForeignKey("collection_relation.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     title: Mapped[str] = mapped_column(Text, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     type: Mapped[str] = mapped_column(Text, nullable=False)
     label: Mapped[str] = mapped_column(Text, nullable=False)
+    # Labels merged into this node
+    aliases: Mapped[list[str]] = mapped_column(
+        ARRAY(Text), nullable=False, server_default="{}"
+    )
+    # Normalized embedding of the canonical label, used for incremental merges
+    embedding: Mapped[Optional[list[float]]] = mapped_column(
+        Vector(256), nullable=True, deferred=True
+    )
     created_by: Mapped[Optional[str]] = mapped_column(
         Text, ForeignKey("user.id", ondelete="SET NULL"), nullable=True
     )
@@ -4,7 +4,17 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import TIMESTAMP, Boolean, Enum, ForeignKey, Integer, Text
+from sqlalchemy import (
+    TIMESTAMP,
+    Boolean,
+    Computed,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -18,6 +28,10 @@ if TYPE_CHECKING:
 # Models
 class Document(Base):
     __tablename__ = "document"
+    __table_args__ = (
+        # Collection document listing, newest first
+        Index("ix_document_collection_id_created_at", "collection_id", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
 
@@ -32,6 +46,8 @@ class Document(Base):
     source_file_path: Mapped[str] = mapped_column(Text)
     file_type: Mapped[str] = mapped_column(Text)
     file_size: Mapped[Optional[int]] = mapped_column(Integer)
+    # SHA-256 of the file bytes; identical uploads share ingestion results
+    content_hash: Mapped[Optional[str]] = mapped_column(Text, index=True)
     status: Mapped[IngestionStatus] = mapped_column(
         Enum(IngestionStatus), default=IngestionStatus.pending
     )
@@ -65,13 +81,33 @@ class Document(Base):
 
 class Chunk(Base):
     __tablename__ = "chunk"
+    __table_args__ = (
+        # ANN index for similarity search; the opclass must match l2_distance
+        Index(
+            "ix_chunk_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_l2_ops"},
+        ),
+        # Full-text index for the lexical half of hybrid search
+        Index("ix_chunk_chunk_tsv", "chunk_tsv", postgresql_using="gin"),
+    )
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     document_id: Mapped[str] = mapped_column(
-        Text, ForeignKey("document.id", ondelete="CASCADE")
+        Text, ForeignKey("document.id", ondelete="CASCADE"), index=True
     )
     chunk_text: Mapped[str] = mapped_column(Text)
     embedding: Mapped[Optional[list[float]]] = mapped_column(Vector(256))
+    # 'simple' config: no stemming or stop words. It splits on spaces and
+    # punctuation only, so an unspaced Thai run is one token and matches only
+    # as a whole; hybrid search leans on vectors for Thai queries
+    chunk_tsv: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', coalesce(chunk_text, ''))", persisted=True),
+        deferred=True,
+    )
     page_number: Mapped[Optional[int]] = mapped_column(Integer)
     start_char: Mapped[Optional[int]] = mapped_column(Integer)
     end_char: Mapped[Optional[int]] = mapped_column(Integer)
@@ -102,7 +138,7 @@ class DocumentRelation(Base):
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     document_id: Mapped[str] = mapped_column(
-        Text, ForeignKey("document.id", ondelete="CASCADE")
+        Text, ForeignKey("document.id", ondelete="CASCADE"), index=True
     )
     title: Mapped[str] = mapped_column(Text)
     description: Mapped[Optional[str]] = mapped_column(Text)
@@ -138,7 +174,7 @@ class DocumentNode(Base):
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     document_relation_id: Mapped[str] = mapped_column(
-        Text, ForeignKey("document_relation.id", ondelete="CASCADE")
+        Text, ForeignKey("document_relation.id", ondelete="CASCADE"), index=True
     )
     title: Mapped[str] = mapped_column(Text)
     description: Mapped[Optional[str]] = mapped_column(Text)
@@ -178,7 +214,7 @@ class DocumentEdge(Base):
 
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     document_relation_id: Mapped[str] = mapped_column(
-        Text, ForeignKey("document_relation.id", ondelete="CASCADE")
+        Text, ForeignKey("document_relation.id", ondelete="CASCADE"), index=True
     )
     label: Mapped[str] = mapped_column(Text)
     source: Mapped[str] = mapped_column(
@@ -218,3 +254,69 @@ class DocumentEdge(Base):
         foreign_keys=[target],
         back_populates="incoming_edges",
     )
+
+
+class EmbeddingCache(Base):
+    """Embeddings of previously seen chunk texts, shared across documents."""
+
+    __tablename__ = "embedding_cache"
+
+    model_name: Mapped[str] = mapped_column(Text, primary_key=True)
+    # SHA-256 of the whitespace-normalized chunk text
+    text_hash: Mapped[str] = mapped_column(Text, primary_key=True)
+    embedding: Mapped[list[float]] = mapped_column(Vector(256), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, server_default=func.current_timestamp()
+    )
+
+
+class OcrCache(Base):
+    """OCR text of previously seen images, keyed by VLM model, prompt and image."""
+
+    __tablename__ = "ocr_cache"
+
+    model_name: Mapped[str] = mapped_column(Text, primary_key=True)
+    # SHA-256 of the OCR prompt template, so prompt changes miss the cache
+    prompt_hash: Mapped[str] = mapped_column(Text, primary_key=True)
+    # SHA-256 of the decoded RGB pixels, so re-encoded copies share an entry
+    image_hash: Mapped[str] = mapped_column(Text, primary_key=True)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, server_default=func.current_timestamp()
+    )
+
+
+class SummaryCache(Base):
+    """Partial summaries of document sections, keyed by LLM model, prompt and text."""
+
+    __tablename__ = "summary_cache"
+
+    model_name: Mapped[str] = mapped_column(Text, primary_key=True)
+    # SHA-256 of the section prompt template, so prompt changes miss the cache
+    prompt_hash: Mapped[str] = mapped_column(Text, primary_key=True)
+    # SHA-256 of the whitespace-normalized section text
+    text_hash: Mapped[str] = mapped_column(Text, primary_key=True)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, server_default=func.current_timestamp()
+    )
+
+
+class LlmCache(Base):
+    """LLM responses to previously seen requests, keyed by a hash of the request."""
+
+    __tablename__ = "llm_cache"
+
+    # SHA-256 of model, messages, response schema and sampling parameters
+    cache_key: Mapped[str] = mapped_column(Text, primary_key=True)
+    model_name: Mapped[str] = mapped_column(Text, nullable=False)
+    response: Mapped[str] = mapped_column(Text, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    hits: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, server_default=func.current_timestamp(), index=True
+    )
+    # Least recently used entries are evicted first
+    last_used_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, server_default=func.current_timestamp(), index=True
+    )
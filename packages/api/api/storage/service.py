@@ -238,6 +238,68 @@ class StorageService:
                 detail=f"Failed to upload file: {e}",
             ) from e
 
+    def upload_file_from_path(
+        self,
+        file_path: str,
+        object_name: str,
+        content_type: Optional[str] = None,
+        bucket_name: Optional[str] = None,
+    ) -> str:
+        """
+        Upload a local file to MinIO without loading it into memory.
+
+        Returns:
+            The object name/path in MinIO
+        """
+        if bucket_name is None:
+            bucket_name = self.settings.MINIO_BUCKET_NAME
+
+        try:
+            self.ensure_bucket_exists(bucket_name)
+            self.client.fput_object(
+                bucket_name=bucket_name,
+                object_name=object_name,
+                file_path=file_path,
+                content_type=content_type or "application/octet-stream",
+            )
+            return object_name
+
+        except S3Error as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload file: {e}",
+            ) from e
+
+    def download_file_to_path(
+        self,
+        object_name: str,
+        file_path: str,
+        bucket_name: Optional[str] = None,
+    ) -> str:
+        """
+        Download a file from MinIO straight to a local path.
+
+        Returns:
+            The local file path
+        """
+        if bucket_name is None:
+            bucket_name = self.settings.MINIO_BUCKET_NAME
+
+        try:
+            self.client.fget_object(bucket_name, object_name, file_path)
+            return file_path
+
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="File not found",
+                ) from e
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to download file: {e}",
+            ) from e
+
     def download_file_from_storage(
         self,
         object_name: str,
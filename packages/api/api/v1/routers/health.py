@@ -1,5 +1,13 @@
 from fastapi import APIRouter
 
+from ...agentic.core.embedding.embedding import get_query_cache_stats
+from ...agentic.core.executors import get_loop_lag_monitor
+from ...agentic.core.ingestion.ingest_methods import get_chunker_registry
+from ...agentic.core.ingestion.typhoon_ocr.ocr_cache import get_ocr_cache
+from ...agentic.core.llm_cache import get_llm_cache
+from ...agentic.core.llm_gateway import get_llm_gateway
+from ...agentic.core.single_flight import get_single_flight_stats
+
 router = APIRouter(
     prefix="/v1/health",
     tags=["health"],
@@ -9,3 +17,16 @@ router = APIRouter(
 @router.get("/")
 async def health_check():
     return {"status": "healthy"}
+
+
+@router.get("/metrics")
+async def metrics():
+    return {
+        "embedding_query_cache": get_query_cache_stats(),
+        "event_loop_lag": get_loop_lag_monitor().stats(),
+        "chunker_registry": get_chunker_registry().stats(),
+        "ocr_cache": get_ocr_cache().stats(),
+        "llm_gateway": get_llm_gateway().stats(),
+        "llm_cache": get_llm_cache().stats(),
+        "request_coalescing": get_single_flight_stats(),
+    }
@@ -0,0 +1,96 @@
+"""Windowed knowledge graph extraction tests with a scripted LLM."""
+
+import asyncio
+import json
+
+import numpy as np
+
+from api.agentic.core.graph.graph_extract import (
+    KnowledgeGraphExtractor,
+    split_text_windows,
+)
+from api.agentic.core.graph.graph_merge import KnowledgeGraphMerger
+
+LABEL_VECTORS = {
+    "solar panel": [1.0, 0.0, 0.0],
+    "solar panels": [0.99, 0.14, 0.0],
+    "battery": [0.0, 1.0, 0.0],
+    "inverter": [0.0, 0.0, 1.0],
+}
+
+
+class StubEncoder:
+    def get_embeddings_batched(self, texts):
+        return np.array([LABEL_VECTORS[text] for text in texts], np.float32), []
+
+
+def test_pieces_longer_than_a_window_are_cut():
+    windows = split_text_windows("", window_chars=10, pieces=["a" * 25])
+
+    assert windows == ["a" * 10, "a" * 10, "a" * 5]
+
+
+def test_trailing_pieces_are_carried_into_the_next_window():
+    pieces = ["aaaa", "bbbb", "cccc", "dddd"]
+    windows = split_text_windows("", window_chars=10, overlap_chars=5, pieces=pieces)
+
+    assert windows == ["aaaa\nbbbb", "bbbb\ncccc", "cccc\ndddd"]
+
+
+def test_overlap_larger_than_the_window_still_fits_each_window():
+    text = "aaaa\n\nbbbb\n\ncccc"
+    windows = split_text_windows(text, window_chars=10, overlap_chars=100)
+
+    assert windows == ["aaaa\nbbbb", "bbbb\ncccc"]
+    assert all(len(window) <= 10 for window in windows)
+
+
+# Both windows use the IDs "1" and "2", for different entities
+WINDOW_GRAPHS = {
+    "first window": {
+        "nodes": [
+            {"id": "1", "label": "Solar Panel", "type": "Device", "title": "Panel"},
+            {"id": "2", "label": "Battery", "type": "Device", "title": "Battery"},
+        ],
+        "edges": [
+            {"label": "charges", "source": "1", "target": "2"},
+            {"label": "powers", "source": "2", "target": "9"},
+        ],
+    },
+    "second window": {
+        "nodes": [
+            {"id": "1", "label": "Inverter", "type": "Device", "title": "Inverter"},
+            {"id": "2", "label": "solar panels", "type": "Device", "title": "Panels"},
+        ],
+        "edges": [{"label": "feeds", "source": "2", "target": "1"}],
+    },
+}
+
+
+def test_window_graphs_are_namespaced_and_merged():
+    async def llm_caller(prompt: str) -> str:
+        return json.dumps(WINDOW_GRAPHS[prompt])
+
+    extractor = KnowledgeGraphExtractor(
+        llm_caller=llm_caller,
+        prompt_renderer=lambda full_text, text_limit: full_text,
+    )
+    graphs = asyncio.run(extractor.extract_windows(list(WINDOW_GRAPHS)))
+
+    assert [n.id for n in graphs[0].nodes] == ["w0:1", "w0:2"]
+    assert [n.id for n in graphs[1].nodes] == ["w1:1", "w1:2"]
+    # The edge to a node the LLM did not return is dropped
+    assert [(e.source, e.target) for e in graphs[0].edges] == [("w0:1", "w0:2")]
+
+    merged = KnowledgeGraphMerger(StubEncoder()).merge_kgs(graphs)
+    ids = {
+        alias: node.id
+        for node in merged.nodes
+        for alias in node.aliases or [node.label]
+    }
+    assert len(merged.nodes) == 3
+    assert ids["Solar Panel"] == ids["solar panels"]
+    assert {(e.source, e.label, e.target) for e in merged.edges} == {
+        (ids["Solar Panel"], "charges", ids["Battery"]),
+        (ids["solar panels"], "feeds", ids["Inverter"]),
+    }
@@ -0,0 +1,102 @@
+"""Knowledge graph merge tests with a stub label encoder."""
+
+import numpy as np
+
+from api.agentic.core.graph.graph_merge import KnowledgeGraphMerger
+from api.agentic.core.graph.schemas import (
+    DocumentEdgeBase,
+    DocumentNodeBase,
+    ExtractedGraph,
+)
+
+# Labels on the same axis are near-duplicates
+LABEL_VECTORS = {
+    "solar panel": [1.0, 0.0, 0.0],
+    "solar panels": [0.99, 0.14, 0.0],
+    "battery": [0.0, 1.0, 0.0],
+    "inverter": [0.0, 0.0, 1.0],
+}
+
+
+class StubEncoder:
+    def get_embeddings_batched(self, texts):
+        return np.array([LABEL_VECTORS[text] for text in texts], np.float32), []
+
+
+def node(node_id: str, label: str) -> DocumentNodeBase:
+    return DocumentNodeBase(id=node_id, label=label, type="Thing", title=label)
+
+
+def persisted_index(nodes: dict[str, str]):
+    """find_nearest over persisted node IDs and labels, as the database does."""
+    ids = list(nodes)
+    vectors = np.array([LABEL_VECTORS[nodes[i]] for i in ids], np.float32)
+
+    def find_nearest(embeddings):
+        if not ids:
+            return [None] * len(embeddings)
+        vectors_norm = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        similarities = embeddings @ vectors_norm.T
+        best = similarities.argmax(axis=1)
+        return [(ids[b], float(similarities[row, b])) for row, b in enumerate(best)]
+
+    return find_nearest
+
+
+GRAPH = ExtractedGraph(
+    nodes=[
+        node("1", "Solar Panel"),
+        node("2", "solar panels"),
+        node("3", "Battery"),
+    ],
+    edges=[
+        DocumentEdgeBase(label="charges", source="1", target="3"),
+        DocumentEdgeBase(label="charges", source="2", target="3"),
+    ],
+)
+
+
+def test_unmatched_labels_become_new_nodes_with_aliases():
+    merger = KnowledgeGraphMerger(StubEncoder())
+    result = merger.merge_incremental(GRAPH, find_nearest=persisted_index({}))
+
+    assert sorted(n.label for n in result.new_nodes) == ["Battery", "solar panels"]
+    panel = next(n for n in result.new_nodes if n.label == "solar panels")
+    assert panel.aliases == ["Solar Panel", "solar panels"]
+    assert result.id_map["1"] == result.id_map["2"] == panel.id
+    assert len(result.edges) == 1
+    assert result.matched_aliases == {}
+
+
+def test_matched_labels_keep_the_persisted_id_and_add_aliases():
+    merger = KnowledgeGraphMerger(StubEncoder())
+    find_nearest = persisted_index({"node-battery": "battery"})
+    result = merger.merge_incremental(GRAPH, find_nearest=find_nearest)
+
+    assert result.id_map["3"] == "node-battery"
+    assert "Battery" not in [n.label for n in result.new_nodes]
+    assert result.matched_aliases == {"node-battery": ["Battery"]}
+    assert {(e.source, e.target) for e in result.edges} == {
+        (result.id_map["1"], "node-battery")
+    }
+
+
+def test_persisted_ids_are_stable_across_merges():
+    merger = KnowledgeGraphMerger(StubEncoder())
+    find_nearest = persisted_index(
+        {"node-panel": "solar panel", "node-battery": "battery"}
+    )
+    first = merger.merge_incremental(GRAPH, find_nearest=find_nearest)
+    second = merger.merge_incremental(GRAPH, find_nearest=find_nearest)
+
+    assert (
+        first.id_map
+        == second.id_map
+        == {
+            "1": "node-panel",
+            "2": "node-panel",
+            "3": "node-battery",
+        }
+    )
+    assert first.new_nodes == second.new_nodes == []
+    assert first.matched_aliases["node-panel"] == ["Solar Panel", "solar panels"]
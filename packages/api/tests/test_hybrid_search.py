@@ -0,0 +1,101 @@
+"""Hybrid chunk search tests.
+
+These run against the migrated development database and are skipped when it
+is not reachable. All seeded rows are rolled back.
+"""
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from api.config import get_settings
+from api.document.service import DocumentService
+from api.models.collection import Collection
+from api.models.document import Chunk, Document
+
+DIMENSIONS = 256
+
+
+def unit_vector(axis: int) -> list[float]:
+    vector = [0.0] * DIMENSIONS
+    vector[axis] = 1.0
+    return vector
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(get_settings().DATABASE_URL)
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip("Postgres is not reachable")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def test_exact_identifier_ranks_first_in_hybrid_mode(session):
+    prefix = uuid4().hex[:8]
+    collection_id = f"{prefix}-c"
+    document_id = f"{prefix}-d"
+    session.execute(insert(Collection), [{"id": collection_id, "name": "errors"}])
+    session.execute(
+        insert(Document),
+        [
+            {
+                "id": document_id,
+                "collection_id": collection_id,
+                "file_name": "errors.md",
+                "source_file_path": f"{collection_id}/errors.md",
+                "file_type": "md",
+            }
+        ],
+    )
+    # The decoys are closer to the query embedding than the exact match
+    chunks = [
+        {
+            "id": f"{prefix}-decoy{i}",
+            "document_id": document_id,
+            "chunk_text": f"Connection errors are retried, case {i}.",
+            "embedding": unit_vector(0),
+        }
+        for i in range(5)
+    ] + [
+        {
+            "id": f"{prefix}-exact",
+            "document_id": document_id,
+            "chunk_text": "ERR_CONN_4711 means the upstream refused the socket.",
+            "embedding": unit_vector(1),
+        }
+    ]
+    session.execute(insert(Chunk), chunks)
+
+    service = DocumentService(session)
+    query = "what does ERR_CONN_4711 mean"
+    vector_results = service.search_collection_chunks(
+        collection_id=collection_id, query_embedding=unit_vector(0), top_k=3
+    )
+    hybrid_results = service.search_collection_chunks(
+        collection_id=collection_id,
+        query_embedding=unit_vector(0),
+        top_k=3,
+        mode="hybrid",
+        query_text=query,
+    )
+
+    assert f"{prefix}-exact" not in [result.id for result in vector_results]
+    assert hybrid_results[0].id == f"{prefix}-exact"
@@ -0,0 +1,169 @@
+"""Query plan tests for metadata lookup indexes.
+
+These run against the migrated development database and are skipped when it
+is not reachable. All seeded rows are rolled back.
+"""
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from api.config import get_settings
+from api.models.chat import CollectionChat, CollectionChatHistory
+from api.models.collection import Collection, CollectionPermission
+from api.models.document import Chunk, Document
+from api.models.enum import ChatStatus, Role
+from api.models.user import User
+
+N_USERS = 50
+N_COLLECTIONS = 200
+DOCUMENTS_PER_COLLECTION = 20
+CHUNKS_PER_DOCUMENT = 5
+MESSAGES_PER_CHAT = 20
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(get_settings().DATABASE_URL)
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip("Postgres is not reachable")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def seeded(engine):
+    """Seed a dataset large enough for the planner to prefer index scans."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection)
+
+    prefix = uuid4().hex[:8]
+    users = [
+        {"id": f"{prefix}-u{i}", "username": f"{prefix}-u{i}", "email": f"{i}@{prefix}"}
+        for i in range(N_USERS)
+    ]
+    collections = [
+        {"id": f"{prefix}-c{i}", "name": f"collection {i}"}
+        for i in range(N_COLLECTIONS)
+    ]
+    permissions = [
+        {
+            "id": f"{prefix}-p{i}-{j}",
+            "collection_id": collection["id"],
+            "user_id": users[(i + j) % N_USERS]["id"],
+            "permission_level": "owner" if j == 0 else "edit",
+            "granted_by": users[i % N_USERS]["id"],
+        }
+        for i, collection in enumerate(collections)
+        for j in range(3)
+    ]
+    documents = [
+        {
+            "id": f"{collection['id']}-d{j}",
+            "collection_id": collection["id"],
+            "file_name": f"file {j}.pdf",
+            "source_file_path": f"{collection['id']}/file {j}.pdf",
+            "file_type": "pdf",
+        }
+        for collection in collections
+        for j in range(DOCUMENTS_PER_COLLECTION)
+    ]
+    chunks = [
+        {
+            "id": f"{document['id']}-k{j}",
+            "document_id": document["id"],
+            "chunk_text": f"chunk {j}",
+        }
+        for document in documents
+        for j in range(CHUNKS_PER_DOCUMENT)
+    ]
+    chats = [
+        {
+            "id": f"{collection['id']}-chat",
+            "collection_id": collection["id"],
+            "title": "chat",
+            "status": ChatStatus.new_session,
+        }
+        for collection in collections
+    ]
+    histories = [
+        {
+            "id": f"{chat['id']}-m{j}",
+            "collection_chat_id": chat["id"],
+            "role": Role.user,
+            "content": f"message {j}",
+        }
+        for chat in chats
+        for j in range(MESSAGES_PER_CHAT)
+    ]
+
+    for model, rows in [
+        (User, users),
+        (Collection, collections),
+        (CollectionPermission, permissions),
+        (Document, documents),
+        (Chunk, chunks),
+        (CollectionChat, chats),
+        (CollectionChatHistory, histories),
+    ]:
+        session.execute(insert(model), rows)
+        session.execute(text(f'ANALYZE "{model.__tablename__}"'))
+
+    yield {"session": session, "user": users[0], "collection": collections[0]}
+
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def explain(session: Session, statement: str, params: dict) -> str:
+    rows = session.execute(text(f"EXPLAIN {statement}"), params).scalars().all()
+    return "\n".join(rows)
+
+
+@pytest.mark.parametrize(
+    "index_name, statement",
+    [
+        (
+            "ix_collection_permission_collection_id_user_id",
+            "SELECT permission_level FROM collection_permission "
+            "WHERE collection_id = :collection_id AND user_id = :user_id",
+        ),
+        (
+            "ix_collection_permission_user_id_permission_level",
+            "SELECT collection_id FROM collection_permission "
+            "WHERE user_id = :user_id AND permission_level IN ('owner', 'edit')",
+        ),
+        (
+            "ix_document_collection_id_created_at",
+            "SELECT * FROM document WHERE collection_id = :collection_id "
+            "ORDER BY created_at DESC",
+        ),
+        (
+            "ix_chunk_document_id",
+            "SELECT * FROM chunk WHERE document_id = :document_id",
+        ),
+        (
+            "ix_collection_chat_history_collection_chat_id_created_at",
+            "SELECT * FROM collection_chat_history "
+            "WHERE collection_chat_id = :chat_id ORDER BY created_at",
+        ),
+    ],
+)
+def test_lookup_uses_index(seeded, index_name, statement):
+    collection_id = seeded["collection"]["id"]
+    params = {
+        "collection_id": collection_id,
+        "user_id": seeded["user"]["id"],
+        "document_id": f"{collection_id}-d0",
+        "chat_id": f"{collection_id}-chat",
+    }
+    plan = explain(seeded["session"], statement, params)
+    assert index_name in plan, plan
@@ -0,0 +1,161 @@
+"""Text extraction tests on small generated files."""
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+
+import fitz
+
+from api.agentic.core.embedding.embedding import TextEmbedder
+from api.agentic.core.ingestion import document_ingest, ingest_methods
+from api.agentic.core.ingestion.document_ingest import DocumentIngestorService
+from api.agentic.core.ingestion.ingest_methods import (
+    PDF_MIN_PAGES_PER_TASK,
+    ChunkerRegistry,
+    extract_pdf,
+    iter_text_file_blocks,
+)
+from api.agentic.core.ingestion.schemas import FileInput, document_details
+
+
+def text_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((40, 60), f"Page {i + 1} opens here.")
+        page.insert_text((40, 90), f"Findings of section {i + 1} follow. " * 2)
+    return doc.tobytes()
+
+
+def test_parallel_pdf_extraction_matches_sequential(tmp_path):
+    pdf = text_pdf(2 * PDF_MIN_PAGES_PER_TASK + 5)
+    path = tmp_path / "report.pdf"
+    path.write_bytes(pdf)
+    sequential = extract_pdf(pdf, file_name="report.pdf")
+
+    # fork: the workers inherit the test process's imports
+    with ProcessPoolExecutor(
+        2, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        from_bytes = extract_pdf(pdf, file_name="report.pdf", executor=executor)
+        from_path = extract_pdf(str(path), file_name="report.pdf", executor=executor)
+
+    assert sequential.page_count == 2 * PDF_MIN_PAGES_PER_TASK + 5
+    assert "Page 37 opens here." in sequential.full_text
+    assert from_bytes == sequential
+    assert from_path == sequential
+
+
+class TextRecordingDocumentService:
+    """Stands in for DocumentService, keeping the last stored text."""
+
+    def __init__(self):
+        self.text = None
+
+    def update_document(self, document_id, update_data, user):
+        if update_data.document:
+            self.text = update_data.document
+
+    def set_document_text(self, document_id, text):
+        self.text = text
+
+
+class StaticSummaryGenerator:
+    max_input_chars = 10_000
+
+    async def async_generate_summary(self, full_text, **kwargs):
+        return document_details(title="Notes", description=full_text[:40])
+
+
+def ingested_text(path, streaming: bool) -> str:
+    document_service = TextRecordingDocumentService()
+    ingestor = DocumentIngestorService(
+        collection_service=None,
+        document_service=document_service,
+        text_embedder=None,
+        kg_extractor=None,
+        kg_merger=None,
+        summary_generator=StaticSummaryGenerator(),
+    )
+    input_file = FileInput(
+        content=str(path),
+        file_name=path.name,
+        name=path.name,
+        type=".txt",
+        is_path=True,
+    )
+    document = SimpleNamespace(id="doc", is_vectorized=True, is_graph_extracted=False)
+    ingest = ingestor.ingest_file_streaming if streaming else ingestor.ingest_file
+    asyncio.run(ingest(input_file, document, False, None))
+    return document_service.text
+
+
+def test_streamed_text_file_matches_ingest_file(tmp_path, monkeypatch):
+    # Three-byte Thai characters on lines longer than a block
+    text = "\n".join(f"บรรทัดที่ {i} " + "ภาษาไทย" * 20 for i in range(12))
+    path = tmp_path / "notes.txt"
+    path.write_text(text, encoding="utf-8")
+
+    blocks = list(iter_text_file_blocks(str(path), block_size=64))
+    assert len(blocks) > 12
+    assert "".join(block for _, _, block in blocks) == text
+    assert all(
+        block == text[offset : offset + len(block)] for _, offset, block in blocks
+    )
+
+    monkeypatch.setattr(
+        document_ingest,
+        "iter_text_file_blocks",
+        functools.partial(iter_text_file_blocks, block_size=64),
+    )
+    assert ingested_text(path, streaming=True) == ingested_text(path, streaming=False)
+    assert ingested_text(path, streaming=True) == text
+
+
+def test_chunker_registry_shares_instances_across_threads():
+    registry = ChunkerRegistry()
+
+    def borrow(chunk_size=512):
+        with registry.acquire(chunk_size, 24) as chunker:
+            return chunker
+
+    with ThreadPoolExecutor(4) as pool:
+        first = pool.submit(borrow).result()
+        again = [pool.submit(borrow).result() for _ in range(8)]
+        other = pool.submit(borrow, 256).result()
+
+    assert all(chunker is first for chunker in again)
+    assert other is not first
+
+    # A chunker is lent to one thread at a time
+    barrier = threading.Barrier(2)
+
+    def borrow_together():
+        with registry.acquire(512, 24) as chunker:
+            barrier.wait(timeout=10)
+            return chunker
+
+    with ThreadPoolExecutor(2) as pool:
+        held = [pool.submit(borrow_together) for _ in range(2)]
+        held = [future.result() for future in held]
+
+    assert held[0] is not held[1]
+    assert first in held
+    assert registry.stats()["created"] == 3
+
+
+def test_late_chunker_loads_a_model2vec_embedder_by_name(monkeypatch):
+    built = []
+    monkeypatch.setattr(
+        ingest_methods, "LateChunker", lambda **kwargs: built.append(kwargs)
+    )
+    embedder = TextEmbedder.__new__(TextEmbedder)
+    embedder.backend = "model2vec"
+    embedder.model_name = "FlukeTJ/bge-m3-m2v-distilled-256"
+
+    ChunkerRegistry._build(512, 24, embedder)
+
+    assert built[0]["embedding_model"] == "FlukeTJ/bge-m3-m2v-distilled-256"
@@ -0,0 +1,75 @@
+"""LLM response cache tests; the Postgres table is replaced by a dict."""
+
+import asyncio
+import importlib
+
+import pytest
+from pydantic import BaseModel
+
+from api.agentic.core.llm_cache import LLMResponseCache, llm_cache_key
+
+# The package re-exports the call_llm function under the module name
+llm = importlib.import_module("api.agentic.core.call_llm")
+
+MESSAGES = [{"role": "user", "content": "Summarize this."}]
+
+
+class Answer(BaseModel):
+    text: str
+
+
+@pytest.fixture(autouse=True)
+def memory_llm_cache(monkeypatch):
+    entries = {}
+    monkeypatch.setattr(LLMResponseCache, "enabled", True)
+    monkeypatch.setattr(LLMResponseCache, "get", lambda self, key: entries.get(key))
+    monkeypatch.setattr(
+        LLMResponseCache,
+        "put",
+        lambda self, key, model_name, response: entries.update({key: response}),
+    )
+    return entries
+
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    calls = []
+
+    class Gateway:
+        async def acall(self, func, **kwargs):
+            calls.append(kwargs)
+            if "response_model" in kwargs:
+                return kwargs["response_model"](text=f"answer {len(calls)}")
+            message = type("Message", (), {"content": f"answer {len(calls)}"})
+            choice = type("Choice", (), {"message": message})
+            return type("Response", (), {"choices": [choice]})
+
+    monkeypatch.setattr(llm, "get_llm_gateway", Gateway)
+    return calls
+
+
+def test_cache_key_covers_the_request():
+    key = llm_cache_key("model-a", MESSAGES)
+    assert key == llm_cache_key("model-a", [dict(MESSAGES[0])])
+    assert key != llm_cache_key("model-b", MESSAGES)
+    assert key != llm_cache_key("model-a", MESSAGES, response_model=Answer)
+    assert key != llm_cache_key("model-a", MESSAGES, params={"temperature": 0.2})
+
+
+def test_repeated_prompt_is_served_from_cache(provider_calls):
+    prompt = MESSAGES[0]["content"]
+    first = asyncio.run(llm.call_llm_async(prompt, use_cache=True))
+    assert asyncio.run(llm.call_llm_async(prompt, use_cache=True)) == first
+    assert len(provider_calls) == 1
+
+    # Callers that do not opt in always call the provider
+    assert asyncio.run(llm.call_llm_async(prompt)) != first
+    assert len(provider_calls) == 2
+
+
+def test_structured_responses_are_cached(provider_calls):
+    prompt = MESSAGES[0]["content"]
+    first = asyncio.run(llm.call_structured_llm_async(prompt, Answer, use_cache=True))
+    second = asyncio.run(llm.call_structured_llm_async(prompt, Answer, use_cache=True))
+    assert second == first
+    assert len(provider_calls) == 1
@@ -0,0 +1,94 @@
+"""LLM gateway tests with fake provider calls."""
+
+import asyncio
+import time
+
+import httpx
+import litellm
+import pytest
+
+from api.agentic.core.llm_gateway import LLMGateway, ModelLimits, TokenBucket
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+@pytest.fixture
+def gateway():
+    gateway = LLMGateway()
+    gateway.default_limits = ModelLimits(max_concurrency=2)
+    gateway.backoff_base = 0.01
+    return gateway
+
+
+def rate_limit_error(retry_after: str) -> litellm.RateLimitError:
+    response = httpx.Response(
+        429,
+        headers={"retry-after": retry_after},
+        request=httpx.Request("POST", "http://llm.test/v1/chat/completions"),
+    )
+    return litellm.RateLimitError(
+        "rate limited", llm_provider="openai", model="test", response=response
+    )
+
+
+def test_concurrency_limit(gateway):
+    in_flight = peak = 0
+
+    async def completion(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return "ok"
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                gateway.acall(completion, model="test", messages=MESSAGES)
+                for _ in range(6)
+            )
+        )
+
+    assert asyncio.run(run()) == ["ok"] * 6
+    assert peak == 2
+    stats = gateway.stats()["models"]["test"]
+    assert stats["calls"] == 6
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_rate_limited_call_waits_for_retry_after(gateway):
+    attempts = []
+
+    def completion(**kwargs):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise rate_limit_error("0.2")
+        return "ok"
+
+    assert gateway.call(completion, model="test", messages=MESSAGES) == "ok"
+    assert attempts[1] - attempts[0] >= 0.2
+    stats = gateway.stats()["models"]["test"]
+    assert stats["rate_limited"] == 1 and stats["retries"] == 1
+
+
+def test_non_retryable_error_is_raised(gateway):
+    attempts = 0
+
+    def completion(**kwargs):
+        nonlocal attempts
+        attempts += 1
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        gateway.call(completion, model="test", messages=MESSAGES)
+    assert attempts == 1
+    assert gateway.stats()["models"]["test"]["errors"] == 1
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(per_minute=60)
+    now = time.monotonic()
+    assert bucket.wait_time(60, now) == 0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0, abs=0.05)
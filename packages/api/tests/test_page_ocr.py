@@ -0,0 +1,264 @@
+"""Page OCR pipeline tests against a local mock VLM endpoint.
+
+The mock speaks the OpenAI chat completions API and answers with the page
+dimensions from the OCR prompt, so each result can be matched to its page.
+The Postgres OCR cache is replaced by an in-memory dict.
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import fitz
+import pytest
+
+from api.agentic.core import executors
+from api.agentic.core.ingestion.document_ingest import DocumentIngestorService
+from api.agentic.core.ingestion.ingest_methods import iter_pdf_pages
+from api.agentic.core.ingestion.schemas import FileInput, document_details
+from api.agentic.core.ingestion.typhoon_ocr import page_ocr
+from api.agentic.core.ingestion.typhoon_ocr.ocr_cache import OcrCache
+from api.agentic.core.ingestion.typhoon_ocr.page_ocr import (
+    find_pages_without_text,
+    join_ocr_pages,
+    ocr_pdf,
+)
+from api.config import get_settings
+from api.models.enum import IngestionStatus
+
+N_PAGES = 6
+MAX_CONCURRENCY = 2
+
+
+class MockVLMHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][0]["content"][0]["text"]
+        width, height = re.search(r"Page dimensions: (\S+)x(\S+)", prompt).groups()
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        # Wider (later) pages answer first, so results arrive out of page order
+        time.sleep(60 / float(width))
+        with server.lock:
+            server.in_flight -= 1
+
+        content = json.dumps({"natural_text": f"page {width}x{height}"})
+        response = json.dumps(
+            {
+                "id": "mock",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 1,
+                    "completion_tokens": 1,
+                    "total_tokens": 2,
+                },
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def mock_vlm():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockVLMHandler)
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.peak_in_flight = 0
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def memory_ocr_cache(monkeypatch):
+    entries = {}
+    monkeypatch.setattr(OcrCache, "enabled", True)
+    monkeypatch.setattr(OcrCache, "get", lambda self, *key: entries.get(key))
+    monkeypatch.setattr(
+        OcrCache,
+        "put",
+        lambda self, *key_and_text: entries.update(
+            {key_and_text[:-1]: key_and_text[-1]}
+        ),
+    )
+    return entries
+
+
+def scanned_pdf() -> bytes:
+    """A PDF whose odd pages are images only and even pages have text."""
+    doc = fitz.open()
+    for i in range(N_PAGES):
+        # Distinct widths identify the pages in the mock responses
+        page = doc.new_page(width=200 + 10 * i, height=300)
+        if i % 2:
+            page.insert_text((20, 40), f"Text layer of page {i + 1} " * 3)
+        else:
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 50, 50), 0)
+            pixmap.clear_with(200)
+            page.insert_image(page.rect, pixmap=pixmap)
+    return doc.tobytes()
+
+
+def test_find_pages_without_text():
+    doc = fitz.open(stream=scanned_pdf(), filetype="pdf")
+    assert find_pages_without_text(doc) == [1, 3, 5]
+
+
+def run_ocr_pdf(mock_vlm, dpi: int = 72):
+    port = mock_vlm.server_address[1]
+    return asyncio.run(
+        ocr_pdf(
+            scanned_pdf(),
+            dpi=dpi,
+            max_concurrency=MAX_CONCURRENCY,
+            litellm_params={
+                "base_url": f"http://127.0.0.1:{port}/v1",
+                "api_key": "test",
+            },
+        )
+    )
+
+
+def test_ocr_pdf_against_mock_vlm(mock_vlm):
+    pages = run_ocr_pdf(mock_vlm)
+
+    assert [page.page_number for page in pages] == [1, 3, 5]
+    assert [page.text for page in pages] == [
+        "page 200.0x300.0",
+        "page 220.0x300.0",
+        "page 240.0x300.0",
+    ]
+    assert join_ocr_pages(pages).splitlines()[0] == "page 200.0x300.0"
+    assert mock_vlm.peak_in_flight <= MAX_CONCURRENCY
+
+
+def test_ocr_cache_skips_known_pages(mock_vlm, memory_ocr_cache):
+    first = run_ocr_pdf(mock_vlm)
+    assert mock_vlm.requests == 3
+    assert len(memory_ocr_cache) == 3
+
+    assert run_ocr_pdf(mock_vlm) == first
+    assert mock_vlm.requests == 3
+
+    # Other pixels are a different image
+    run_ocr_pdf(mock_vlm, dpi=96)
+    assert mock_vlm.requests == 6
+
+
+def test_streamed_pdf_pages_are_ocred(tmp_path):
+    path = tmp_path / "scanned.pdf"
+    path.write_bytes(scanned_pdf())
+    ocred = []
+
+    def ocr_page(page_number: int, image: bytes) -> str:
+        assert image.startswith(b"\x89PNG")
+        ocred.append(page_number)
+        return f"ocr of page {page_number}"
+
+    pages = list(iter_pdf_pages(str(path), ocr_page=ocr_page, dpi=72))
+    assert ocred == [1, 3, 5]
+    assert pages[0][2] == "ocr of page 1"
+    assert pages[1][2].startswith("Text layer of page 2")
+
+
+class RecordingDocumentService:
+    """Stands in for DocumentService, keeping the stored text in memory."""
+
+    def __init__(self):
+        self.text = None
+        self.statuses = []
+
+    def update_document(self, document_id, update_data, user):
+        if update_data.status is not None:
+            self.statuses.append(update_data.status)
+
+    def set_document_text(self, document_id, text):
+        self.text = text
+
+
+class StaticSummaryGenerator:
+    max_input_chars = 10_000
+
+    async def async_generate_summary(self, full_text, **kwargs):
+        return document_details(title="Scanned", description=full_text[:40])
+
+
+def test_streaming_ingest_ocrs_on_a_one_thread_pool(mock_vlm, tmp_path, monkeypatch):
+    port = mock_vlm.server_address[1]
+    ocr_image_document = page_ocr.ocr_image_document
+
+    async def ocr_with_mock_vlm(image, task_type, litellm_params):
+        return await ocr_image_document(
+            image,
+            task_type=task_type,
+            litellm_params={"base_url": f"http://127.0.0.1:{port}/v1", "api_key": "t"},
+        )
+
+    monkeypatch.setattr(page_ocr, "ocr_image_document", ocr_with_mock_vlm)
+    # Streaming ingest, OCR and CPU work all on one pool thread used to deadlock
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(executors, "_THREAD_POOL", pool)
+    monkeypatch.setattr(get_settings(), "OCR_RENDER_DPI", 72)
+
+    path = tmp_path / "scanned.pdf"
+    path.write_bytes(scanned_pdf())
+    document_service = RecordingDocumentService()
+    ingestor = DocumentIngestorService(
+        collection_service=None,
+        document_service=document_service,
+        text_embedder=None,
+        kg_extractor=None,
+        kg_merger=None,
+        summary_generator=StaticSummaryGenerator(),
+        cpu_executor=pool,
+    )
+    input_file = FileInput(
+        content=str(path),
+        file_name="scanned.pdf",
+        name="scanned.pdf",
+        type=".pdf",
+        is_path=True,
+    )
+    document = SimpleNamespace(id="doc", is_vectorized=True, is_graph_extracted=False)
+
+    async def ingest():
+        await asyncio.wait_for(
+            ingestor.ingest_file_streaming(input_file, document, False, None), 30
+        )
+
+    try:
+        asyncio.run(ingest())
+    finally:
+        pool.shutdown(wait=False)
+
+    lines = document_service.text.splitlines()
+    assert lines[0] == "page 200.0x300.0"
+    assert lines[1].startswith("Text layer of page 2")
+    assert "page 240.0x300.0" in lines
+    assert document_service.statuses[-1] == IngestionStatus.ready
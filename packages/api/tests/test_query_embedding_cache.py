@@ -0,0 +1,69 @@
+"""QueryEmbeddingCache tests with a fake clock."""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from api.agentic.core.embedding import embedding
+from api.agentic.core.embedding.embedding import QueryEmbeddingCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def vector(value: float) -> np.ndarray:
+    return np.full(4, value, dtype=np.float32)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = QueryEmbeddingCache(max_size=2)
+    cache.put(("a",), vector(1))
+    cache.put(("b",), vector(2))
+    # Reading "a" makes "b" the least recently used
+    assert cache.get(("a",)) is not None
+    cache.put(("c",), vector(3))
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",))[0] == 1
+    assert cache.get(("c",))[0] == 3
+    assert cache.stats()["evictions"] == 1
+
+    cache.put(("d",), vector(4))
+    assert cache.get(("a",)) is None
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(embedding, "time", SimpleNamespace(monotonic=clock.monotonic))
+    cache = QueryEmbeddingCache(max_size=8, ttl_seconds=60)
+    cache.put(("old",), vector(1))
+    clock.now += 30
+    cache.put(("new",), vector(2))
+
+    clock.now += 30
+    assert cache.get(("old",)) is not None
+    clock.now += 1
+    assert cache.get(("old",)) is None
+    assert cache.get(("new",)) is not None
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["size"] == 1
+
+
+def test_stored_embeddings_are_copied_in_and_out():
+    cache = QueryEmbeddingCache()
+    original = vector(1)
+    cache.put(("q",), original)
+    original[:] = 9
+
+    returned = cache.get(("q",))
+    returned[:] = 7
+
+    assert np.array_equal(cache.get(("q",)), vector(1))
+    assert cache.get(("q",)) is not cache.get(("q",))
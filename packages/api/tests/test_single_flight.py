@@ -0,0 +1,137 @@
+"""Single-flight coalescing tests."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.agentic.core.single_flight import SingleFlight
+
+
+def test_concurrent_async_calls_share_one_call():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        same = [flight.do("key", work) for _ in range(5)]
+        return await asyncio.gather(*same, flight.do("other", work))
+
+    assert asyncio.run(run()) == ["result"] * 6
+    assert calls == 2
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_async_error_reaches_every_waiter():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("provider failed")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("key", work) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight("test")
+
+    async def run():
+        done = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            done.set()
+            return "result"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "result"
+        assert done.is_set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(run())
+
+
+def test_call_is_cancelled_when_every_waiter_is():
+    flight = SingleFlight("test")
+
+    async def run():
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    asyncio.run(run())
+
+
+def test_sync_calls_from_threads_share_one_call():
+    flight = SingleFlight("test")
+    calls = 0
+    barrier = threading.Barrier(4)
+
+    def work():
+        nonlocal calls
+        calls += 1
+        time.sleep(0.1)
+        return "result"
+
+    def call():
+        barrier.wait()
+        return flight.do_sync("key", work)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: call(), range(4)))
+
+    assert results == ["result"] * 4
+    assert calls == 1
+
+
+def test_sync_error_reaches_every_caller():
+    flight = SingleFlight("test")
+    barrier = threading.Barrier(3)
+
+    def work():
+        time.sleep(0.1)
+        raise ValueError("encode failed")
+
+    def call():
+        barrier.wait()
+        try:
+            flight.do_sync("key", work)
+        except ValueError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda _: call(), range(3)))
+
+    assert all(isinstance(result, ValueError) for result in results)
@@ -0,0 +1,44 @@
+"""Hierarchical summary tests; the LLM calls are replaced by stubs."""
+
+import asyncio
+
+import pytest
+
+from api.agentic.core.ingestion import summary as summary_module
+from api.agentic.core.ingestion.schemas import document_details
+from api.agentic.core.ingestion.summary import SummaryGenerator
+
+
+@pytest.fixture
+def final_prompts(monkeypatch):
+    prompts = []
+
+    async def call_structured_llm_async(prompt, response_model, use_cache=False):
+        prompts.append(prompt)
+        return document_details(title="Title", description="Description")
+
+    async def call_llm_async(prompt, use_cache=False):
+        return "partial summary"
+
+    monkeypatch.setattr(
+        summary_module, "call_structured_llm_async", call_structured_llm_async
+    )
+    monkeypatch.setattr(summary_module, "call_llm_async", call_llm_async)
+    return prompts
+
+
+def test_budget_too_small_for_the_final_call_is_rejected():
+    with pytest.raises(ValueError):
+        SummaryGenerator(text_limit=4000, token_budget=1000, use_cache=False)
+
+
+def test_sections_beyond_the_budget_keep_their_text(final_prompts):
+    # Room for the final call but not for any section call
+    generator = SummaryGenerator(
+        text_limit=4000, section_chars=2000, token_budget=1600, use_cache=False
+    )
+    text = " ".join(f"word{i}" for i in range(2000))
+
+    asyncio.run(generator.async_generate_summary(text))
+
+    assert "word0 word1" in final_prompts[0]